@@ -0,0 +1,55 @@
+"""trigram search indexes
+
+Revision ID: 384aa6d67972
+Revises: 30bffdc94577
+Create Date: 2026-10-17 09:12:41.208113
+
+"""
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel.sql.sqltypes
+
+
+# revision identifiers, used by Alembic.
+revision = '384aa6d67972'
+down_revision = '30bffdc94577'
+branch_labels = None
+depends_on = None
+
+
+# Columns searched with ilike('%term%') by the list endpoints
+TRIGRAM_COLUMNS = [
+    ('itemcategory', 'item_category_name'),
+    ('itemcategory', 'item_category_code'),
+    ('itemsubcategory', 'item_subcategory_name'),
+    ('itemsubcategory', 'item_subcategory_code'),
+    ('roles', 'role_name'),
+    ('roleclaims', 'role_claim_type'),
+    ('roleclaims', 'role_claim_value'),
+    ('locations', 'location_name'),
+    ('semesters', 'semester_name'),
+    ('courses', 'course_name'),
+    ('courses', 'course_description'),
+    ('suppliers', 'supplier_name'),
+    ('suppliers', 'contact_person'),
+    ('suppliers', 'email'),
+]
+
+
+def upgrade():
+    op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    for table, column in TRIGRAM_COLUMNS:
+        op.create_index(
+            f'ix_{table}_{column}_trgm',
+            table,
+            [column],
+            unique=False,
+            postgresql_using='gin',
+            postgresql_ops={column: 'gin_trgm_ops'},
+        )
+
+
+def downgrade():
+    for table, column in reversed(TRIGRAM_COLUMNS):
+        op.drop_index(f'ix_{table}_{column}_trgm', table_name=table)
+    # The extension is left installed, other objects may depend on it
@@ -0,0 +1,45 @@
+"""email outbox
+
+Revision ID: 4f6b8e2a9c13
+Revises: 9d4c2b7a1e58
+Create Date: 2026-10-17 19:12:44.503918
+
+"""
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel.sql.sqltypes
+
+
+# revision identifiers, used by Alembic.
+revision = '4f6b8e2a9c13'
+down_revision = '9d4c2b7a1e58'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'emailoutbox',
+        sa.Column('email_outbox_id', sa.Uuid(), nullable=False),
+        sa.Column('email_to', sqlmodel.sql.sqltypes.AutoString(length=255), nullable=False),
+        sa.Column('subject', sqlmodel.sql.sqltypes.AutoString(length=998), nullable=False),
+        sa.Column('html_content', sa.Text(), nullable=False),
+        sa.Column('attempts', sa.Integer(), nullable=False),
+        sa.Column('next_attempt_at', sa.DateTime(), nullable=False),
+        sa.Column('last_error', sa.Text(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.Column('sent_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('email_outbox_id'),
+    )
+    op.create_index(
+        'ix_emailoutbox_next_attempt_at_unsent',
+        'emailoutbox',
+        ['next_attempt_at'],
+        unique=False,
+        postgresql_where=sa.text('sent_at IS NULL'),
+    )
+
+
+def downgrade():
+    op.drop_index('ix_emailoutbox_next_attempt_at_unsent', table_name='emailoutbox')
+    op.drop_table('emailoutbox')
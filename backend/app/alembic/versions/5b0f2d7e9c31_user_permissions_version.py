@@ -0,0 +1,28 @@
+"""user permissions version
+
+Revision ID: 5b0f2d7e9c31
+Revises: c4e711866f29
+Create Date: 2026-10-17 13:05:12.402917
+
+"""
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel.sql.sqltypes
+
+
+# revision identifiers, used by Alembic.
+revision = '5b0f2d7e9c31'
+down_revision = 'c4e711866f29'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column(
+        'user',
+        sa.Column('permissions_version', sa.Integer(), nullable=False, server_default='0'),
+    )
+
+
+def downgrade():
+    op.drop_column('user', 'permissions_version')
@@ -0,0 +1,114 @@
+"""user effective claims
+
+Revision ID: 9d4c2b7a1e58
+Revises: e3a91c4d7f20
+Create Date: 2026-10-17 16:52:37.604115
+
+"""
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel.sql.sqltypes
+
+
+# revision identifiers, used by Alembic.
+revision = '9d4c2b7a1e58'
+down_revision = 'e3a91c4d7f20'
+branch_labels = None
+depends_on = None
+
+
+# Recomputes the rows of the given users from the source tables
+REFRESH_FUNCTION = '''
+CREATE FUNCTION refresh_user_effective_claims(target_users uuid[]) RETURNS void AS $$
+BEGIN
+    DELETE FROM user_effective_claims WHERE user_id = ANY(target_users);
+    INSERT INTO user_effective_claims (user_id, role_id, role_name, claim_type, claim_value)
+    SELECT DISTINCT userrole.user_id, roles.role_id, roles.role_name,
+           roleclaims.role_claim_type, roleclaims.role_claim_value
+    FROM userrole
+    JOIN roles ON roles.role_id = userrole.role_id AND roles.role_is_active
+    LEFT JOIN roleclaims ON roleclaims.role_id = roles.role_id
+                        AND roleclaims.role_claim_isactive
+    WHERE userrole.is_active AND userrole.user_id = ANY(target_users);
+END;
+$$ LANGUAGE plpgsql
+'''
+
+USER_ROLE_TRIGGER_FUNCTION = '''
+CREATE FUNCTION userrole_effective_claims() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP <> 'INSERT' THEN
+        PERFORM refresh_user_effective_claims(ARRAY[OLD.user_id]);
+    END IF;
+    IF TG_OP <> 'DELETE' THEN
+        PERFORM refresh_user_effective_claims(ARRAY[NEW.user_id]);
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql
+'''
+
+# Shared by roles and roleclaims, both have a role_id column
+ROLE_TRIGGER_FUNCTION = '''
+CREATE FUNCTION role_effective_claims() RETURNS trigger AS $$
+DECLARE
+    changed_roles uuid[];
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        changed_roles := ARRAY[NEW.role_id];
+    ELSIF TG_OP = 'DELETE' THEN
+        changed_roles := ARRAY[OLD.role_id];
+    ELSE
+        changed_roles := ARRAY[OLD.role_id, NEW.role_id];
+    END IF;
+    PERFORM refresh_user_effective_claims(ARRAY(
+        SELECT DISTINCT user_id FROM userrole WHERE role_id = ANY(changed_roles)
+    ));
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql
+'''
+
+
+def upgrade():
+    op.create_table(
+        'user_effective_claims',
+        sa.Column('user_effective_claim_id', sa.Integer(), nullable=False),
+        sa.Column('user_id', sa.Uuid(), nullable=False),
+        sa.Column('role_id', sa.Uuid(), nullable=False),
+        sa.Column('role_name', sqlmodel.sql.sqltypes.AutoString(length=255), nullable=False),
+        sa.Column('claim_type', sqlmodel.sql.sqltypes.AutoString(length=100), nullable=True),
+        sa.Column('claim_value', sqlmodel.sql.sqltypes.AutoString(length=100), nullable=True),
+        sa.ForeignKeyConstraint(['user_id'], ['user.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['role_id'], ['roles.role_id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('user_effective_claim_id'),
+    )
+    op.create_index(op.f('ix_user_effective_claims_user_id'), 'user_effective_claims', ['user_id'], unique=False)
+
+    op.execute(REFRESH_FUNCTION)
+    op.execute(USER_ROLE_TRIGGER_FUNCTION)
+    op.execute(ROLE_TRIGGER_FUNCTION)
+    op.execute(
+        'CREATE TRIGGER userrole_effective_claims AFTER INSERT OR UPDATE OR DELETE '
+        'ON userrole FOR EACH ROW EXECUTE FUNCTION userrole_effective_claims()'
+    )
+    op.execute(
+        'CREATE TRIGGER roles_effective_claims AFTER UPDATE OR DELETE '
+        'ON roles FOR EACH ROW EXECUTE FUNCTION role_effective_claims()'
+    )
+    op.execute(
+        'CREATE TRIGGER roleclaims_effective_claims AFTER INSERT OR UPDATE OR DELETE '
+        'ON roleclaims FOR EACH ROW EXECUTE FUNCTION role_effective_claims()'
+    )
+    op.execute('SELECT refresh_user_effective_claims(ARRAY(SELECT DISTINCT user_id FROM userrole))')
+
+
+def downgrade():
+    op.execute('DROP TRIGGER roleclaims_effective_claims ON roleclaims')
+    op.execute('DROP TRIGGER roles_effective_claims ON roles')
+    op.execute('DROP TRIGGER userrole_effective_claims ON userrole')
+    op.execute('DROP FUNCTION role_effective_claims()')
+    op.execute('DROP FUNCTION userrole_effective_claims()')
+    op.execute('DROP FUNCTION refresh_user_effective_claims(uuid[])')
+    op.drop_index(op.f('ix_user_effective_claims_user_id'), table_name='user_effective_claims')
+    op.drop_table('user_effective_claims')
@@ -0,0 +1,57 @@
+"""table versions
+
+Revision ID: a7c3e5f1d2b4
+Revises: 4f6b8e2a9c13
+Create Date: 2026-10-17 21:03:18.226471
+
+"""
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel.sql.sqltypes
+
+
+# revision identifiers, used by Alembic.
+revision = 'a7c3e5f1d2b4'
+down_revision = '4f6b8e2a9c13'
+branch_labels = None
+depends_on = None
+
+
+# Reference tables whose responses carry an ETag
+VERSIONED_TABLES = ('itemcategory', 'locations', 'semesters', 'suppliers')
+
+# Once per statement, whatever wrote it: routes, bulk writes, imports, psql
+BUMP_FUNCTION = '''
+CREATE FUNCTION bump_table_version() RETURNS trigger AS $$
+BEGIN
+    UPDATE table_versions SET version = version + 1 WHERE table_name = TG_TABLE_NAME;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql
+'''
+
+
+def upgrade():
+    op.create_table(
+        'table_versions',
+        sa.Column('table_name', sqlmodel.sql.sqltypes.AutoString(length=63), nullable=False),
+        sa.Column('version', sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint('table_name'),
+    )
+    op.bulk_insert(
+        sa.table('table_versions', sa.column('table_name'), sa.column('version')),
+        [{'table_name': table, 'version': 0} for table in VERSIONED_TABLES],
+    )
+    op.execute(BUMP_FUNCTION)
+    for table in VERSIONED_TABLES:
+        op.execute(
+            f'CREATE TRIGGER {table}_version AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE '
+            f'ON {table} FOR EACH STATEMENT EXECUTE FUNCTION bump_table_version()'
+        )
+
+
+def downgrade():
+    for table in VERSIONED_TABLES:
+        op.execute(f'DROP TRIGGER {table}_version ON {table}')
+    op.execute('DROP FUNCTION bump_table_version()')
+    op.drop_table('table_versions')
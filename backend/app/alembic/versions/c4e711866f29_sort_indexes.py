@@ -0,0 +1,50 @@
+"""sort indexes
+
+Revision ID: c4e711866f29
+Revises: caaada6b00e8
+Create Date: 2026-10-17 11:20:45.880312
+
+"""
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel.sql.sqltypes
+
+
+# revision identifiers, used by Alembic.
+revision = 'c4e711866f29'
+down_revision = 'caaada6b00e8'
+branch_labels = None
+depends_on = None
+
+
+# (table, sortable column, primary key, active flag) for each sortable list field
+SORT_INDEXES = [
+    ('itemcategory', 'item_category_name', 'item_category_id', 'item_category_isactive'),
+    ('itemcategory', 'item_category_code', 'item_category_id', 'item_category_isactive'),
+    ('itemsubcategory', 'item_subcategory_name', 'item_subcategory_id', 'item_subcategory_isactive'),
+    ('itemsubcategory', 'item_subcategory_code', 'item_subcategory_id', 'item_subcategory_isactive'),
+    ('roles', 'role_name', 'role_id', 'role_is_active'),
+    ('roleclaims', 'role_claim_type', 'role_claim_id', 'role_claim_isactive'),
+    ('roleclaims', 'role_claim_value', 'role_claim_id', 'role_claim_isactive'),
+    ('locations', 'location_name', 'location_id', 'location_is_active'),
+    ('semesters', 'semester_name', 'semester_id', 'is_active'),
+    ('semesters', 'start_date', 'semester_id', 'is_active'),
+    ('courses', 'course_name', 'course_id', 'is_active'),
+    ('suppliers', 'supplier_name', 'supplier_id', 'is_active'),
+]
+
+
+def upgrade():
+    for table, column, pk, flag in SORT_INDEXES:
+        op.create_index(
+            f'ix_{table}_{column}_active',
+            table,
+            [column, pk],
+            unique=False,
+            postgresql_where=sa.text(flag),
+        )
+
+
+def downgrade():
+    for table, column, pk, flag in reversed(SORT_INDEXES):
+        op.drop_index(f'ix_{table}_{column}_active', table_name=table)
@@ -0,0 +1,71 @@
+"""lock user effective claims refresh
+
+Revision ID: c5e8a1f3b7d9
+Revises: a7c3e5f1d2b4
+Create Date: 2026-10-17 23:41:09.518203
+
+"""
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel.sql.sqltypes
+
+
+# revision identifiers, used by Alembic.
+revision = 'c5e8a1f3b7d9'
+down_revision = 'a7c3e5f1d2b4'
+branch_labels = None
+depends_on = None
+
+
+# Two transactions changing the same user's roles at once, e.g. a revoke and
+# a grant, would each recompute from a snapshot missing the other's change,
+# and the last one to commit could put a revoked claim back. Holding a lock
+# per user until commit makes the second one wait and read the first one's
+# rows: under READ COMMITTED every statement after the lock takes a new
+# snapshot. Keys are taken in order so that two refreshes cannot deadlock.
+REFRESH_FUNCTION = '''
+CREATE OR REPLACE FUNCTION refresh_user_effective_claims(target_users uuid[]) RETURNS void AS $$
+DECLARE
+    user_key integer;
+BEGIN
+    FOR user_key IN
+        SELECT DISTINCT hashtext(user_id::text) FROM unnest(target_users) AS user_id ORDER BY 1
+    LOOP
+        PERFORM pg_advisory_xact_lock(user_key);
+    END LOOP;
+    DELETE FROM user_effective_claims WHERE user_id = ANY(target_users);
+    INSERT INTO user_effective_claims (user_id, role_id, role_name, claim_type, claim_value)
+    SELECT DISTINCT userrole.user_id, roles.role_id, roles.role_name,
+           roleclaims.role_claim_type, roleclaims.role_claim_value
+    FROM userrole
+    JOIN roles ON roles.role_id = userrole.role_id AND roles.role_is_active
+    LEFT JOIN roleclaims ON roleclaims.role_id = roles.role_id
+                        AND roleclaims.role_claim_isactive
+    WHERE userrole.is_active AND userrole.user_id = ANY(target_users);
+END;
+$$ LANGUAGE plpgsql
+'''
+
+PREVIOUS_REFRESH_FUNCTION = '''
+CREATE OR REPLACE FUNCTION refresh_user_effective_claims(target_users uuid[]) RETURNS void AS $$
+BEGIN
+    DELETE FROM user_effective_claims WHERE user_id = ANY(target_users);
+    INSERT INTO user_effective_claims (user_id, role_id, role_name, claim_type, claim_value)
+    SELECT DISTINCT userrole.user_id, roles.role_id, roles.role_name,
+           roleclaims.role_claim_type, roleclaims.role_claim_value
+    FROM userrole
+    JOIN roles ON roles.role_id = userrole.role_id AND roles.role_is_active
+    LEFT JOIN roleclaims ON roleclaims.role_id = roles.role_id
+                        AND roleclaims.role_claim_isactive
+    WHERE userrole.is_active AND userrole.user_id = ANY(target_users);
+END;
+$$ LANGUAGE plpgsql
+'''
+
+
+def upgrade():
+    op.execute(REFRESH_FUNCTION)
+
+
+def downgrade():
+    op.execute(PREVIOUS_REFRESH_FUNCTION)
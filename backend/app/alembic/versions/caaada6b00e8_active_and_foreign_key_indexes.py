@@ -0,0 +1,67 @@
+"""active and foreign key indexes
+
+Revision ID: caaada6b00e8
+Revises: 384aa6d67972
+Create Date: 2026-10-17 10:02:17.534921
+
+"""
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel.sql.sqltypes
+
+
+# revision identifiers, used by Alembic.
+revision = 'caaada6b00e8'
+down_revision = '384aa6d67972'
+branch_labels = None
+depends_on = None
+
+
+# (table, primary key, active flag) of the soft-deleted tables
+ACTIVE_INDEXES = [
+    ('itemcategory', 'item_category_id', 'item_category_isactive'),
+    ('itemsubcategory', 'item_subcategory_id', 'item_subcategory_isactive'),
+    ('roles', 'role_id', 'role_is_active'),
+    ('roleclaims', 'role_claim_id', 'role_claim_isactive'),
+    ('locations', 'location_id', 'location_is_active'),
+    ('semesters', 'semester_id', 'is_active'),
+    ('courses', 'course_id', 'is_active'),
+    ('suppliers', 'supplier_id', 'is_active'),
+]
+
+FOREIGN_KEY_INDEXES = [
+    ('item', 'owner_id'),
+    ('itemsubcategory', 'item_category_id'),
+    ('roleclaims', 'role_id'),
+    ('userrole', 'user_id'),
+    ('userrole', 'role_id'),
+    ('itemcategory', 'created_by_id'),
+    ('itemsubcategory', 'created_by_id'),
+    ('roles', 'created_by_id'),
+    ('roleclaims', 'created_by_id'),
+    ('userrole', 'created_by_id'),
+    ('locations', 'created_by_id'),
+    ('semesters', 'created_by_id'),
+    ('courses', 'created_by_id'),
+    ('suppliers', 'created_by_id'),
+]
+
+
+def upgrade():
+    for table, pk, flag in ACTIVE_INDEXES:
+        op.create_index(
+            f'ix_{table}_active',
+            table,
+            [pk],
+            unique=False,
+            postgresql_where=sa.text(flag),
+        )
+    for table, column in FOREIGN_KEY_INDEXES:
+        op.create_index(op.f(f'ix_{table}_{column}'), table, [column], unique=False)
+
+
+def downgrade():
+    for table, column in reversed(FOREIGN_KEY_INDEXES):
+        op.drop_index(op.f(f'ix_{table}_{column}'), table_name=table)
+    for table, pk, flag in reversed(ACTIVE_INDEXES):
+        op.drop_index(f'ix_{table}_active', table_name=table)
@@ -0,0 +1,27 @@
+"""refreshtoken expires_at index
+
+Revision ID: f2b7d4c9a1e6
+Revises: c5e8a1f3b7d9
+Create Date: 2026-10-17 23:58:12.604193
+
+"""
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel.sql.sqltypes
+
+
+# revision identifiers, used by Alembic.
+revision = 'f2b7d4c9a1e6'
+down_revision = 'c5e8a1f3b7d9'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Expired tokens are deleted as new ones are created, see
+    # crud.prune_refresh_tokens
+    op.create_index(op.f('ix_refreshtoken_expires_at'), 'refreshtoken', ['expires_at'], unique=False)
+
+
+def downgrade():
+    op.drop_index(op.f('ix_refreshtoken_expires_at'), table_name='refreshtoken')
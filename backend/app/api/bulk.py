@@ -0,0 +1,167 @@
+"""
+Bulk create/update shared by the catalog routes.
+
+A ``BulkWrite`` describes once how a catalog table is written in bulk: the
+natural key a row is matched on and an optional parent the rows must point
+to. A batch is checked as a whole before anything is written: rows repeating
+a key, rows pointing to a missing parent and, for users other than
+superusers, rows that would change an existing entry are all reported
+together and nothing is written. The rows are then inserted with one
+multi-row INSERT and updated with one executemany UPDATE per chunk, and the
+whole batch is committed once.
+"""
+
+import uuid
+from collections.abc import Sequence
+from datetime import datetime
+from typing import Any
+
+from fastapi import HTTPException
+from sqlalchemy import insert, text, update
+from sqlalchemy.orm import InstrumentedAttribute
+from sqlmodel import SQLModel, col, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.models import BulkResult, BulkRowResult, BulkStatus, User
+
+# Rows per statement, also bounds the parameters sent at once
+CHUNK_SIZE = 500
+
+
+def chunked(rows: Sequence[Any], size: int = CHUNK_SIZE) -> list[Sequence[Any]]:
+    return [rows[start : start + size] for start in range(0, len(rows), size)]
+
+
+class BulkWrite:
+    def __init__(
+        self,
+        model: Any,
+        *,
+        pk_column: InstrumentedAttribute[Any],
+        key: InstrumentedAttribute[Any],
+        active: InstrumentedAttribute[Any],
+        parent: tuple[InstrumentedAttribute[Any], InstrumentedAttribute[Any]]
+        | None = None,
+        name: str,
+        parent_name: str = "Parent",
+    ) -> None:
+        """
+        ``key`` is the natural key rows are matched on, ``parent`` the
+        foreign key field of the rows and the primary key it must exist in.
+        The names are used in error messages.
+        """
+        self.model = model
+        self.pk_column = pk_column
+        self.key = key
+        self.active = active
+        self.parent = parent
+        self.name = name
+        self.parent_name = parent_name
+
+    async def _existing(
+        self, session: AsyncSession, keys: Sequence[Any]
+    ) -> dict[Any, uuid.UUID]:
+        existing: dict[Any, uuid.UUID] = {}
+        for chunk in chunked(keys):
+            # Legacy rows may share a key, the active, oldest one is updated
+            statement = (
+                select(self.key, self.pk_column)
+                .where(col(self.key).in_(chunk))
+                .order_by(col(self.active).desc(), col(self.model.created_at))
+            )
+            for key, pk in await session.exec(statement):
+                existing.setdefault(key, pk)
+        return existing
+
+    async def _missing_parents(
+        self, session: AsyncSession, rows: Sequence[SQLModel]
+    ) -> set[Any]:
+        if self.parent is None:
+            return set()
+        field, parent_pk = self.parent
+        wanted = list({getattr(row, field.key) for row in rows})
+        found: set[Any] = set()
+        for chunk in chunked(wanted):
+            found.update(
+                await session.exec(select(parent_pk).where(col(parent_pk).in_(chunk)))
+            )
+        return set(wanted) - found
+
+    async def write(
+        self, session: AsyncSession, rows: Sequence[SQLModel], *, user: User
+    ) -> BulkResult:
+        """
+        Create the rows whose key is new and update the others, or raise a
+        400 listing every rejected row.
+        """
+        # Keeps concurrent writers out until the commit, the natural keys
+        # have no unique constraint to conflict on
+        await session.execute(
+            text(f"LOCK TABLE {self.model.__tablename__} IN SHARE ROW EXCLUSIVE MODE")
+        )
+        keys = [getattr(row, self.key.key) for row in rows]
+        existing = await self._existing(session, list(set(keys)))
+        missing_parents = await self._missing_parents(session, rows)
+
+        errors: list[dict[str, Any]] = []
+        seen: set[Any] = set()
+        for index, (row, key) in enumerate(zip(rows, keys, strict=True)):
+            if key in seen:
+                detail = f"Repeats the {self.key.key} of an earlier row"
+            elif self.parent and getattr(row, self.parent[0].key) in missing_parents:
+                detail = f"{self.parent_name} not found"
+            elif key in existing and not user.is_superuser:
+                detail = f"{self.name} exists, not enough permission to update it"
+            else:
+                detail = None
+            if detail:
+                errors.append({"index": index, "detail": detail})
+            seen.add(key)
+        if errors:
+            raise HTTPException(status_code=400, detail=errors)
+
+        now = datetime.now()
+        pk = self.pk_column.key
+        results: list[BulkRowResult] = []
+        for start, chunk in enumerate(chunked(rows)):
+            offset = start * CHUNK_SIZE
+            inserts: list[dict[str, Any]] = []
+            updates: list[dict[str, Any]] = []
+            for index, row in enumerate(chunk, start=offset):
+                values = row.model_dump()
+                row_id = existing.get(values[self.key.key])
+                if row_id is None:
+                    row_id = uuid.uuid4()
+                    inserts.append(
+                        {
+                            **values,
+                            pk: row_id,
+                            "created_at": now,
+                            "created_by_id": user.id,
+                            "updated_by_id": user.id,
+                        }
+                    )
+                    status = BulkStatus.created
+                else:
+                    updates.append(
+                        {
+                            **values,
+                            pk: row_id,
+                            "updated_at": now,
+                            "updated_by_id": user.id,
+                        }
+                    )
+                    status = BulkStatus.updated
+                results.append(BulkRowResult(index=index, status=status, id=row_id))
+            if inserts:
+                # One multi-row INSERT for the chunk
+                await session.execute(insert(self.model).values(inserts))
+            if updates:
+                # ORM bulk UPDATE by primary key, sent as one executemany
+                await session.execute(update(self.model), updates)
+        await session.commit()
+        return BulkResult(
+            created=sum(result.status is BulkStatus.created for result in results),
+            updated=sum(result.status is BulkStatus.updated for result in results),
+            data=results,
+        )
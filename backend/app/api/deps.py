@@ -1,16 +1,18 @@
-from collections.abc import Generator
+import uuid
+from collections.abc import AsyncGenerator, Generator
 from typing import Annotated
 
-import jwt
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from jwt.exceptions import InvalidTokenError
 from pydantic import ValidationError
 from sqlmodel import Session
+from sqlmodel.ext.asyncio.session import AsyncSession
 
 from app.core import security
 from app.core.config import settings
-from app.core.db import engine
+from app.core.db import ReadSession, async_engine, engine, next_replica_engine
+from app.core.user_cache import user_cache
 from app.models import TokenPayload, User
 
 reusable_oauth2 = OAuth2PasswordBearer(
@@ -18,27 +20,69 @@ reusable_oauth2 = OAuth2PasswordBearer(
 )
 
 
+# Sessions keep objects loaded after commit, so write routes can return what
+# they just saved without a SELECT to reload it
 def get_db() -> Generator[Session, None, None]:
-    with Session(engine) as session:
+    with Session(engine, expire_on_commit=False) as session:
+        yield session
+
+
+async def get_async_db() -> AsyncGenerator[AsyncSession, None]:
+    async with AsyncSession(async_engine, expire_on_commit=False) as session:
         yield session
 
 
 SessionDep = Annotated[Session, Depends(get_db)]
+AsyncSessionDep = Annotated[AsyncSession, Depends(get_async_db)]
+
+
+async def get_read_db(
+    session: AsyncSessionDep,
+) -> AsyncGenerator[AsyncSession, None]:
+    # Without replicas there is nothing to route, share the primary session
+    replica = next_replica_engine()
+    if replica is None:
+        yield session
+        return
+    async with AsyncSession(
+        async_engine,
+        expire_on_commit=False,
+        sync_session_class=ReadSession,
+        info={"primary": session.sync_session, "replica": replica},
+    ) as read_session:
+        yield read_session
+
+
+ReadSessionDep = Annotated[AsyncSession, Depends(get_read_db)]
 TokenDep = Annotated[str, Depends(reusable_oauth2)]
 
 
-def get_current_user(session: SessionDep, token: TokenDep) -> User:
+def get_token_payload(token: TokenDep) -> TokenPayload:
     try:
-        payload = jwt.decode(
-            token, settings.SECRET_KEY, algorithms=[security.ALGORITHM]
-        )
-        token_data = TokenPayload(**payload)
+        return TokenPayload(**security.decode_access_token(token))
     except (InvalidTokenError, ValidationError):
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Could not validate credentials",
         )
-    user = session.get(User, token_data.sub)
+
+
+# Decoded at most once per request, shared by get_current_user and the claim
+# checks; across requests security.decode_access_token caches verified tokens
+TokenPayloadDep = Annotated[TokenPayload, Depends(get_token_payload)]
+
+
+def _token_user_id(token_data: TokenPayload) -> uuid.UUID:
+    try:
+        return uuid.UUID(token_data.sub)
+    except (TypeError, ValueError):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Could not validate credentials",
+        )
+
+
+def _check_user(user: User | None) -> User:
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
     if not user.is_active:
@@ -46,9 +90,24 @@ def get_current_user(session: SessionDep, token: TokenDep) -> User:
     return user
 
 
+def get_current_user(session: SessionDep, token_data: TokenPayloadDep) -> User:
+    return _check_user(user_cache.load(session, _token_user_id(token_data)))
+
+
 CurrentUser = Annotated[User, Depends(get_current_user)]
 
 
+# For async routes: loads the user on the request's AsyncSession, without a
+# threadpool hop or a connection from the sync pool
+async def get_current_user_async(
+    session: AsyncSessionDep, token_data: TokenPayloadDep
+) -> User:
+    return _check_user(await user_cache.load_async(session, _token_user_id(token_data)))
+
+
+AsyncCurrentUser = Annotated[User, Depends(get_current_user_async)]
+
+
 def get_current_active_superuser(current_user: CurrentUser) -> User:
     if not current_user.is_superuser:
         raise HTTPException(
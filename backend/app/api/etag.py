@@ -0,0 +1,71 @@
+"""
+ETags for the reference data routes.
+
+Item categories, locations, semesters and suppliers rarely change, yet the
+frontend asks for them on every navigation. Their list and detail responses
+carry an ETag made from the table's change counter (``TableVersion``), read
+with one primary key lookup. A request whose ``If-None-Match`` holds the
+current tag gets a 304 before the route runs, so no row is loaded or
+serialized.
+"""
+
+from typing import Any
+
+from fastapi import HTTPException, Request, Response
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.api.deps import AsyncCurrentUser, ReadSessionDep
+from app.models import TableVersion
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """
+    Weak comparison of ``etag`` with the tags of an If-None-Match header.
+    """
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    return any(
+        tag.strip().removeprefix("W/") == opaque for tag in if_none_match.split(",")
+    )
+
+
+class TableETag:
+    def __init__(self, model: Any) -> None:
+        """
+        Route dependency tagging the responses built from ``model``'s table,
+        which needs a row in table_versions and the trigger bumping it.
+        """
+        self.table_name: str = model.__tablename__
+
+    async def version(self, session: AsyncSession) -> int | None:
+        return (
+            await session.exec(
+                select(TableVersion.version).where(
+                    TableVersion.table_name == self.table_name
+                )
+            )
+        ).first()
+
+    async def __call__(
+        self,
+        request: Request,
+        response: Response,
+        session: ReadSessionDep,
+        current_user: AsyncCurrentUser,
+    ) -> None:
+        # Read before the rows: a write committing in between makes the tag
+        # older than the data, costing the next request a full response
+        # rather than serving stale rows
+        version = await self.version(session)
+        if version is None:
+            return
+        # Superusers also get inactive rows from the detail routes
+        etag = f'W/"{self.table_name}-{version}-{int(current_user.is_superuser)}"'
+        headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+        if etag_matches(request.headers.get("if-none-match"), etag):
+            raise HTTPException(status_code=304, headers=headers)
+        response.headers.update(headers)
@@ -0,0 +1,105 @@
+"""
+CSV and NDJSON exports of the catalog lists.
+
+An export runs the statement of a ``ListQuery`` without paging on a
+server-side cursor and writes each batch of rows as soon as it is read, so
+memory stays flat however many rows match and the first rows reach the
+client before the scan is over. The same search, sort and active filters as
+the list route apply.
+"""
+
+import csv
+import io
+import json
+from collections.abc import AsyncIterator, Sequence
+from enum import Enum
+from typing import Any
+
+from fastapi.responses import StreamingResponse
+from sqlalchemy import ColumnElement
+from sqlmodel import SQLModel
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.api.listing import ListQuery
+from app.core.config import settings
+from app.core.db import async_engine, next_replica_engine
+from app.models import ExportFormat
+
+MEDIA_TYPES = {
+    ExportFormat.csv: "text/csv; charset=utf-8",
+    ExportFormat.ndjson: "application/x-ndjson",
+}
+
+
+def _records(
+    public_model: type[SQLModel], batch: Sequence[Any]
+) -> list[dict[str, Any]]:
+    return [public_model.model_validate(row).model_dump(mode="json") for row in batch]
+
+
+async def csv_lines(
+    public_model: type[SQLModel], batches: AsyncIterator[Sequence[Any]]
+) -> AsyncIterator[str]:
+    """
+    A header naming the fields of ``public_model``, then one line per row.
+    Nested objects are written as JSON in their cell.
+    """
+    fields = list(public_model.model_fields)
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(fields)
+    yield buffer.getvalue()
+    async for batch in batches:
+        buffer.seek(0)
+        buffer.truncate()
+        for record in _records(public_model, batch):
+            writer.writerow(
+                json.dumps(value) if isinstance(value, dict | list) else value
+                for value in (record[field] for field in fields)
+            )
+        yield buffer.getvalue()
+
+
+async def ndjson_lines(
+    public_model: type[SQLModel], batches: AsyncIterator[Sequence[Any]]
+) -> AsyncIterator[str]:
+    async for batch in batches:
+        yield "".join(
+            json.dumps(record) + "\n" for record in _records(public_model, batch)
+        )
+
+
+async def _batches(query: ListQuery, **options: Any) -> AsyncIterator[Sequence[Any]]:
+    # A session of its own: the body is sent after the route returns, when
+    # the request's sessions may already be closed. Exports only read, so
+    # they go to a replica when there is one.
+    engine = next_replica_engine() or async_engine
+    async with AsyncSession(engine) as session:
+        async for batch in query.stream(
+            session, batch_size=settings.EXPORT_BATCH_SIZE, **options
+        ):
+            yield batch
+
+
+def export_response(
+    query: ListQuery,
+    public_model: type[SQLModel],
+    *,
+    format: ExportFormat,
+    filename: str,
+    search: str | None = None,
+    sort_by: str | Enum | None = None,
+    sort_order: str | None = "asc",
+    where: Sequence[ColumnElement[bool]] = (),
+) -> StreamingResponse:
+    batches = _batches(
+        query, search=search, sort_by=sort_by, sort_order=sort_order, where=where
+    )
+    lines = csv_lines if format is ExportFormat.csv else ndjson_lines
+    return StreamingResponse(
+        lines(public_model, batches),
+        media_type=MEDIA_TYPES[format],
+        headers={
+            "Content-Disposition": f'attachment; filename="{filename}.{format.value}"'
+        },
+    )
@@ -0,0 +1,325 @@
+"""
+Declarative list queries shared by the catalog list routes.
+
+A ``ListQuery`` describes a list endpoint once: its model, the flag hiding
+soft-deleted rows, the searchable columns and the sortable fields. Each
+variant of the page statement (searching or not, sort field, direction,
+first page or after a cursor, with or without the window count) is built the
+first time it is needed and then reused, with every per-request value bound
+as a parameter. Reusing the statement objects skips rebuilding them and lets
+SQLAlchemy find the compiled SQL in its cache by a memoized key.
+"""
+
+from collections.abc import AsyncIterator, Callable, Sequence
+from enum import Enum
+from typing import Any
+
+from fastapi import HTTPException
+from sqlalchemy import (
+    ColumnElement,
+    Integer,
+    Select,
+    SQLColumnExpression,
+    String,
+    bindparam,
+    or_,
+    tuple_,
+)
+from sqlalchemy.orm import InstrumentedAttribute
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.api.pagination import (
+    Page,
+    decode_cursor,
+    fetch_counted,
+    next_cursor,
+    sort_column_for,
+    sortable_fields,
+    supports_keyset,
+    with_window_count,
+)
+from app.api.search import like_pattern, pattern_condition, search_rank
+from app.models import CountMode
+
+
+class ListQuery:
+    def __init__(
+        self,
+        model: Any,
+        *,
+        pk_column: InstrumentedAttribute[Any],
+        active: InstrumentedAttribute[Any] | None = None,
+        search: Sequence[InstrumentedAttribute[Any]] = (),
+        related_search: Callable[[ColumnElement[str]], ColumnElement[bool]]
+        | None = None,
+        sortable: Sequence[str] = (),
+        options: Sequence[Any] = (),
+    ) -> None:
+        """
+        ``sortable`` names the fields clients may sort by, ``sort_fields`` is
+        the matching Enum for the route's ``sortBy`` parameter.
+        ``related_search`` receives the bound ILIKE pattern and returns an
+        extra condition a row may match instead, e.g. on a parent table.
+        ``options`` (eager loads) only go on the page statements.
+        """
+        self.model = model
+        self.pk_column = pk_column
+        self.active = active
+        self.search_columns = tuple(search)
+        self.related_search = related_search
+        self.sort_fields = sortable_fields(model, self.pk_column.key, *sortable)
+        self.options = tuple(options)
+        self._statements: dict[tuple[Any, ...], Select[Any]] = {}
+
+    def _memoized(
+        self, key: tuple[Any, ...], build: Callable[[], Select[Any]]
+    ) -> Select[Any]:
+        statement = self._statements.get(key)
+        if statement is None:
+            statement = self._statements.setdefault(key, build())
+        return statement
+
+    def filtered(self, searching: bool) -> Select[Any]:
+        """
+        Active rows, matching the ``search_pattern`` parameter when searching.
+        """
+
+        def build() -> Select[Any]:
+            statement = select(self.model)
+            if self.active is not None:
+                statement = statement.where(self.active == True)  # noqa: E712
+            if searching:
+                pattern = bindparam("search_pattern", type_=String)
+                conditions = [pattern_condition(pattern, *self.search_columns)]
+                if self.related_search is not None:
+                    conditions.append(self.related_search(pattern))
+                statement = statement.where(or_(*conditions))
+            return statement
+
+        return self._memoized(("filtered", searching), build)
+
+    def _ordered(
+        self,
+        searching: bool,
+        *,
+        sort_column: InstrumentedAttribute[Any] | None,
+        descending: bool,
+    ) -> tuple[Select[Any], list[InstrumentedAttribute[Any]]]:
+        """
+        The filtered statement in list order, with the columns it is ordered
+        by (none when ranked by relevance).
+        """
+        statement = self.filtered(searching)
+        if searching and sort_column is None:
+            rank = search_rank(
+                bindparam("search_term", type_=String), *self.search_columns
+            )
+            return statement.order_by(rank.desc(), self.pk_column.asc()), []
+        if sort_column is None or sort_column is self.pk_column:
+            columns = [self.pk_column]
+        else:
+            columns = [sort_column, self.pk_column]
+        statement = statement.order_by(
+            *(column.desc() if descending else column.asc() for column in columns)
+        )
+        return statement, columns
+
+    def page(
+        self,
+        *,
+        searching: bool,
+        sort_column: InstrumentedAttribute[Any] | None,
+        descending: bool,
+        after: bool,
+        windowed: bool,
+    ) -> Select[Any]:
+        """
+        Page statement taking ``offset``/``limit`` parameters, or
+        ``after_value``/``after_id`` instead of ``offset`` when ``after`` a
+        cursor. Searching without a sort column orders by relevance.
+        """
+        ranked = searching and sort_column is None
+
+        def build() -> Select[Any]:
+            statement, columns = self._ordered(
+                searching, sort_column=sort_column, descending=descending
+            )
+            if after and not ranked:
+                last_id = bindparam("after_id", type_=self.pk_column.type)
+                # A single column or a (sort column, pk) row value
+                position: SQLColumnExpression[Any]
+                last: SQLColumnExpression[Any]
+                if len(columns) == 1:
+                    position, last = self.pk_column, last_id
+                else:
+                    position = tuple_(*columns)
+                    last = tuple_(
+                        bindparam("after_value", type_=columns[0].type), last_id
+                    )
+                statement = statement.where(
+                    position < last if descending else position > last
+                )
+            if not after:
+                statement = statement.offset(bindparam("offset", type_=Integer))
+            statement = statement.options(*self.options).limit(
+                bindparam("limit", type_=Integer)
+            )
+            return with_window_count(statement) if windowed else statement
+
+        key = (
+            "page",
+            searching,
+            ranked,
+            None if ranked or sort_column is None else sort_column.key,
+            descending and not ranked,
+            after,
+            windowed,
+        )
+        return self._memoized(key, build)
+
+    def export(
+        self,
+        *,
+        searching: bool,
+        sort_column: InstrumentedAttribute[Any] | None,
+        descending: bool,
+    ) -> Select[Any]:
+        """
+        Every row of the list in list order, without paging.
+        """
+        ranked = searching and sort_column is None
+
+        def build() -> Select[Any]:
+            statement, _ = self._ordered(
+                searching, sort_column=sort_column, descending=descending
+            )
+            return statement.options(*self.options)
+
+        key = (
+            "export",
+            searching,
+            ranked,
+            None if ranked or sort_column is None else sort_column.key,
+            descending and not ranked,
+        )
+        return self._memoized(key, build)
+
+    async def stream(
+        self,
+        session: AsyncSession,
+        *,
+        search: str | None = None,
+        sort_by: str | Enum | None = None,
+        sort_order: str | None = "asc",
+        where: Sequence[ColumnElement[bool]] = (),
+        batch_size: int = 1000,
+    ) -> AsyncIterator[Sequence[Any]]:
+        """
+        Yield the rows ``fetch`` would page through, in batches of
+        ``batch_size`` read from a server-side cursor.
+        """
+        searching = bool(search and self.search_columns)
+        statement = self.export(
+            searching=searching,
+            sort_column=sort_column_for(self.model, sort_by),
+            descending=bool(sort_order and sort_order.lower() == "desc"),
+        )
+        if where:
+            statement = statement.where(*where)
+        params: dict[str, Any] = {}
+        if searching:
+            assert search is not None
+            params["search_pattern"] = like_pattern(search)
+            params["search_term"] = search
+        result = await session.stream_scalars(
+            statement.execution_options(yield_per=batch_size), params
+        )
+        try:
+            async for batch in result.partitions():
+                yield batch
+        finally:
+            await result.close()
+
+    async def fetch(
+        self,
+        session: AsyncSession,
+        *,
+        search: str | None = None,
+        sort_by: str | Enum | None = None,
+        sort_order: str | None = "asc",
+        cursor: str | None = None,
+        skip: int = 0,
+        limit: int = 100,
+        count: CountMode = CountMode.exact,
+        where: Sequence[ColumnElement[bool]] = (),
+    ) -> Page:
+        """
+        Fetch one page and its total. ``where`` adds criteria that are not
+        part of the declaration, statements carrying them are not reused.
+        """
+        searching = bool(search and self.search_columns)
+        sort_column = sort_column_for(self.model, sort_by)
+        descending = bool(sort_order and sort_order.lower() == "desc")
+        ranked = searching and sort_column is None
+
+        params: dict[str, Any] = {"limit": limit}
+        if searching:
+            assert search is not None
+            params["search_pattern"] = like_pattern(search)
+            params["search_term"] = search
+        if cursor:
+            if ranked:
+                raise HTTPException(
+                    status_code=400,
+                    detail="Cursor pagination is not available for search results ordered by relevance",
+                )
+            keyset_column = sort_column if sort_column is not None else self.pk_column
+            if not supports_keyset(keyset_column):
+                raise HTTPException(
+                    status_code=400,
+                    detail=f"Cursor pagination is not available when sorting by {keyset_column.key}",
+                )
+            after_value, params["after_id"] = decode_cursor(
+                cursor, keyset_column, self.pk_column
+            )
+            if keyset_column is not self.pk_column:
+                params["after_value"] = after_value
+        else:
+            params["offset"] = skip
+
+        def page(windowed: bool) -> Select[Any]:
+            statement = self.page(
+                searching=searching,
+                sort_column=sort_column,
+                descending=descending,
+                after=bool(cursor),
+                windowed=windowed,
+            )
+            return statement.where(*where) if where else statement
+
+        filtered = self.filtered(searching)
+        if where:
+            filtered = filtered.where(*where)
+        data, total = await fetch_counted(
+            session,
+            page(windowed=False),
+            filtered,
+            count=count,
+            cursor=cursor,
+            skip=skip,
+            params=params,
+            windowed_statement=page(windowed=True)
+            if count is CountMode.exact and not cursor
+            else None,
+        )
+        return Page(
+            data=data,
+            count=total,
+            count_mode=count,
+            next_cursor=None
+            if ranked
+            else next_cursor(
+                data, limit=limit, pk_column=self.pk_column, sort_column=sort_column
+            ),
+        )
@@ -0,0 +1,332 @@
+"""
+Keyset (cursor) pagination shared by the list routes.
+
+A cursor is an opaque, url-safe token holding the sort field plus the sort
+value and primary key of the last row of a page. Feeding it back continues
+with ``WHERE (sort_column, pk) > (value, id)`` instead of making Postgres scan
+and discard ``skip`` rows.
+
+The total of a list is computed according to ``CountMode``: ``exact`` adds a
+``count(*) OVER ()`` column to the page query so page and total come back in
+one round trip, ``estimate`` reads the planner's row estimate and ``none``
+skips it.
+"""
+
+import base64
+import json
+import uuid
+from collections.abc import Sequence
+from datetime import date, datetime
+from enum import Enum
+from typing import Any, TypedDict, cast
+
+from fastapi import HTTPException
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy import ColumnElement, Select, TypeDecorator, tuple_
+from sqlalchemy.orm import ColumnProperty, InstrumentedAttribute
+from sqlmodel import func, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+from sqlmodel.sql.expression import SelectOfScalar
+
+from app.models import CountMode
+
+
+def _has_sort_index(column: Any) -> bool:
+    if column.primary_key:
+        return True
+    # Only btree indexes keep an order, the GIN trigram ones cannot serve a sort
+    return any(
+        next(iter(index.columns), None) is column
+        and index.dialect_options["postgresql"]["using"] in (False, None, "btree")
+        for index in column.table.indexes
+    )
+
+
+def sortable_fields(model: Any, *fields: str) -> type[Enum]:
+    """
+    Enum of the fields a list route lets clients sort ``model`` by.
+
+    Used as the type of the ``sortBy`` parameter, so FastAPI answers other
+    values with a 422 and the allowed ones show up in the OpenAPI schema.
+    Every field must lead an index, a sort without one turns into a full
+    sort of the table.
+    """
+    for field in fields:
+        column = model.__table__.c[field]
+        if not _has_sort_index(column):
+            raise ValueError(f"{model.__name__}.{field} has no index to sort by")
+    return Enum(  # type: ignore[return-value]
+        f"{model.__name__}SortField", {field: field for field in fields}, type=str
+    )
+
+
+def sort_column_for(
+    model: Any, sort_by: str | Enum | None
+) -> InstrumentedAttribute[Any] | None:
+    """
+    Return the mapped column ``sort_by`` names on ``model``, None when no
+    sort is asked for.
+    """
+    name = sort_by.value if isinstance(sort_by, Enum) else sort_by
+    if not name:
+        return None
+    attribute = getattr(model, name, None)
+    if isinstance(attribute, InstrumentedAttribute) and isinstance(
+        attribute.property, ColumnProperty
+    ):
+        return attribute
+    return None
+
+
+def supports_keyset(column: InstrumentedAttribute[Any]) -> bool:
+    # Row value comparisons never match NULL, so nullable columns cannot seek
+    return not column.expression.nullable
+
+
+def encode_cursor(sort_key: str, sort_value: Any, pk: Any) -> str:
+    payload = json.dumps(
+        {"k": sort_key, "v": jsonable_encoder(sort_value), "id": str(pk)},
+        separators=(",", ":"),
+    )
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def _load_value(column: InstrumentedAttribute[Any], value: Any) -> Any:
+    column_type = column.type
+    # SQLModel wraps strings and datetimes in TypeDecorators, look through them
+    if isinstance(column_type, TypeDecorator):
+        column_type = column_type.impl_instance
+    python_type = column_type.python_type
+    if value is None:
+        return None
+    if python_type is datetime:
+        return datetime.fromisoformat(value)
+    if python_type is date:
+        return date.fromisoformat(value)
+    if python_type is uuid.UUID:
+        return uuid.UUID(value)
+    return python_type(value)
+
+
+def decode_cursor(
+    cursor: str,
+    sort_column: InstrumentedAttribute[Any],
+    pk_column: InstrumentedAttribute[Any],
+) -> tuple[Any, Any]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if payload["k"] != sort_column.key:
+            raise ValueError("cursor belongs to another sort field")
+        return (
+            _load_value(sort_column, payload["v"]),
+            _load_value(pk_column, payload["id"]),
+        )
+    except (ValueError, KeyError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def apply_keyset(
+    statement: Select[Any],
+    *,
+    pk_column: InstrumentedAttribute[Any],
+    sort_column: InstrumentedAttribute[Any] | None = None,
+    descending: bool = False,
+    cursor: str | None = None,
+) -> Select[Any]:
+    """
+    Order ``statement`` by the sort column with the primary key as tie breaker
+    and, when a cursor is given, seek past the row it points at.
+    """
+    if sort_column is None or sort_column is pk_column:
+        columns = [pk_column]
+    else:
+        columns = [sort_column, pk_column]
+    if descending:
+        statement = statement.order_by(*(column.desc() for column in columns))
+    else:
+        statement = statement.order_by(*(column.asc() for column in columns))
+
+    if cursor:
+        if not supports_keyset(columns[0]):
+            raise HTTPException(
+                status_code=400,
+                detail=f"Cursor pagination is not available when sorting by {columns[0].key}",
+            )
+        sort_value, pk = decode_cursor(cursor, columns[0], pk_column)
+        if len(columns) == 1:
+            statement = statement.where(
+                pk_column < pk if descending else pk_column > pk
+            )
+        else:
+            position = tuple_(sort_column, pk_column)
+            last = tuple_(sort_value, pk)
+            statement = statement.where(
+                position < last if descending else position > last
+            )
+    return statement
+
+
+def next_cursor(
+    rows: Sequence[Any],
+    *,
+    limit: int,
+    pk_column: InstrumentedAttribute[Any],
+    sort_column: InstrumentedAttribute[Any] | None = None,
+) -> str | None:
+    """
+    Cursor for the page after ``rows``, None when this was the last page.
+    """
+    if not rows or len(rows) < limit:
+        return None
+    column = sort_column if sort_column is not None else pk_column
+    if not supports_keyset(column):
+        return None
+    last = rows[-1]
+    return encode_cursor(
+        column.key, getattr(last, column.key), getattr(last, pk_column.key)
+    )
+
+
+class Page(TypedDict):
+    data: list[Any]
+    count: int | None
+    count_mode: CountMode
+    next_cursor: str | None
+
+
+def with_window_count(statement: Select[Any]) -> Select[Any]:
+    """
+    ``statement`` with a trailing ``total_count`` column holding the number of
+    rows matching it before OFFSET/LIMIT.
+    """
+    return statement.add_columns(func.count().over().label("total_count"))
+
+
+async def exact_count(
+    session: AsyncSession,
+    statement: Select[Any],
+    params: dict[str, Any] | None = None,
+) -> int:
+    count_statement = select(func.count()).select_from(statement.subquery())
+    return (await session.exec(count_statement, params=params)).one()
+
+
+async def estimate_count(
+    session: AsyncSession,
+    statement: Select[Any],
+    params: dict[str, Any] | None = None,
+) -> int:
+    """
+    Row count the planner expects ``statement`` to return, from table
+    statistics rather than by reading the rows.
+    """
+    connection = await session.connection(bind_arguments={"clause": statement})
+    compiled = statement.compile(
+        dialect=connection.dialect, compile_kwargs={"render_postcompile": True}
+    )
+    result = await connection.exec_driver_sql(
+        f"EXPLAIN (FORMAT JSON) {compiled}", compiled.construct_params(params)
+    )
+    plan = result.scalar_one()
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+async def fetch_counted(
+    session: AsyncSession,
+    page_statement: Select[Any],
+    statement: Select[Any],
+    *,
+    count: CountMode,
+    cursor: str | None,
+    skip: int,
+    params: dict[str, Any] | None = None,
+    windowed_statement: Select[Any] | None = None,
+) -> tuple[list[Any], int | None]:
+    """
+    Run ``page_statement`` and count the rows of the filtered ``statement``
+    it pages through, the way ``count`` asks for.
+    """
+    # The window only sees rows past the cursor, so a cursor page counts separately
+    if count is CountMode.exact and not cursor:
+        if windowed_statement is None:
+            windowed_statement = with_window_count(page_statement)
+        # execute() rather than exec(): sqlmodel's exec() unwraps a
+        # SelectOfScalar to its first column, dropping total_count
+        rows = (await session.execute(windowed_statement, params)).all()
+        data = [row[0] for row in rows]
+        if rows:
+            return data, rows[0].total_count
+        if not skip:
+            return data, 0
+        # Paged past the end, no row left to carry the window count
+        return data, await exact_count(session, statement, params)
+
+    # exec() unwraps single entity selects, which the Select[Any] type hides
+    scalar_statement = cast(SelectOfScalar[Any], page_statement)
+    data = list((await session.exec(scalar_statement, params=params)).all())
+    if count is CountMode.exact:
+        return data, await exact_count(session, statement, params)
+    if count is CountMode.estimate:
+        return data, await estimate_count(session, statement, params)
+    return data, None
+
+
+async def paginate(
+    session: AsyncSession,
+    statement: Select[Any],
+    *,
+    pk_column: InstrumentedAttribute[Any],
+    sort_column: InstrumentedAttribute[Any] | None = None,
+    descending: bool = False,
+    cursor: str | None = None,
+    skip: int = 0,
+    limit: int = 100,
+    count: CountMode = CountMode.exact,
+    options: Sequence[Any] = (),
+    rank: ColumnElement[Any] | None = None,
+) -> Page:
+    """
+    Fetch one page of the filtered ``statement`` along with its total.
+
+    ``options`` (eager loads) only go on the page query, never on the count.
+    ``rank`` orders search results by relevance when no sort column is asked
+    for. Relevance is not a stored column, so ranked pages take skip only.
+    """
+    if sort_column is not None:
+        # A sort column asked for wins over relevance
+        rank = None
+    if rank is not None:
+        if cursor:
+            raise HTTPException(
+                status_code=400,
+                detail="Cursor pagination is not available for search results ordered by relevance",
+            )
+        page_statement = statement.order_by(rank.desc(), pk_column.asc())
+    else:
+        page_statement = apply_keyset(
+            statement,
+            pk_column=pk_column,
+            sort_column=sort_column,
+            descending=descending,
+            cursor=cursor,
+        )
+    # A cursor replaces skip
+    if not cursor:
+        page_statement = page_statement.offset(skip)
+    page_statement = page_statement.options(*options).limit(limit)
+
+    data, total = await fetch_counted(
+        session, page_statement, statement, count=count, cursor=cursor, skip=skip
+    )
+
+    return Page(
+        data=data,
+        count=total,
+        count_mode=count,
+        next_cursor=None
+        if rank is not None
+        else next_cursor(
+            data, limit=limit, pk_column=pk_column, sort_column=sort_column
+        ),
+    )
@@ -0,0 +1,128 @@
+"""
+Claim based authorization.
+
+Tokens issued at login carry the user's role claims, grouped by claim type,
+and the user's ``permissions_version``. The checks below read the claims from
+the decoded token instead of joining ``UserRole`` and ``RoleClaims`` on every
+request. A token is only trusted while its version matches the user's, which
+role and claim changes bump. The user comes from the user cache, which every
+worker keeps current through ``app.core.user_invalidation``; while that
+listener is down the version is read from the database instead.
+
+Claims are ``(resource, action)`` pairs, e.g. ``("locations", "update")``.
+Superusers pass every check. Sync routes use ``require_claim``, async routes
+``require_claim_async``::
+
+    @router.post("/", dependencies=[Depends(require_claim_async("items", "create"))])
+    async def create_item(...): ...
+"""
+
+from collections.abc import Callable, Coroutine
+from typing import Any
+
+from fastapi import HTTPException, status
+from sqlmodel import col, select
+from sqlmodel.sql.expression import SelectOfScalar
+
+from app.api.deps import (
+    AsyncCurrentUser,
+    AsyncSessionDep,
+    CurrentUser,
+    SessionDep,
+    TokenPayloadDep,
+)
+from app.core.user_cache import user_cache
+from app.models import TokenPayload, User
+
+
+def has_claim(token_data: TokenPayload, claim_type: str, claim_value: str) -> bool:
+    return claim_value in (token_data.claims or {}).get(claim_type, [])
+
+
+def _cached_version_is_current() -> bool:
+    # Without the listener, a cached user may be USER_CACHE_TTL_SECONDS old
+    return user_cache.shared or not user_cache.enabled
+
+
+def _version_statement(user: User) -> SelectOfScalar[int]:
+    return select(col(User.permissions_version)).where(col(User.id) == user.id)
+
+
+def _check_claims(
+    token_data: TokenPayload,
+    permissions_version: int | None,
+    claims: tuple[tuple[str, str], ...],
+) -> None:
+    if token_data.permissions_version != permissions_version:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Permissions have changed, please log in again",
+        )
+    if not any(
+        has_claim(token_data, claim_type, claim_value)
+        for claim_type, claim_value in claims
+    ):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not enough permissions",
+        )
+
+
+def require_any_claim(*claims: tuple[str, str]) -> Callable[..., User]:
+    """
+    Dependency passing users holding any of the ``(type, value)`` claims.
+    """
+
+    def _require_any_claim(
+        current_user: CurrentUser, token_data: TokenPayloadDep, session: SessionDep
+    ) -> User:
+        if current_user.is_superuser:
+            return current_user
+        if _cached_version_is_current():
+            version: int | None = current_user.permissions_version
+        else:
+            version = session.exec(_version_statement(current_user)).first()
+        _check_claims(token_data, version, claims)
+        return current_user
+
+    return _require_any_claim
+
+
+def require_claim(claim_type: str, claim_value: str) -> Callable[..., User]:
+    """
+    Dependency passing users holding the claim ``claim_type: claim_value``.
+    """
+    return require_any_claim((claim_type, claim_value))
+
+
+def require_any_claim_async(
+    *claims: tuple[str, str],
+) -> Callable[..., Coroutine[Any, Any, User]]:
+    """
+    ``require_any_claim`` for async routes, on the request's AsyncSession.
+    """
+
+    async def _require_any_claim(
+        current_user: AsyncCurrentUser,
+        token_data: TokenPayloadDep,
+        session: AsyncSessionDep,
+    ) -> User:
+        if current_user.is_superuser:
+            return current_user
+        if _cached_version_is_current():
+            version: int | None = current_user.permissions_version
+        else:
+            version = (await session.exec(_version_statement(current_user))).first()
+        _check_claims(token_data, version, claims)
+        return current_user
+
+    return _require_any_claim
+
+
+def require_claim_async(
+    claim_type: str, claim_value: str
+) -> Callable[..., Coroutine[Any, Any, User]]:
+    """
+    ``require_claim`` for async routes, on the request's AsyncSession.
+    """
+    return require_any_claim_async((claim_type, claim_value))
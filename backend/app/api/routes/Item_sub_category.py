@@ -1,216 +1,251 @@
 import uuid
-from typing import Any
+from typing import Annotated, Any
 from sqlalchemy import or_
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, Body, HTTPException, Depends
+from fastapi.responses import StreamingResponse
 from sqlmodel import func, select
 from sqlalchemy.orm import joinedload
-from app.api.deps import CurrentUser, SessionDep
+from app.api.deps import AsyncCurrentUser, AsyncSessionDep, ReadSessionDep
+from app.api.permissions import require_claim_async
+from app.api.export import export_response
+from app.api.bulk import BulkWrite
+from app.api.listing import ListQuery
+from app.core.config import settings
+from app.api.pagination import paginate
+from app.api.search import pattern_condition
 
-from app.models import ItemSubCategory, ItemSubCategoriesPublic, ItemSubCategoryCreate, ItemSubCategoryPublic, ItemSubCategoryUpdate, Message, ItemSubCategoryWithCategory, ItemCategory
+from app.models import BulkResult, CountMode, ExportFormat, ItemSubCategory, ItemSubCategoriesPublic, ItemSubCategoryCreate, ItemSubCategoryPublic, ItemSubCategoryUpdate, Message, ItemSubCategoryWithCategory, ItemCategory
 
 router = APIRouter(prefix="/itemsSubCategory", tags=["ItemSubCategory"])
 
+
+
+def _category_matches(pattern: Any) -> Any:
+    # Sub-categories whose category name/code matches, through an indexed
+    # subquery rather than a join with ItemCategory
+    matching_categories = select(ItemCategory.item_category_id).where(
+        pattern_condition(pattern, ItemCategory.item_category_name, ItemCategory.item_category_code)
+    )
+    return ItemSubCategory.item_category_id.in_(matching_categories)
+
+
+# Declared once, the list statements are built on first use and reused.
+# Related category data is loaded up front, lazy loads are not available on an AsyncSession
+item_subcategories_query = ListQuery(
+    ItemSubCategory,
+    pk_column=ItemSubCategory.item_subcategory_id,
+    active=ItemSubCategory.item_subcategory_isactive,
+    search=(ItemSubCategory.item_subcategory_name, ItemSubCategory.item_subcategory_code),
+    related_search=_category_matches,
+    sortable=("item_subcategory_name", "item_subcategory_code"),
+    options=[joinedload(ItemSubCategory.category)],
+)
+ItemSubCategorySortField = item_subcategories_query.sort_fields
+item_subcategories_bulk = BulkWrite(
+    ItemSubCategory,
+    pk_column=ItemSubCategory.item_subcategory_id,
+    key=ItemSubCategory.item_subcategory_code,
+    active=ItemSubCategory.item_subcategory_isactive,
+    parent=(ItemSubCategory.item_category_id, ItemCategory.item_category_id),
+    parent_name="Parent category",
+    name="Item subcategory",
+)
+
 @router.get("/", response_model=ItemSubCategoriesPublic)
-def read_item_subcategories(
-    session: SessionDep, current_user: CurrentUser, skip: int = 0, limit: int = 100,search: str = None,
-    sortBy: str = None,
-    sortOrder: str = "asc"
+async def read_item_subcategories(
+    session: ReadSessionDep, current_user: AsyncCurrentUser, skip: int = 0, limit: int = 100,search: str = None,
+    sortBy: ItemSubCategorySortField | None = None,
+    sortOrder: str = "asc", cursor: str | None = None, count: CountMode = CountMode.exact
 ) -> Any:
     """
     Retrieve item subcategories.
     """
-   # Create base query
-    query = session.query(ItemSubCategory).filter(ItemSubCategory.item_subcategory_isactive == True)
-    
-    # Join with category table if searching by category properties
-    if search:
-        search_term = f"%{search}%"
-        # Join with ItemCategory to filter by category properties
-        query = query.join(ItemCategory, ItemSubCategory.item_category_id == ItemCategory.item_category_id)
-        query = query.filter(
-            or_(
-                ItemSubCategory.item_subcategory_name.ilike(search_term),
-                ItemSubCategory.item_subcategory_code.ilike(search_term),
-                ItemCategory.item_category_name.ilike(search_term),
-                ItemCategory.item_category_code.ilike(search_term),
-            )
-        )
-    
-    # Apply sorting
-    if sortBy:
-        # Check if sort column belongs to ItemSubCategory
-        if hasattr(ItemSubCategory, sortBy):
-            sort_column = getattr(ItemSubCategory, sortBy)
-            if sortOrder and sortOrder.lower() == "desc":
-                query = query.order_by(sort_column.desc())
-            else:
-                query = query.order_by(sort_column.asc())
-
-    # Get total count for pagination
-    total_count = query.count()
-
-    # Apply pagination to the query
-    query = query.offset(skip).limit(limit)
-
-    # Load related category data
-    subcategories = query.options(
-        joinedload(ItemSubCategory.category)
-    ).all()
-
-    return ItemSubCategoriesPublic(data=subcategories, count=total_count)
+    page = await item_subcategories_query.fetch(
+        session,
+        search=search,
+        sort_by=sortBy,
+        sort_order=sortOrder,
+        cursor=cursor,
+        skip=skip,
+        limit=limit,
+        count=count,
+    )
+    return ItemSubCategoriesPublic(**page)
+
+@router.get("/export")
+async def export_item_subcategories(
+    current_user: AsyncCurrentUser, format: ExportFormat = ExportFormat.csv, search: str = None,
+    sortBy: ItemSubCategorySortField | None = None, sortOrder: str = "asc"
+) -> StreamingResponse:
+    """
+    Stream every item subcategory the list would return as CSV or NDJSON.
+    """
+    return export_response(
+        item_subcategories_query,
+        ItemSubCategoryPublic,
+        format=format,
+        filename="item-subcategories",
+        search=search,
+        sort_by=sortBy,
+        sort_order=sortOrder,
+    )
 
 @router.get("/category/{category_id}", response_model=ItemSubCategoriesPublic)
-def read_item_subcategories_by_category(
-    session: SessionDep, current_user: CurrentUser, category_id: uuid.UUID, skip: int = 0, limit: int = 100
+async def read_item_subcategories_by_category(
+    session: ReadSessionDep, current_user: AsyncCurrentUser, category_id: uuid.UUID, skip: int = 0, limit: int = 100,
+    cursor: str | None = None, count: CountMode = CountMode.exact
 ) -> Any:
     """
     Retrieve item subcategories by category ID.
     """
     # Check if category exists
-    category = session.get(ItemCategory, category_id)
+    category = await session.get(ItemCategory, category_id)
     if not category:
         raise HTTPException(status_code=404, detail="Category not found")
-    
-    if current_user.is_superuser:
-        count_statement = select(func.count()).where(
-            ItemSubCategory.item_category_id == category_id
-        ).select_from(ItemSubCategory)
-        count = session.exec(count_statement).one()
-        
-        statement = select(ItemSubCategory).where(
-            ItemSubCategory.item_category_id == category_id
-        ).offset(skip).limit(limit)
-        item_subcategories = session.exec(statement).all()
-    else:
-        count_statement = select(func.count()).where(
-            (ItemSubCategory.item_category_id == category_id) &
-            (ItemSubCategory.item_subcategory_isactive == True)
-        ).select_from(ItemSubCategory)
-        count = session.exec(count_statement).one()
-        
-        statement = select(ItemSubCategory).where(
-            (ItemSubCategory.item_category_id == category_id) &
-            (ItemSubCategory.item_subcategory_isactive == True)
-        ).offset(skip).limit(limit)
-        item_subcategories = session.exec(statement).all()
-
-    return ItemSubCategoriesPublic(data=item_subcategories, count=count)
+
+    statement = select(ItemSubCategory).where(
+        ItemSubCategory.item_category_id == category_id
+    )
+    if not current_user.is_superuser:
+        statement = statement.where(ItemSubCategory.item_subcategory_isactive == True)
+
+    page = await paginate(
+        session,
+        statement,
+        pk_column=ItemSubCategory.item_subcategory_id,
+        cursor=cursor,
+        skip=skip,
+        limit=limit,
+        count=count,
+        options=[joinedload(ItemSubCategory.category)],
+    )
+    return ItemSubCategoriesPublic(**page)
 
 @router.get("/{id}", response_model=ItemSubCategoryWithCategory)
-def read_item_subcategory(
-    session: SessionDep, current_user: CurrentUser, id: uuid.UUID
+async def read_item_subcategory(
+    session: ReadSessionDep, current_user: AsyncCurrentUser, id: uuid.UUID
 ) -> Any:
     """
     Get a specific item subcategory by ID with its parent category.
     """
-    item_subcategory = session.get(ItemSubCategory, id)
+    item_subcategory = await session.get(
+        ItemSubCategory, id, options=[joinedload(ItemSubCategory.category)]
+    )
     if not item_subcategory:
         raise HTTPException(status_code=404, detail="Item subcategory not found")
-    
+
     if not current_user.is_superuser and not item_subcategory.item_subcategory_isactive:
         raise HTTPException(status_code=404, detail="Item subcategory not found")
-    
-    # Fetch the parent category
-    category = session.get(ItemCategory, item_subcategory.item_category_id)
-    
-    # Create the response with the category included
+
+    # Create the response with the parent category included
     response = ItemSubCategoryWithCategory.model_validate(item_subcategory)
-    response.category = category
-    
+    response.category = item_subcategory.category
+
     return response
 
-@router.post("/", response_model=ItemSubCategoryPublic)
-def create_item_subcategory(
-    *, session: SessionDep, current_user: CurrentUser, item_subcategory_in: ItemSubCategoryCreate
+@router.post("/", response_model=ItemSubCategoryPublic, dependencies=[Depends(require_claim_async("item_subcategories", "create"))])
+async def create_item_subcategory(
+    *, session: AsyncSessionDep, current_user: AsyncCurrentUser, item_subcategory_in: ItemSubCategoryCreate
 ) -> Any:
     """
     Create a new item subcategory.
     """
     # Verify the category exists
-    category = session.get(ItemCategory, item_subcategory_in.item_category_id)
+    category = await session.get(ItemCategory, item_subcategory_in.item_category_id)
     if not category:
         raise HTTPException(status_code=404, detail="Parent category not found")
-    
+
     # Check if a subcategory with the same code already exists
-    existing = session.exec(
+    existing = (await session.exec(
         select(ItemSubCategory).where(
             ItemSubCategory.item_subcategory_code == item_subcategory_in.item_subcategory_code
         )
-    ).first()
+    )).first()
     if existing:
         raise HTTPException(status_code=400, detail="Subcategory with this code already exists")
-    
+
     item_subcategory = ItemSubCategory.model_validate(
-        item_subcategory_in, 
+        item_subcategory_in,
         update={"created_by_id": current_user.id, "updated_by_id": current_user.id}
     )
-    
+    # The category was loaded above, attaching it saves a reload after commit
+    item_subcategory.category = category
+
     session.add(item_subcategory)
-    session.commit()
-    session.refresh(item_subcategory)
-    
+    await session.commit()
+
     return item_subcategory
 
-@router.put("/{id}", response_model=ItemSubCategoryPublic)
-def update_item_subcategory(
-    *, session: SessionDep, current_user: CurrentUser, id: uuid.UUID, item_subcategory_in: ItemSubCategoryUpdate
+@router.post("/bulk", response_model=BulkResult, dependencies=[Depends(require_claim_async("item_subcategories", "create")), Depends(require_claim_async("item_subcategories", "update"))])
+async def bulk_write_item_subcategories(
+    *,
+    session: AsyncSessionDep,
+    current_user: AsyncCurrentUser,
+    item_subcategories_in: Annotated[
+        list[ItemSubCategoryCreate], Body(min_length=1, max_length=settings.BULK_MAX_ROWS)
+    ],
+) -> Any:
+    """
+    Create item subcategories, updating those whose code already exists.
+    All rows are written in one transaction, or none when a row is rejected.
+    """
+    return await item_subcategories_bulk.write(session, item_subcategories_in, user=current_user)
+
+@router.put("/{id}", response_model=ItemSubCategoryPublic, dependencies=[Depends(require_claim_async("item_subcategories", "update"))])
+async def update_item_subcategory(
+    *, session: AsyncSessionDep, current_user: AsyncCurrentUser, id: uuid.UUID, item_subcategory_in: ItemSubCategoryUpdate
 ) -> Any:
     """
     Update an item subcategory.
     """
-    item_subcategory = session.get(ItemSubCategory, id)
+    item_subcategory = await session.get(
+        ItemSubCategory, id, options=[joinedload(ItemSubCategory.category)]
+    )
     if not item_subcategory:
         raise HTTPException(status_code=404, detail="Item subcategory not found")
-    
-    if not current_user.is_superuser:
-        raise HTTPException(status_code=400, detail="Not enough permission")
-    
+
     # If category is being updated, verify it exists
     if item_subcategory_in.item_category_id is not None:
-        category = session.get(ItemCategory, item_subcategory_in.item_category_id)
+        category = await session.get(ItemCategory, item_subcategory_in.item_category_id)
         if not category:
             raise HTTPException(status_code=404, detail="Parent category not found")
-    
+        item_subcategory.category = category
+
     # Check if code is being updated to one that already exists
     if item_subcategory_in.item_subcategory_code is not None and item_subcategory_in.item_subcategory_code != item_subcategory.item_subcategory_code:
-        existing = session.exec(
+        existing = (await session.exec(
             select(ItemSubCategory).where(
                 ItemSubCategory.item_subcategory_code == item_subcategory_in.item_subcategory_code
             )
-        ).first()
+        )).first()
         if existing:
             raise HTTPException(status_code=400, detail="Subcategory with this code already exists")
-    
+
     # Update the subcategory
     update_dict = item_subcategory_in.model_dump(exclude_unset=True)
     update_dict["updated_by_id"] = current_user.id
     item_subcategory.sqlmodel_update(update_dict)
-    
+
     session.add(item_subcategory)
-    session.commit()
-    session.refresh(item_subcategory)
-    
+    await session.commit()
+
     return item_subcategory
 
-@router.delete("/{id}", response_model=Message)
-def delete_item_subcategory(
-    session: SessionDep, current_user: CurrentUser, id: uuid.UUID
+@router.delete("/{id}", response_model=Message, dependencies=[Depends(require_claim_async("item_subcategories", "delete"))])
+async def delete_item_subcategory(
+    session: AsyncSessionDep, current_user: AsyncCurrentUser, id: uuid.UUID
 ) -> Message:
     """
     Soft delete an item subcategory.
     """
-    item_subcategory = session.get(ItemSubCategory, id)
+    item_subcategory = await session.get(ItemSubCategory, id)
     if not item_subcategory:
         raise HTTPException(status_code=404, detail="Item subcategory not found")
-    
-    if not current_user.is_superuser:
-        raise HTTPException(status_code=400, detail="Not enough permission")
-    
+
     # Soft delete by setting isactive to False
     item_subcategory.item_subcategory_isactive = False
-    
+
     session.add(item_subcategory)
-    session.commit()
-    session.refresh(item_subcategory)
-    
-    return Message(message="Item subcategory is deleted successfully")
\ No newline at end of file
+    await session.commit()
+
+    return Message(message="Item subcategory is deleted successfully")
@@ -1,12 +1,19 @@
 import uuid
 from datetime import datetime
-from typing import Any, List, Optional
+from typing import Annotated, Any, List, Optional
 
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, Body, HTTPException, Depends
+from fastapi.responses import StreamingResponse
 from sqlmodel import SQLModel, Field, Relationship, func, select
 
-from app.api.deps import CurrentUser, SessionDep
-from app.models import Courses, Message, CoursesCreate, CoursesPublic, CoursesPublicList, CoursesUpdate, Semesters
+from app.api.deps import AsyncCurrentUser, AsyncSessionDep, ReadSessionDep
+from app.api.permissions import require_claim_async
+from app.api.export import export_response
+from app.api.bulk import BulkWrite
+from app.api.listing import ListQuery
+from app.core.config import settings
+from app.api.pagination import paginate
+from app.models import BulkResult, CountMode, ExportFormat, Courses, Message, CoursesCreate, CoursesPublic, CoursesPublicList, CoursesUpdate, Semesters
 
 
 
@@ -14,162 +21,189 @@ from app.models import Courses, Message, CoursesCreate, CoursesPublic, CoursesPu
 
 router = APIRouter(prefix="/courses", tags=["Course"])
 
+# Declared once, the list statements are built on first use and reused
+courses_query = ListQuery(
+    Courses,
+    pk_column=Courses.course_id,
+    active=Courses.is_active,
+    search=(Courses.course_name, Courses.course_description),
+    sortable=("course_name",),
+)
+CoursesSortField = courses_query.sort_fields
+courses_bulk = BulkWrite(
+    Courses,
+    pk_column=Courses.course_id,
+    key=Courses.course_name,
+    active=Courses.is_active,
+    name="Course",
+)
+
 @router.get("/", response_model=CoursesPublicList)
-def read_courses(
-    session: SessionDep, current_user: CurrentUser, skip: int = 0, limit: int = 100, search: str = None,
-    sortBy: str = None, sortOrder: str = "asc", semester_id: uuid.UUID = None
+async def read_courses(
+    session: ReadSessionDep, current_user: AsyncCurrentUser, skip: int = 0, limit: int = 100, search: str = None,
+    sortBy: CoursesSortField | None = None, sortOrder: str = "asc", cursor: str | None = None, count: CountMode = CountMode.exact
 ) -> Any:
     """
-    Retrieve courses with optional filtering by semester.
-    """
-    query = session.query(Courses).filter(Courses.is_active == True)
-    
-    # Filter by semester if provided
-    if semester_id:
-        query = query.filter(Courses.semester_id == semester_id)
-    
-    # Search by name or description
-    if search:
-        search_term = f"%{search}%"
-        query = query.filter(
-            (Courses.course_name.ilike(search_term)) | 
-            (Courses.course_description.ilike(search_term))
-        )
-
-    # Sorting
-    if sortBy:
-        sort_column = getattr(Courses, sortBy, None)
-        if sort_column:
-            if sortOrder and sortOrder.lower() == "desc":
-                query = query.order_by(sort_column.desc())
-            else:
-                query = query.order_by(sort_column.asc())
-    
-    # Get total count for pagination
-    total_count = query.count()
-    
-    # Apply pagination
-    items = query.offset(skip).limit(limit).all()
-    return CoursesPublicList(data=items, count=total_count)
-
-@router.post("/", response_model=CoursesPublic)
-def create_course(*, session: SessionDep, current_user: CurrentUser, course_in: CoursesCreate) -> Any:
+    Retrieve courses.
+    """
+    page = await courses_query.fetch(
+        session,
+        search=search,
+        sort_by=sortBy,
+        sort_order=sortOrder,
+        cursor=cursor,
+        skip=skip,
+        limit=limit,
+        count=count,
+    )
+    return CoursesPublicList(**page)
+
+@router.get("/export")
+async def export_courses(
+    current_user: AsyncCurrentUser, format: ExportFormat = ExportFormat.csv, search: str = None,
+    sortBy: CoursesSortField | None = None, sortOrder: str = "asc"
+) -> StreamingResponse:
+    """
+    Stream every course the list would return as CSV or NDJSON.
+    """
+    return export_response(
+        courses_query,
+        CoursesPublic,
+        format=format,
+        filename="courses",
+        search=search,
+        sort_by=sortBy,
+        sort_order=sortOrder,
+    )
+
+@router.post("/", response_model=CoursesPublic, dependencies=[Depends(require_claim_async("courses", "create"))])
+async def create_course(*, session: AsyncSessionDep, current_user: AsyncCurrentUser, course_in: CoursesCreate) -> Any:
     """
     Create a new course associated with a semester.
     """
     # Verify the semester exists
-    semester = session.get(Semesters, course_in.semester_id)
+    semester = await session.get(Semesters, course_in.semester_id)
     if not semester:
         raise HTTPException(status_code=404, detail="Semester not found")
-    
+
     # Verify the semester is active
     if not semester.is_active:
         raise HTTPException(status_code=400, detail="Cannot add course to an inactive semester")
-    
+
     # Create the course
     course = Courses.model_validate(
-        course_in, 
+        course_in,
         update={
-            "created_by_id": current_user.id, 
+            "created_by_id": current_user.id,
             "updated_by_id": current_user.id
         }
     )
     session.add(course)
-    session.commit()
-    session.refresh(course)
+    await session.commit()
     return course
 
-@router.put("/{id}", response_model=CoursesPublic)
-def update_course(*, session: SessionDep, current_user: CurrentUser, id: uuid.UUID, course_in: CoursesUpdate) -> Any:
+@router.post("/bulk", response_model=BulkResult, dependencies=[Depends(require_claim_async("courses", "create")), Depends(require_claim_async("courses", "update"))])
+async def bulk_write_courses(
+    *,
+    session: AsyncSessionDep,
+    current_user: AsyncCurrentUser,
+    courses_in: Annotated[
+        list[CoursesCreate], Body(min_length=1, max_length=settings.BULK_MAX_ROWS)
+    ],
+) -> Any:
+    """
+    Create courses, updating those whose name already exists.
+    All rows are written in one transaction, or none when a row is rejected.
+    """
+    return await courses_bulk.write(session, courses_in, user=current_user)
+
+@router.put("/{id}", response_model=CoursesPublic, dependencies=[Depends(require_claim_async("courses", "update"))])
+async def update_course(*, session: AsyncSessionDep, current_user: AsyncCurrentUser, id: uuid.UUID, course_in: CoursesUpdate) -> Any:
     """
     Update a course.
     """
-    course = session.get(Courses, id)
+    course = await session.get(Courses, id)
     if not course:
         raise HTTPException(status_code=404, detail="Course not found")
-    
-    if not current_user.is_superuser:
-        raise HTTPException(status_code=400, detail="Not enough permission")
-    
+
     update_dict = course_in.model_dump(exclude_unset=True)
-    
+
     # If semester_id is being updated, verify the new semester exists and is active
     if "semester_id" in update_dict:
-        semester = session.get(Semesters, update_dict["semester_id"])
+        semester = await session.get(Semesters, update_dict["semester_id"])
         if not semester:
             raise HTTPException(status_code=404, detail="Semester not found")
         if not semester.is_active:
             raise HTTPException(status_code=400, detail="Cannot move course to an inactive semester")
-    
+
     # Add update timestamp and user
     update_dict["updated_at"] = datetime.now()
     update_dict["updated_by_id"] = current_user.id
-    
+
     course.sqlmodel_update(update_dict)
     session.add(course)
-    session.commit()
-    session.refresh(course)
+    await session.commit()
     return course
 
 @router.get("/{id}", response_model=CoursesPublic)
-def read_course(*, session: SessionDep, current_user: CurrentUser, id: uuid.UUID) -> Any:
+async def read_course(*, session: ReadSessionDep, current_user: AsyncCurrentUser, id: uuid.UUID) -> Any:
     """
     Get course by ID.
     """
-    course = session.get(Courses, id)
+    course = await session.get(Courses, id)
     if not course:
         raise HTTPException(status_code=404, detail="Course not found")
-    
+
     if not current_user.is_superuser and not course.is_active:
         raise HTTPException(status_code=400, detail="Not enough permission")
-    
+
     return course
 
 @router.get("/semester/{semester_id}", response_model=CoursesPublicList)
-def read_courses_by_semester(
-    *, session: SessionDep, current_user: CurrentUser, semester_id: uuid.UUID, 
-    skip: int = 0, limit: int = 100
+async def read_courses_by_semester(
+    *, session: ReadSessionDep, current_user: AsyncCurrentUser, semester_id: uuid.UUID,
+    skip: int = 0, limit: int = 100, cursor: str | None = None, count: CountMode = CountMode.exact
 ) -> Any:
     """
     Get all courses for a specific semester.
     """
     # Verify the semester exists
-    semester = session.get(Semesters, semester_id)
+    semester = await session.get(Semesters, semester_id)
     if not semester:
         raise HTTPException(status_code=404, detail="Semester not found")
-    
+
     # Get active courses for this semester
-    query = session.query(Courses).filter(
+    query = select(Courses).where(
         Courses.semester_id == semester_id,
         Courses.is_active == True
     )
-    
-    # Get total count for pagination
-    total_count = query.count()
-    
-    # Apply pagination
-    items = query.offset(skip).limit(limit).all()
-    return CoursesPublicList(data=items, count=total_count)
-
-@router.delete("/{id}")
-def delete_course(
-    session: SessionDep, current_user: CurrentUser, id: uuid.UUID
+
+    page = await paginate(
+        session,
+        query,
+        pk_column=Courses.course_id,
+        cursor=cursor,
+        skip=skip,
+        limit=limit,
+        count=count,
+    )
+    return CoursesPublicList(**page)
+
+@router.delete("/{id}", dependencies=[Depends(require_claim_async("courses", "delete"))])
+async def delete_course(
+    session: AsyncSessionDep, current_user: AsyncCurrentUser, id: uuid.UUID
 ) -> Message:
     """
     Delete a course (soft delete by setting is_active to False).
     """
-    course = session.get(Courses, id)
+    course = await session.get(Courses, id)
     if not course:
         raise HTTPException(status_code=404, detail="Course not found")
-    
-    if not current_user.is_superuser:
-        raise HTTPException(status_code=400, detail="Not enough permission")
-    
+
     course.is_active = False
     course.updated_at = datetime.now()
     course.updated_by_id = current_user.id
-    
+
     session.add(course)
-    session.commit()
-    session.refresh(course)
-    return Message(message="Course is deleted successfully")
\ No newline at end of file
+    await session.commit()
+    return Message(message="Course is deleted successfully")
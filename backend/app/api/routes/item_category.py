@@ -1,99 +1,132 @@
 import uuid
-from typing import Any
+from typing import Annotated, Any
 from sqlalchemy import or_
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, Depends, Body, HTTPException
+from fastapi.responses import StreamingResponse
 from sqlmodel import func, select
 
-from app.api.deps import CurrentUser, SessionDep
+from app.api.deps import AsyncCurrentUser, AsyncSessionDep, ReadSessionDep
+from app.api.permissions import require_claim_async
+from app.api.etag import TableETag
+from app.api.export import export_response
+from app.api.bulk import BulkWrite
+from app.api.listing import ListQuery
+from app.core.config import settings
 
-from app.models import ItemCategory, ItemCategoriesPublic, ItemCategoryCreate, ItemCategoryPublic, ItemCategoryUpdate, Message
+from app.models import BulkResult, CountMode, ExportFormat, ItemCategory, ItemCategoriesPublic, ItemCategoryCreate, ItemCategoryPublic, ItemCategoryUpdate, Message
 
 router = APIRouter(prefix="/itemsCategory", tags=["ItemCategory"])
 
-@router.get("/", response_model=ItemCategoriesPublic)
-def read_item_Categories(
-    session: SessionDep, current_user: CurrentUser, skip: int = 0, limit: int = 100,search: str = None,
-    sortBy: str = None,
-    sortOrder: str = "asc"
+# Declared once, the list statements are built on first use and reused
+item_categories_query = ListQuery(
+    ItemCategory,
+    pk_column=ItemCategory.item_category_id,
+    active=ItemCategory.item_category_isactive,
+    search=(ItemCategory.item_category_name, ItemCategory.item_category_code),
+    sortable=("item_category_name", "item_category_code"),
+)
+ItemCategorySortField = item_categories_query.sort_fields
+item_categories_bulk = BulkWrite(
+    ItemCategory,
+    pk_column=ItemCategory.item_category_id,
+    key=ItemCategory.item_category_code,
+    active=ItemCategory.item_category_isactive,
+    name="Item category",
+)
+item_categories_etag = TableETag(ItemCategory)
+
+@router.get("/", response_model=ItemCategoriesPublic, dependencies=[Depends(item_categories_etag)])
+async def read_item_Categories(
+    session: ReadSessionDep, current_user: AsyncCurrentUser, skip: int = 0, limit: int = 100,search: str = None,
+    sortBy: ItemCategorySortField | None = None,
+    sortOrder: str = "asc", cursor: str | None = None, count: CountMode = CountMode.exact
 ) -> Any:
     """
     Retrieve items.
     """
-    query = session.query(ItemCategory).filter(ItemCategory.item_category_isactive == True)
-
-    
-    # Apply search filter if provided
-    if search:
-        search_term = f"%{search}%"
-        query = query.filter(
-            or_(
-                ItemCategory.item_category_name.ilike(search_term),
-                ItemCategory.item_category_code.ilike(search_term),
-            )
-        )
-    
-    # Apply sorting if provided
-    if sortBy:
-        # Get the column to sort by
-        sort_column = getattr(ItemCategory, sortBy, None)
-        if sort_column:
-            if sortOrder and sortOrder.lower() == "desc":
-                query = query.order_by(sort_column.desc())
-            else:
-                query = query.order_by(sort_column.asc())
-    
-    # Get total count for pagination
-    total_count = query.count()
-    
-    # Apply pagination
-    items = query.offset(skip).limit(limit).all()
+    page = await item_categories_query.fetch(
+        session,
+        search=search,
+        sort_by=sortBy,
+        sort_order=sortOrder,
+        cursor=cursor,
+        skip=skip,
+        limit=limit,
+        count=count,
+    )
+    return ItemCategoriesPublic(**page)
 
-    return ItemCategoriesPublic(data=items, count=total_count)
+@router.get("/export")
+async def export_item_categories(
+    current_user: AsyncCurrentUser, format: ExportFormat = ExportFormat.csv, search: str = None,
+    sortBy: ItemCategorySortField | None = None, sortOrder: str = "asc"
+) -> StreamingResponse:
+    """
+    Stream every item category the list would return as CSV or NDJSON.
+    """
+    return export_response(
+        item_categories_query,
+        ItemCategoryPublic,
+        format=format,
+        filename="item-categories",
+        search=search,
+        sort_by=sortBy,
+        sort_order=sortOrder,
+    )
 
-@router.post("/", response_model=ItemCategoryPublic)
-def create_ItemCategory( *, session: SessionDep, current_user: CurrentUser,  item_Category_in: ItemCategoryCreate) -> Any:
+@router.post("/", response_model=ItemCategoryPublic, dependencies=[Depends(require_claim_async("item_categories", "create"))])
+async def create_ItemCategory( *, session: AsyncSessionDep, current_user: AsyncCurrentUser,  item_Category_in: ItemCategoryCreate) -> Any:
     """
         Create Item Category
     """
     item_category = ItemCategory.model_validate(item_Category_in, update={"created_by_id": current_user.id, "updated_by_id": current_user.id})
     session.add(item_category)
-    session.commit()
-    session.refresh(item_category)
+    await session.commit()
     return item_category
 
-@router.put("/{id}", response_model=ItemCategoryPublic)
-def update_ItemCatergory(*,
-    session: SessionDep,
-    current_user: CurrentUser, id:uuid.UUID, item_categeory_in:ItemCategoryUpdate) -> Any:
+@router.post("/bulk", response_model=BulkResult, dependencies=[Depends(require_claim_async("item_categories", "create")), Depends(require_claim_async("item_categories", "update"))])
+async def bulk_write_item_categories(
+    *,
+    session: AsyncSessionDep,
+    current_user: AsyncCurrentUser,
+    item_categories_in: Annotated[
+        list[ItemCategoryCreate], Body(min_length=1, max_length=settings.BULK_MAX_ROWS)
+    ],
+) -> Any:
+    """
+    Create item categories, updating those whose code already exists.
+    All rows are written in one transaction, or none when a row is rejected.
+    """
+    return await item_categories_bulk.write(session, item_categories_in, user=current_user)
+
+@router.put("/{id}", response_model=ItemCategoryPublic, dependencies=[Depends(require_claim_async("item_categories", "update"))])
+async def update_ItemCatergory(*,
+    session: AsyncSessionDep,
+    current_user: AsyncCurrentUser, id:uuid.UUID, item_categeory_in:ItemCategoryUpdate) -> Any:
     """
-        Update Item Category 
+        Update Item Category
     """
-    item_categeory = session.get(ItemCategory,id)
+    item_categeory = await session.get(ItemCategory,id)
     if not item_categeory:
         raise HTTPException(status_code = 404, detail="Item Category not Found")
-    if not current_user.is_superuser:
-        raise HTTPException(status_code=400, detail="Not enough permission")
     update_dict = item_categeory_in.model_dump(exclude_unset=True)
     item_categeory.sqlmodel_update(update_dict)
     session.add(item_categeory)
-    session.commit()
-    session.refresh(item_categeory)
+    await session.commit()
     return item_categeory
 
 
-@router.delete("/{id}", response_model=Message)
-def delete_item(
-    session: SessionDep, current_user: CurrentUser, id: uuid.UUID
+@router.delete("/{id}", response_model=Message, dependencies=[Depends(require_claim_async("item_categories", "delete"))])
+async def delete_item(
+    session: AsyncSessionDep, current_user: AsyncCurrentUser, id: uuid.UUID
 ) -> Message:
     """
         Delete Item Category
     """
-    item_Category = session.get(ItemCategory, id)
+    item_Category = await session.get(ItemCategory, id)
     if not item_Category:
         raise HTTPException(status_code = 404, detail="Item Category not Found")
-    if not current_user.is_superuser:
-        raise HTTPException(status_code=400, detail="Not enough permission")
     item_Category.item_category_isactive = False
     session.add(item_Category)
-    session.commit()
-    return Message(message="ItemCategory is deleted sucessfully")
\ No newline at end of file
+    await session.commit()
+    return Message(message="ItemCategory is deleted sucessfully")
@@ -1,99 +1,140 @@
 import uuid
-from typing import Any
+from typing import Annotated, Any
 
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, Depends, Body, HTTPException
+from fastapi.responses import StreamingResponse
 from sqlmodel import func, select
 
-from app.api.deps import CurrentUser, SessionDep
-from app.models import LocationsBase, LocationsCreate, LocationsPublic, LocationsUpdate, Locations, Message, LocationsPublicList, Message
+from app.api.deps import AsyncCurrentUser, AsyncSessionDep, ReadSessionDep
+from app.api.permissions import require_claim_async
+from app.api.etag import TableETag
+from app.api.export import export_response
+from app.api.bulk import BulkWrite
+from app.api.listing import ListQuery
+from app.core.config import settings
+from app.models import BulkResult, CountMode, ExportFormat, LocationsBase, LocationsCreate, LocationsPublic, LocationsUpdate, Locations, Message, LocationsPublicList, Message
 
 router = APIRouter(prefix="/locations", tags=["Location"])
 
-@router.get("/", response_model=LocationsPublicList)
-def read_locations(
-    session: SessionDep, current_user: CurrentUser, skip: int = 0, limit: int = 100, search: str = None,
-    sortBy: str = None,
-    sortOrder: str = "asc"
+# Declared once, the list statements are built on first use and reused
+locations_query = ListQuery(
+    Locations,
+    pk_column=Locations.location_id,
+    active=Locations.location_is_active,
+    search=(Locations.location_name,),
+    sortable=("location_name",),
+)
+LocationsSortField = locations_query.sort_fields
+locations_bulk = BulkWrite(
+    Locations,
+    pk_column=Locations.location_id,
+    key=Locations.location_name,
+    active=Locations.location_is_active,
+    name="Location",
+)
+locations_etag = TableETag(Locations)
+
+@router.get("/", response_model=LocationsPublicList, dependencies=[Depends(locations_etag)])
+async def read_locations(
+    session: ReadSessionDep, current_user: AsyncCurrentUser, skip: int = 0, limit: int = 100, search: str = None,
+    sortBy: LocationsSortField | None = None,
+    sortOrder: str = "asc", cursor: str | None = None, count: CountMode = CountMode.exact
 ) -> Any:
     """
     Retrieve locations.
     """
-    query = session.query(Locations).filter(Locations.location_is_active == True)
-    if search:
-        search_term = f"%{search}%"
-        query = query.filter(
-            Locations.location_name.ilike(search_term)
-        )
+    page = await locations_query.fetch(
+        session,
+        search=search,
+        sort_by=sortBy,
+        sort_order=sortOrder,
+        cursor=cursor,
+        skip=skip,
+        limit=limit,
+        count=count,
+    )
+    return LocationsPublicList(**page)
 
-    if sortBy:
-        sort_column = getattr(Locations, sortBy, None)
-        if sort_column:
-            if sortOrder and sortOrder.lower() == "desc":
-                query = query.order_by(sort_column.desc())
-            else:
-                query = query.order_by(sort_column.asc())
-    
-    # Get total count for pagination
-    total_count = query.count()
-    
-    # Apply pagination
-    items = query.offset(skip).limit(limit).all()
-    return LocationsPublicList(data=items, count=total_count)
+@router.get("/export")
+async def export_locations(
+    current_user: AsyncCurrentUser, format: ExportFormat = ExportFormat.csv, search: str = None,
+    sortBy: LocationsSortField | None = None, sortOrder: str = "asc"
+) -> StreamingResponse:
+    """
+    Stream every location the list would return as CSV or NDJSON.
+    """
+    return export_response(
+        locations_query,
+        LocationsPublic,
+        format=format,
+        filename="locations",
+        search=search,
+        sort_by=sortBy,
+        sort_order=sortOrder,
+    )
 
-@router.post("/", response_model=LocationsPublic)
-def create_location(*, session: SessionDep, current_user: CurrentUser, location_in: LocationsCreate) -> Any:
+@router.post("/", response_model=LocationsPublic, dependencies=[Depends(require_claim_async("locations", "create"))])
+async def create_location(*, session: AsyncSessionDep, current_user: AsyncCurrentUser, location_in: LocationsCreate) -> Any:
     """
     Create a new location.
     """
     location = Locations.model_validate(location_in, update={"created_by_id": current_user.id, "updated_by_id": current_user.id})
     session.add(location)
-    session.commit()
-    session.refresh(location)
+    await session.commit()
     return location
 
-@router.put("/{id}", response_model=LocationsPublic)
-def update_location(*, session: SessionDep, current_user: CurrentUser, id: uuid.UUID, location_in: LocationsUpdate) -> Any:
+@router.post("/bulk", response_model=BulkResult, dependencies=[Depends(require_claim_async("locations", "create")), Depends(require_claim_async("locations", "update"))])
+async def bulk_write_locations(
+    *,
+    session: AsyncSessionDep,
+    current_user: AsyncCurrentUser,
+    locations_in: Annotated[
+        list[LocationsCreate], Body(min_length=1, max_length=settings.BULK_MAX_ROWS)
+    ],
+) -> Any:
+    """
+    Create locations, updating those whose name already exists.
+    All rows are written in one transaction, or none when a row is rejected.
+    """
+    return await locations_bulk.write(session, locations_in, user=current_user)
+
+@router.put("/{id}", response_model=LocationsPublic, dependencies=[Depends(require_claim_async("locations", "update"))])
+async def update_location(*, session: AsyncSessionDep, current_user: AsyncCurrentUser, id: uuid.UUID, location_in: LocationsUpdate) -> Any:
     """
     Update a location.
     """
-    location = session.get(Locations, id)
+    location = await session.get(Locations, id)
     if not location:
         raise HTTPException(status_code=404, detail="Location not found")
-    if not current_user.is_superuser:
-        raise HTTPException(status_code=400, detail="Not enough permission")
     update_dict = location_in.model_dump(exclude_unset=True)
     location.sqlmodel_update(update_dict)
     session.add(location)
-    session.commit()
-    session.refresh(location)
+    await session.commit()
     return location
 
-@router.get("/{id}", response_model=LocationsPublic)
-def read_location(*, session: SessionDep, current_user: CurrentUser, id: uuid.UUID) -> Any:
+@router.get("/{id}", response_model=LocationsPublic, dependencies=[Depends(locations_etag)])
+async def read_location(*, session: ReadSessionDep, current_user: AsyncCurrentUser, id: uuid.UUID) -> Any:
     """
     Get location by ID.
     """
-    location = session.get(Locations, id)
+    location = await session.get(Locations, id)
     if not location:
         raise HTTPException(status_code=404, detail="Location not found")
     if not current_user.is_superuser and not location.location_is_active:
         raise HTTPException(status_code=400, detail="Not enough permission")
     return location
 
-@router.delete("/{id}")
-def delete_location(
-    session: SessionDep, current_user: CurrentUser, id: uuid.UUID
+@router.delete("/{id}", dependencies=[Depends(require_claim_async("locations", "delete"))])
+async def delete_location(
+    session: AsyncSessionDep, current_user: AsyncCurrentUser, id: uuid.UUID
 ) -> Message:
     """
     Delete a location (soft delete by setting location_is_active to False).
     """
-    location = session.get(Locations, id)
+    location = await session.get(Locations, id)
     if not location:
         raise HTTPException(status_code=404, detail="Location not found")
-    if not current_user.is_superuser:
-        raise HTTPException(status_code=400, detail="Not enough permission")
     location.location_is_active = False
     session.add(location)
-    session.commit()
-    session.refresh(location)
-    return Message(message="Location is deleted successfully")
\ No newline at end of file
+    await session.commit()
+    return Message(message="Location is deleted successfully")
@@ -1,7 +1,8 @@
-from datetime import timedelta
+import math
+from datetime import datetime
 from typing import Annotated, Any
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request
 from fastapi.responses import HTMLResponse
 from fastapi.security import OAuth2PasswordRequestForm
 
@@ -9,25 +10,56 @@ from app import crud
 from app.api.deps import CurrentUser, SessionDep, get_current_active_superuser
 from app.core import security
 from app.core.config import settings
+from app.core.rate_limit import (
+    RateLimiter,
+    login_email_limiter,
+    login_ip_limiter,
+    recovery_email_limiter,
+    recovery_ip_limiter,
+)
 from app.core.security import get_password_hash
-from app.models import Message, NewPassword, Token, UserPublic
+from app.core.user_invalidation import drop_cached_users
+from app.models import Message, NewPassword, RefreshTokenRequest, Token, UserPublic
 from app.utils import (
     generate_password_reset_token,
     generate_reset_password_email,
-    send_email,
     verify_password_reset_token,
 )
 
 router = APIRouter(tags=["login"])
 
 
+def throttle(
+    request: Request, email: str, email_limiter: RateLimiter, ip_limiter: RateLimiter
+) -> None:
+    """
+    Answer 429 once the email or the client address made too many attempts,
+    before any lookup or hashing is done for this one.
+    """
+    # The client's own address when behind Traefik: uvicorn takes it from
+    # X-Forwarded-For for requests coming from FORWARDED_ALLOW_IPS
+    client_ip = request.client.host if request.client else "unknown"
+    retry_after = ip_limiter.hit(client_ip)
+    if retry_after is None:
+        retry_after = email_limiter.hit(email.lower())
+    if retry_after is not None:
+        raise HTTPException(
+            status_code=429,
+            detail="Too many attempts, please try again later",
+            headers={"Retry-After": str(math.ceil(retry_after))},
+        )
+
+
 @router.post("/login/access-token")
 def login_access_token(
-    session: SessionDep, form_data: Annotated[OAuth2PasswordRequestForm, Depends()]
+    request: Request,
+    session: SessionDep,
+    form_data: Annotated[OAuth2PasswordRequestForm, Depends()],
 ) -> Token:
     """
     OAuth2 compatible token login, get an access token for future requests
     """
+    throttle(request, form_data.username, login_email_limiter, login_ip_limiter)
     user = crud.authenticate(
         session=session, email=form_data.username, password=form_data.password
     )
@@ -35,11 +67,46 @@ def login_access_token(
         raise HTTPException(status_code=400, detail="Incorrect email or password")
     elif not user.is_active:
         raise HTTPException(status_code=400, detail="Inactive user")
-    access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
+    permissions = security.get_permissions(session, user)
     return Token(
-        access_token=security.create_access_token(
-            user.id, expires_delta=access_token_expires, session=session
+        access_token=security.encode_access_token(user, permissions),
+        refresh_token=crud.create_refresh_token(
+            session=session, user=user, permissions=permissions
+        ),
+    )
+
+
+@router.post("/login/refresh-token")
+def refresh_access_token(session: SessionDep, body: RefreshTokenRequest) -> Token:
+    """
+    Exchange a refresh token for a new access token and refresh token
+    """
+    found = crud.get_refresh_token(session=session, token=body.refresh_token)
+    if not found:
+        raise HTTPException(status_code=401, detail="Invalid refresh token")
+    refresh_token, user = found
+    if refresh_token.expires_at <= datetime.utcnow() or not user.is_active:
+        raise HTTPException(status_code=401, detail="Invalid refresh token")
+    if not crud.revoke_refresh_token(session=session, refresh_token=refresh_token):
+        # Already used: whoever else holds a copy loses the whole chain too
+        crud.revoke_refresh_token_family(
+            session=session, family_id=refresh_token.family_id
         )
+        raise HTTPException(status_code=401, detail="Invalid refresh token")
+    # Roles and claims are only rebuilt when they changed since the login
+    if refresh_token.permissions_version == user.permissions_version:
+        permissions = refresh_token.permissions
+    else:
+        permissions = security.get_permissions(session, user)
+    return Token(
+        access_token=security.encode_access_token(user, permissions),
+        refresh_token=crud.create_refresh_token(
+            session=session,
+            user=user,
+            permissions=permissions,
+            family_id=refresh_token.family_id,
+            expires_at=refresh_token.expires_at,
+        ),
     )
 
 
@@ -52,10 +119,11 @@ def test_token(current_user: CurrentUser) -> Any:
 
 
 @router.post("/password-recovery/{email}")
-def recover_password(email: str, session: SessionDep) -> Message:
+def recover_password(request: Request, email: str, session: SessionDep) -> Message:
     """
     Password Recovery
     """
+    throttle(request, email, recovery_email_limiter, recovery_ip_limiter)
     user = crud.get_user_by_email(session=session, email=email)
 
     if not user:
@@ -63,15 +131,19 @@ def recover_password(email: str, session: SessionDep) -> Message:
             status_code=404,
             detail="The user with this email does not exist in the system.",
         )
-    password_reset_token = generate_password_reset_token(email=email)
-    email_data = generate_reset_password_email(
-        email_to=user.email, email=email, token=password_reset_token
-    )
-    send_email(
-        email_to=user.email,
-        subject=email_data.subject,
-        html_content=email_data.html_content,
-    )
+    # Nothing could ever send it
+    if settings.emails_enabled:
+        password_reset_token = generate_password_reset_token(email=email)
+        email_data = generate_reset_password_email(
+            email_to=user.email, email=email, token=password_reset_token
+        )
+        crud.enqueue_email(
+            session=session,
+            email_to=user.email,
+            subject=email_data.subject,
+            html_content=email_data.html_content,
+        )
+        session.commit()
     return Message(message="Password recovery email sent")
 
 
@@ -94,6 +166,9 @@ def reset_password(session: SessionDep, body: NewPassword) -> Message:
     hashed_password = get_password_hash(password=body.new_password)
     user.hashed_password = hashed_password
     session.add(user)
+    # Sessions opened with the old password end with it
+    crud.revoke_user_refresh_tokens(session=session, user_id=user.id)
+    drop_cached_users(session, [user.id])
     session.commit()
     return Message(message="Password updated successfully")
 
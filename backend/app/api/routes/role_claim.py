@@ -3,27 +3,44 @@ from typing import Any, List
 from datetime import datetime
 from sqlalchemy import or_
 from fastapi import APIRouter, HTTPException, Depends, Query
+from fastapi.responses import StreamingResponse
 from sqlmodel import func, select, Session
 
-from app.api.deps import CurrentUser, SessionDep
+from app import crud
+from app.api.deps import AsyncCurrentUser, CurrentUser, ReadSessionDep, SessionDep
+from app.api.permissions import require_claim
+from app.api.export import export_response
+from app.api.listing import ListQuery
 
 from app.models import (
-    RoleClaims, RolesClaimsCreate, RolesClaimsUpdate, RolesClaimsPublicList,
+    CountMode, ExportFormat, RoleClaims, RolesClaimsCreate, RolesClaimsUpdate, RolesClaimsPublicList,
     RolesClaimsPublic, Roles, Message
 )
 
 router = APIRouter(prefix="/role-claims", tags=["RoleClaims"])
 
+# Declared once, the list statements are built on first use and reused
+role_claims_query = ListQuery(
+    RoleClaims,
+    pk_column=RoleClaims.role_claim_id,
+    active=RoleClaims.role_claim_isactive,
+    search=(RoleClaims.role_claim_type, RoleClaims.role_claim_value),
+    sortable=("role_claim_type", "role_claim_value"),
+)
+RoleClaimsSortField = role_claims_query.sort_fields
+
 
 @router.get("/", response_model=RolesClaimsPublicList)
-def read_role_claims(
-    session: SessionDep, 
-    current_user: CurrentUser,
+async def read_role_claims(
+    session: ReadSessionDep,
+    current_user: AsyncCurrentUser,
     skip: int = 0, 
     limit: int = 100,
     search: str = None,
-    sortBy: str = None,
-    sortOrder: str = "asc"
+    sortBy: RoleClaimsSortField | None = None,
+    sortOrder: str = "asc",
+    cursor: str | None = None,
+    count: CountMode = CountMode.exact
 ) -> Any:
     """
     Retrieve role claims with optional filtering by role_id.
@@ -31,35 +48,40 @@ def read_role_claims(
     if not current_user.is_superuser:
         raise HTTPException(status_code=403, detail="Not enough permissions")
         
-    query = session.query(RoleClaims).filter(RoleClaims.role_claim_isactive == True)
-    
-    if search:
-        search_term = f"%{search}%"
-        query = query.filter(
-            or_(
-                RoleClaims.role_claim_type.ilike(search_term),
-                RoleClaims.role_claim_value.ilike(search_term)
-            )
-
-        )
-    if sortBy:
-        if hasattr(RoleClaims, sortBy):
-            sort_column = getattr(RoleClaims, sortBy)
-            if sortOrder and sortOrder.lower() == "desc":
-                query = query.order_by(sort_column.desc())
-            else:
-                query = query.order_by(sort_column.asc())
-
-    # Get total count for pagination
-    total_count = query.count()
-
-    # Apply pagination to the query
-    query = query.offset(skip).limit(limit).all()
+    page = await role_claims_query.fetch(
+        session,
+        search=search,
+        sort_by=sortBy,
+        sort_order=sortOrder,
+        cursor=cursor,
+        skip=skip,
+        limit=limit,
+        count=count,
+    )
+    return RolesClaimsPublicList(**page)
 
-    return RolesClaimsPublicList(data=query, count=total_count)
+@router.get("/export")
+async def export_role_claims(
+    current_user: AsyncCurrentUser, format: ExportFormat = ExportFormat.csv, search: str = None,
+    sortBy: RoleClaimsSortField | None = None, sortOrder: str = "asc"
+) -> StreamingResponse:
+    """
+    Stream every role claim the list would return as CSV or NDJSON.
+    """
+    if not current_user.is_superuser:
+        raise HTTPException(status_code=403, detail="Not enough permissions")
+    return export_response(
+        role_claims_query,
+        RolesClaimsPublic,
+        format=format,
+        filename="role-claims",
+        search=search,
+        sort_by=sortBy,
+        sort_order=sortOrder,
+    )
 
 
-@router.post("/", response_model=RolesClaimsPublic)
+@router.post("/", response_model=RolesClaimsPublic, dependencies=[Depends(require_claim("role_claims", "create"))])
 def create_role_claim(
     *,
     session: SessionDep,
@@ -69,9 +91,6 @@ def create_role_claim(
     """
     Create a new role claim.
     """
-    if not current_user.is_superuser:
-        raise HTTPException(status_code=403, detail="Not enough permissions")
-    
     # Check if the role exists
     role = session.get(Roles, role_claim_in.role_id)
     if not role:
@@ -94,8 +113,8 @@ def create_role_claim(
             existing_claim.updated_at = datetime.now()
             existing_claim.updated_by_id = current_user.id
             session.add(existing_claim)
+            crud.bump_permissions_version(session=session, role_id=existing_claim.role_id)
             session.commit()
-            session.refresh(existing_claim)
             return existing_claim
     
     # Create new role claim
@@ -109,8 +128,8 @@ def create_role_claim(
     )
     
     session.add(role_claim)
+    crud.bump_permissions_version(session=session, role_id=role_claim.role_id)
     session.commit()
-    session.refresh(role_claim)
     
     return role_claim
 
@@ -133,7 +152,7 @@ def read_role_claim(
     
     return role_claim
 
-@router.put("/{id}", response_model=RolesClaimsPublic)
+@router.put("/{id}", response_model=RolesClaimsPublic, dependencies=[Depends(require_claim("role_claims", "update"))])
 def update_role_claim(
     *,
     session: SessionDep,
@@ -144,9 +163,6 @@ def update_role_claim(
     """
     Update a role claim.
     """
-    if not current_user.is_superuser:
-        raise HTTPException(status_code=403, detail="Not enough permissions")
-    
     role_claim = session.get(RoleClaims, id)
     if not role_claim:
         raise HTTPException(status_code=404, detail="Role claim not found")
@@ -173,6 +189,10 @@ def update_role_claim(
         if existing_claim and existing_claim.role_claim_isactive:
             raise HTTPException(status_code=400, detail="This claim already exists for this role")
     
+    # Holders of the old role lose the claim
+    if role_claim_in.role_id != role_claim.role_id:
+        crud.bump_permissions_version(session=session, role_id=role_claim.role_id)
+
     # Update the role claim
     role_claim.role_claim_type = role_claim_in.role_claim_type
     role_claim.role_claim_value = role_claim_in.role_claim_value
@@ -183,12 +203,12 @@ def update_role_claim(
     role_claim.updated_by_id = current_user.id
     
     session.add(role_claim)
+    crud.bump_permissions_version(session=session, role_id=role_claim.role_id)
     session.commit()
-    session.refresh(role_claim)
     
     return role_claim
 
-@router.delete("/{role_claim_id}", response_model=Message)
+@router.delete("/{role_claim_id}", response_model=Message, dependencies=[Depends(require_claim("role_claims", "delete"))])
 def delete_role_claim(
     *,
     session: SessionDep,
@@ -201,9 +221,6 @@ def delete_role_claim(
     By default, this is a soft delete (sets isactive to False).
     Set permanent=true to permanently delete the record.
     """
-    if not current_user.is_superuser:
-        raise HTTPException(status_code=403, detail="Not enough permissions")
-    
     role_claim = session.get(RoleClaims, role_claim_id)
     if not role_claim:
         raise HTTPException(status_code=404, detail="Role claim not found")
@@ -211,6 +228,7 @@ def delete_role_claim(
     if permanent:
         # Hard delete
         session.delete(role_claim)
+        crud.bump_permissions_version(session=session, role_id=role_claim.role_id)
         session.commit()
         return Message(message="Role claim permanently deleted")
     else:
@@ -220,6 +238,7 @@ def delete_role_claim(
         role_claim.updated_by_id = current_user.id
         
         session.add(role_claim)
+        crud.bump_permissions_version(session=session, role_id=role_claim.role_id)
         session.commit()
         
         return Message(message="Role claim deactivated successfully")
\ No newline at end of file
@@ -1,47 +1,73 @@
 import uuid
 from typing import Any
 
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Depends
+from fastapi.responses import StreamingResponse
 from sqlmodel import func, select
 
 
-from app.api.deps import CurrentUser, SessionDep
-from app.models import RolesBase, RolesCreate, RolesPublic, RolesUpdate, Roles,Message,RolesPublicList,Message
+from app import crud
+from app.api.deps import AsyncCurrentUser, CurrentUser, ReadSessionDep, SessionDep
+from app.api.permissions import require_claim
+from app.api.export import export_response
+from app.api.listing import ListQuery
+from app.models import CountMode, ExportFormat, RolesBase, RolesCreate, RolesPublic, RolesUpdate, Roles,Message,RolesPublicList,Message
 
 
 router = APIRouter(prefix="/roles", tags=["Role"])
 
+# Declared once, the list statements are built on first use and reused
+roles_query = ListQuery(
+    Roles,
+    pk_column=Roles.role_id,
+    active=Roles.role_is_active,
+    search=(Roles.role_name,),
+    sortable=("role_name",),
+)
+RolesSortField = roles_query.sort_fields
+
 @router.get("/", response_model=RolesPublicList)
-def read_roles(
-    session: SessionDep, current_user: CurrentUser, skip: int = 0, limit: int = 100,search: str = None,
-    sortBy: str = None,
-    sortOrder: str = "asc"
+async def read_roles(
+    session: ReadSessionDep, current_user: AsyncCurrentUser, skip: int = 0, limit: int = 100,search: str = None,
+    sortBy: RolesSortField | None = None,
+    sortOrder: str = "asc",
+    cursor: str | None = None,
+    count: CountMode = CountMode.exact
 ) -> Any:
     """
     Retrieve roles.
     """
-    query = session.query(Roles).filter(Roles.role_is_active == True)
-    if search:
-        search_term = f"%{search}%"
-        query = query.filter(
-            Roles.role_name.ilike(search_term)
-        )
+    page = await roles_query.fetch(
+        session,
+        search=search,
+        sort_by=sortBy,
+        sort_order=sortOrder,
+        cursor=cursor,
+        skip=skip,
+        limit=limit,
+        count=count,
+    )
+    return RolesPublicList(**page)
 
-    if sortBy:
-        sort_column = getattr(Roles, sortBy, None)
-        if sort_column:
-            if sortOrder and sortOrder.lower()== "desc":
-                query = query.order_by(sort_column.desc())
-            else:
-                query = query.order_by(sort_column.asc())
-        # Get total count for pagination
-    total_count = query.count()
-    
-    # Apply pagination
-    items = query.offset(skip).limit(limit).all()
-    return RolesPublicList(data=items, count=total_count)
+@router.get("/export")
+async def export_roles(
+    current_user: AsyncCurrentUser, format: ExportFormat = ExportFormat.csv, search: str = None,
+    sortBy: RolesSortField | None = None, sortOrder: str = "asc"
+) -> StreamingResponse:
+    """
+    Stream every role the list would return as CSV or NDJSON.
+    """
+    return export_response(
+        roles_query,
+        RolesPublic,
+        format=format,
+        filename="roles",
+        search=search,
+        sort_by=sortBy,
+        sort_order=sortOrder,
+    )
 
-@router.post("/", response_model=RolesPublic)
+@router.post("/", response_model=RolesPublic, dependencies=[Depends(require_claim("roles", "create"))])
 def create_role(*, session: SessionDep, current_user: CurrentUser, role_in: RolesCreate) -> Any:
     """
     Create a new role.
@@ -49,10 +75,9 @@ def create_role(*, session: SessionDep, current_user: CurrentUser, role_in: Role
     role = Roles.model_validate(role_in, update={"created_by_id": current_user.id, "updated_by_id": current_user.id})
     session.add(role)
     session.commit()
-    session.refresh(role)
     return role
 
-@router.put("/{id}", response_model=RolesPublic)
+@router.put("/{id}", response_model=RolesPublic, dependencies=[Depends(require_claim("roles", "update"))])
 def update_role(*, session: SessionDep, current_user: CurrentUser, id: uuid.UUID, role_in: RolesUpdate) -> Any:
     """
     Update a role.
@@ -60,13 +85,11 @@ def update_role(*, session: SessionDep, current_user: CurrentUser, id: uuid.UUID
     role = session.get(Roles, id)
     if not role:
         raise HTTPException(status_code=404, detail="Role not found")
-    if not current_user.is_superuser:
-        raise HTTPException(status_code=400, detail="Not enough permission")
     update_dict = role_in.model_dump(exclude_unset=True)
     role.sqlmodel_update(update_dict)
     session.add(role)
+    crud.bump_permissions_version(session=session, role_id=role.role_id)
     session.commit()
-    session.refresh(role)
     return role
 
 @router.get("/{id}", response_model=RolesPublic)
@@ -81,7 +104,7 @@ def read_role(*, session: SessionDep, current_user: CurrentUser, id: uuid.UUID)
         raise HTTPException(status_code=400, detail="Not enough permission")
     return role
 
-@router.delete("/{id}")
+@router.delete("/{id}", dependencies=[Depends(require_claim("roles", "delete"))])
 def delete_role(
     session: SessionDep, current_user: CurrentUser, id: uuid.UUID
 ) -> Message:
@@ -91,10 +114,8 @@ def delete_role(
     role = session.get(Roles, id)
     if not role:
         raise HTTPException(status_code=404, detail="Role not found")
-    if not current_user.is_superuser:
-        raise HTTPException(status_code=400, detail="Not enough permission")
     role.role_is_active=False
     session.add(role)
+    crud.bump_permissions_version(session=session, role_id=role.role_id)
     session.commit()
-    session.refresh(role)
     return Message(message="Role is deleted successfully")
@@ -2,174 +2,189 @@ import uuid
 from datetime import datetime
 from typing import Any, List, Optional
 
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import StreamingResponse
 from sqlmodel import SQLModel, Field, Relationship, func, select
 
-from app.api.deps import CurrentUser, SessionDep
-from app.models import Message, Semesters, SemestersCreate, SemestersPublic, SemestersPublicList, SemestersUpdate
+from app.api.deps import AsyncCurrentUser, AsyncSessionDep, ReadSessionDep
+from app.api.permissions import require_claim_async
+from app.api.etag import TableETag
+from app.api.export import export_response
+from app.api.listing import ListQuery
+from app.models import CountMode, ExportFormat, Message, Semesters, SemestersCreate, SemestersPublic, SemestersPublicList, SemestersUpdate
 
 
 # API Routes
 
 router = APIRouter(prefix="/semesters", tags=["Semester"])
 
-@router.get("/", response_model=SemestersPublicList)
-def read_semesters(
-    session: SessionDep, current_user: CurrentUser, skip: int = 0, limit: int = 100, search: str = None,
-    sortBy: str = None,
-    sortOrder: str = "asc"
+# Declared once, the list statements are built on first use and reused
+semesters_query = ListQuery(
+    Semesters,
+    pk_column=Semesters.semester_id,
+    active=Semesters.is_active,
+    search=(Semesters.semester_name,),
+    sortable=("semester_name", "start_date"),
+)
+SemestersSortField = semesters_query.sort_fields
+semesters_etag = TableETag(Semesters)
+
+@router.get("/", response_model=SemestersPublicList, dependencies=[Depends(semesters_etag)])
+async def read_semesters(
+    session: ReadSessionDep, current_user: AsyncCurrentUser, skip: int = 0, limit: int = 100, search: str = None,
+    sortBy: SemestersSortField | None = None,
+    sortOrder: str = "asc", cursor: str | None = None, count: CountMode = CountMode.exact
 ) -> Any:
     """
     Retrieve semesters.
     """
-    query = session.query(Semesters).filter(Semesters.is_active == True)
-    if search:
-        search_term = f"%{search}%"
-        query = query.filter(
-            Semesters.semester_name.ilike(search_term)
-        )
-
-    if sortBy:
-        sort_column = getattr(Semesters, sortBy, None)
-        if sort_column:
-            if sortOrder and sortOrder.lower() == "desc":
-                query = query.order_by(sort_column.desc())
-            else:
-                query = query.order_by(sort_column.asc())
-    
-    # Get total count for pagination
-    total_count = query.count()
-    
-    # Apply pagination
-    items = query.offset(skip).limit(limit).all()
-    return SemestersPublicList(data=items, count=total_count)
+    page = await semesters_query.fetch(
+        session,
+        search=search,
+        sort_by=sortBy,
+        sort_order=sortOrder,
+        cursor=cursor,
+        skip=skip,
+        limit=limit,
+        count=count,
+    )
+    return SemestersPublicList(**page)
+
+@router.get("/export")
+async def export_semesters(
+    current_user: AsyncCurrentUser, format: ExportFormat = ExportFormat.csv, search: str = None,
+    sortBy: SemestersSortField | None = None, sortOrder: str = "asc"
+) -> StreamingResponse:
+    """
+    Stream every semester the list would return as CSV or NDJSON.
+    """
+    return export_response(
+        semesters_query,
+        SemestersPublic,
+        format=format,
+        filename="semesters",
+        search=search,
+        sort_by=sortBy,
+        sort_order=sortOrder,
+    )
 
 @router.get("/current", response_model=SemestersPublic)
-def get_current_semester(
-    session: SessionDep, current_user: CurrentUser
+async def get_current_semester(
+    session: ReadSessionDep, current_user: AsyncCurrentUser
 ) -> Any:
     """
     Get the current active semester based on the current date.
     """
     now = datetime.now()
-    current_semester = session.query(Semesters).filter(
+    current_semester = (await session.exec(select(Semesters).where(
         Semesters.start_date <= now,
         Semesters.end_date >= now,
         Semesters.is_active == True
-    ).first()
-    
+    ))).first()
+
     if not current_semester:
         raise HTTPException(status_code=404, detail="No active semester found for the current date")
-    
+
     return current_semester
 
-@router.post("/", response_model=SemestersPublic)
-def create_semester(*, session: SessionDep, current_user: CurrentUser, semester_in: SemestersCreate) -> Any:
+@router.post("/", response_model=SemestersPublic, dependencies=[Depends(require_claim_async("semesters", "create"))])
+async def create_semester(*, session: AsyncSessionDep, current_user: AsyncCurrentUser, semester_in: SemestersCreate) -> Any:
     """
     Create a new semester.
     """
     # Validate dates
     if semester_in.start_date >= semester_in.end_date:
         raise HTTPException(status_code=400, detail="Start date must be before end date")
-    
+
     # Check for overlapping semesters
-    overlapping = session.query(Semesters).filter(
+    overlapping = (await session.exec(select(Semesters).where(
         Semesters.is_active == True,
         Semesters.start_date <= semester_in.end_date,
         Semesters.end_date >= semester_in.start_date
-    ).first()
-    
+    ))).first()
+
     if overlapping:
         raise HTTPException(status_code=400, detail="This semester overlaps with an existing semester")
-    
+
     semester = Semesters.model_validate(
-        semester_in, 
+        semester_in,
         update={
-            "created_by_id": current_user.id, 
+            "created_by_id": current_user.id,
             "updated_by_id": current_user.id
         }
     )
     session.add(semester)
-    session.commit()
-    session.refresh(semester)
+    await session.commit()
     return semester
 
-@router.put("/{id}", response_model=SemestersPublic)
-def update_semester(*, session: SessionDep, current_user: CurrentUser, id: uuid.UUID, semester_in: SemestersUpdate) -> Any:
+@router.put("/{id}", response_model=SemestersPublic, dependencies=[Depends(require_claim_async("semesters", "update"))])
+async def update_semester(*, session: AsyncSessionDep, current_user: AsyncCurrentUser, id: uuid.UUID, semester_in: SemestersUpdate) -> Any:
     """
     Update a semester.
     """
-    semester = session.get(Semesters, id)
+    semester = await session.get(Semesters, id)
     if not semester:
         raise HTTPException(status_code=404, detail="Semester not found")
-    
-    if not current_user.is_superuser:
-        raise HTTPException(status_code=400, detail="Not enough permission")
-    
+
     update_dict = semester_in.model_dump(exclude_unset=True)
-    
+
     # Check dates if they are being updated
     start_date = update_dict.get("start_date", semester.start_date)
     end_date = update_dict.get("end_date", semester.end_date)
-    
+
     if start_date >= end_date:
         raise HTTPException(status_code=400, detail="Start date must be before end date")
-    
+
     # Check for overlapping semesters if dates are being changed
     if "start_date" in update_dict or "end_date" in update_dict:
-        overlapping = session.query(Semesters).filter(
+        overlapping = (await session.exec(select(Semesters).where(
             Semesters.semester_id != id,
             Semesters.is_active == True,
             Semesters.start_date <= end_date,
             Semesters.end_date >= start_date
-        ).first()
-        
+        ))).first()
+
         if overlapping:
             raise HTTPException(status_code=400, detail="This update would cause overlap with an existing semester")
-    
+
     # Add update timestamp and user
     update_dict["updated_at"] = datetime.now()
     update_dict["updated_by_id"] = current_user.id
-    
+
     semester.sqlmodel_update(update_dict)
     session.add(semester)
-    session.commit()
-    session.refresh(semester)
+    await session.commit()
     return semester
 
-@router.get("/{id}", response_model=SemestersPublic)
-def read_semester(*, session: SessionDep, current_user: CurrentUser, id: uuid.UUID) -> Any:
+@router.get("/{id}", response_model=SemestersPublic, dependencies=[Depends(semesters_etag)])
+async def read_semester(*, session: ReadSessionDep, current_user: AsyncCurrentUser, id: uuid.UUID) -> Any:
     """
     Get semester by ID.
     """
-    semester = session.get(Semesters, id)
+    semester = await session.get(Semesters, id)
     if not semester:
         raise HTTPException(status_code=404, detail="Semester not found")
-    
+
     if not current_user.is_superuser and not semester.is_active:
         raise HTTPException(status_code=400, detail="Not enough permission")
-    
+
     return semester
 
-@router.delete("/{id}")
-def delete_semester(
-    session: SessionDep, current_user: CurrentUser, id: uuid.UUID
+@router.delete("/{id}", dependencies=[Depends(require_claim_async("semesters", "delete"))])
+async def delete_semester(
+    session: AsyncSessionDep, current_user: AsyncCurrentUser, id: uuid.UUID
 ) -> Message:
     """
     Delete a semester (soft delete by setting is_active to False).
     """
-    semester = session.get(Semesters, id)
+    semester = await session.get(Semesters, id)
     if not semester:
         raise HTTPException(status_code=404, detail="Semester not found")
-    
-    if not current_user.is_superuser:
-        raise HTTPException(status_code=400, detail="Not enough permission")
-    
+
     semester.is_active = False
     semester.updated_at = datetime.now()
     semester.updated_by_id = current_user.id
-    
+
     session.add(semester)
-    session.commit()
-    session.refresh(semester)
-    return Message(message="Semester is deleted successfully")
\ No newline at end of file
+    await session.commit()
+    return Message(message="Semester is deleted successfully")
@@ -1,12 +1,19 @@
 import uuid
 from datetime import datetime
-from typing import Any, List, Optional
+from typing import Annotated, Any, List, Optional
 
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, Depends, Body, HTTPException
+from fastapi.responses import StreamingResponse
 from sqlmodel import SQLModel, Field, Relationship, func, select
 
-from app.api.deps import CurrentUser, SessionDep
-from app.models import Message, Suppliers, SuppliersCreate, SuppliersPublic, SuppliersPublicList, SuppliersUpdate
+from app.api.deps import AsyncCurrentUser, AsyncSessionDep, ReadSessionDep
+from app.api.permissions import require_claim_async
+from app.api.etag import TableETag
+from app.api.export import export_response
+from app.api.bulk import BulkWrite
+from app.api.listing import ListQuery
+from app.core.config import settings
+from app.models import BulkResult, CountMode, ExportFormat, Message, Suppliers, SuppliersCreate, SuppliersPublic, SuppliersPublicList, SuppliersUpdate
 
 
 
@@ -14,134 +21,163 @@ from app.models import Message, Suppliers, SuppliersCreate, SuppliersPublic, Sup
 
 router = APIRouter(prefix="/suppliers", tags=["Supplier"])
 
-@router.get("/", response_model=SuppliersPublicList)
-def read_suppliers(
-    session: SessionDep, current_user: CurrentUser, skip: int = 0, limit: int = 100, search: str = None,
-    sortBy: str = None, sortOrder: str = "asc"
+# Declared once, the list statements are built on first use and reused
+suppliers_query = ListQuery(
+    Suppliers,
+    pk_column=Suppliers.supplier_id,
+    active=Suppliers.is_active,
+    search=(Suppliers.supplier_name, Suppliers.contact_person, Suppliers.email),
+    sortable=("supplier_name",),
+)
+SuppliersSortField = suppliers_query.sort_fields
+suppliers_bulk = BulkWrite(
+    Suppliers,
+    pk_column=Suppliers.supplier_id,
+    key=Suppliers.supplier_name,
+    active=Suppliers.is_active,
+    name="Supplier",
+)
+suppliers_etag = TableETag(Suppliers)
+
+@router.get("/", response_model=SuppliersPublicList, dependencies=[Depends(suppliers_etag)])
+async def read_suppliers(
+    session: ReadSessionDep, current_user: AsyncCurrentUser, skip: int = 0, limit: int = 100, search: str = None,
+    sortBy: SuppliersSortField | None = None, sortOrder: str = "asc", cursor: str | None = None, count: CountMode = CountMode.exact
 ) -> Any:
     """
     Retrieve suppliers.
     """
-    query = session.query(Suppliers).filter(Suppliers.is_active == True)
-    
-    if search:
-        search_term = f"%{search}%"
-        query = query.filter(
-            (Suppliers.supplier_name.ilike(search_term)) | 
-            (Suppliers.contact_person.ilike(search_term)) |
-            (Suppliers.email.ilike(search_term))
-        )
-
-    if sortBy:
-        sort_column = getattr(Suppliers, sortBy, None)
-        if sort_column:
-            if sortOrder and sortOrder.lower() == "desc":
-                query = query.order_by(sort_column.desc())
-            else:
-                query = query.order_by(sort_column.asc())
-    
-    # Get total count for pagination
-    total_count = query.count()
-    
-    # Apply pagination
-    items = query.offset(skip).limit(limit).all()
-    return SuppliersPublicList(data=items, count=total_count)
-
-@router.post("/", response_model=SuppliersPublic)
-def create_supplier(*, session: SessionDep, current_user: CurrentUser, supplier_in: SuppliersCreate) -> Any:
+    page = await suppliers_query.fetch(
+        session,
+        search=search,
+        sort_by=sortBy,
+        sort_order=sortOrder,
+        cursor=cursor,
+        skip=skip,
+        limit=limit,
+        count=count,
+    )
+    return SuppliersPublicList(**page)
+
+@router.get("/export")
+async def export_suppliers(
+    current_user: AsyncCurrentUser, format: ExportFormat = ExportFormat.csv, search: str = None,
+    sortBy: SuppliersSortField | None = None, sortOrder: str = "asc"
+) -> StreamingResponse:
+    """
+    Stream every supplier the list would return as CSV or NDJSON.
+    """
+    return export_response(
+        suppliers_query,
+        SuppliersPublic,
+        format=format,
+        filename="suppliers",
+        search=search,
+        sort_by=sortBy,
+        sort_order=sortOrder,
+    )
+
+@router.post("/", response_model=SuppliersPublic, dependencies=[Depends(require_claim_async("suppliers", "create"))])
+async def create_supplier(*, session: AsyncSessionDep, current_user: AsyncCurrentUser, supplier_in: SuppliersCreate) -> Any:
     """
     Create a new supplier.
     """
     # Check if supplier with the same name already exists
-    existing_supplier = session.query(Suppliers).filter(
+    existing_supplier = (await session.exec(select(Suppliers).where(
         Suppliers.supplier_name == supplier_in.supplier_name,
         Suppliers.is_active == True
-    ).first()
-    
+    ))).first()
+
     if existing_supplier:
         raise HTTPException(status_code=400, detail="Supplier with this name already exists")
-    
+
     # Create the supplier
     supplier = Suppliers.model_validate(
-        supplier_in, 
+        supplier_in,
         update={
-            "created_by_id": current_user.id, 
+            "created_by_id": current_user.id,
             "updated_by_id": current_user.id
         }
     )
     session.add(supplier)
-    session.commit()
-    session.refresh(supplier)
+    await session.commit()
     return supplier
 
-@router.put("/{id}", response_model=SuppliersPublic)
-def update_supplier(*, session: SessionDep, current_user: CurrentUser, id: uuid.UUID, supplier_in: SuppliersUpdate) -> Any:
+@router.post("/bulk", response_model=BulkResult, dependencies=[Depends(require_claim_async("suppliers", "create")), Depends(require_claim_async("suppliers", "update"))])
+async def bulk_write_suppliers(
+    *,
+    session: AsyncSessionDep,
+    current_user: AsyncCurrentUser,
+    suppliers_in: Annotated[
+        list[SuppliersCreate], Body(min_length=1, max_length=settings.BULK_MAX_ROWS)
+    ],
+) -> Any:
+    """
+    Create suppliers, updating those whose name already exists.
+    All rows are written in one transaction, or none when a row is rejected.
+    """
+    return await suppliers_bulk.write(session, suppliers_in, user=current_user)
+
+@router.put("/{id}", response_model=SuppliersPublic, dependencies=[Depends(require_claim_async("suppliers", "update"))])
+async def update_supplier(*, session: AsyncSessionDep, current_user: AsyncCurrentUser, id: uuid.UUID, supplier_in: SuppliersUpdate) -> Any:
     """
     Update a supplier.
     """
-    supplier = session.get(Suppliers, id)
+    supplier = await session.get(Suppliers, id)
     if not supplier:
         raise HTTPException(status_code=404, detail="Supplier not found")
-    
-    if not current_user.is_superuser:
-        raise HTTPException(status_code=400, detail="Not enough permission")
-    
+
     update_dict = supplier_in.model_dump(exclude_unset=True)
-    
+
     # Check for duplicate name if name is being changed
     if "supplier_name" in update_dict and update_dict["supplier_name"] != supplier.supplier_name:
-        existing_supplier = session.query(Suppliers).filter(
+        existing_supplier = (await session.exec(select(Suppliers).where(
             Suppliers.supplier_name == update_dict["supplier_name"],
             Suppliers.supplier_id != id,
             Suppliers.is_active == True
-        ).first()
-        
+        ))).first()
+
         if existing_supplier:
             raise HTTPException(status_code=400, detail="Supplier with this name already exists")
-    
+
     # Add update timestamp and user
     update_dict["updated_at"] = datetime.now()
     update_dict["updated_by_id"] = current_user.id
-    
+
     supplier.sqlmodel_update(update_dict)
     session.add(supplier)
-    session.commit()
-    session.refresh(supplier)
+    await session.commit()
     return supplier
 
-@router.get("/{id}", response_model=SuppliersPublic)
-def read_supplier(*, session: SessionDep, current_user: CurrentUser, id: uuid.UUID) -> Any:
+@router.get("/{id}", response_model=SuppliersPublic, dependencies=[Depends(suppliers_etag)])
+async def read_supplier(*, session: ReadSessionDep, current_user: AsyncCurrentUser, id: uuid.UUID) -> Any:
     """
     Get supplier by ID.
     """
-    supplier = session.get(Suppliers, id)
+    supplier = await session.get(Suppliers, id)
     if not supplier:
         raise HTTPException(status_code=404, detail="Supplier not found")
-    
+
     if not current_user.is_superuser and not supplier.is_active:
         raise HTTPException(status_code=400, detail="Not enough permission")
-    
+
     return supplier
 
-@router.delete("/{id}")
-def delete_supplier(
-    session: SessionDep, current_user: CurrentUser, id: uuid.UUID
+@router.delete("/{id}", dependencies=[Depends(require_claim_async("suppliers", "delete"))])
+async def delete_supplier(
+    session: AsyncSessionDep, current_user: AsyncCurrentUser, id: uuid.UUID
 ) -> Message:
     """
     Delete a supplier (soft delete by setting is_active to False).
     """
-    supplier = session.get(Suppliers, id)
+    supplier = await session.get(Suppliers, id)
     if not supplier:
         raise HTTPException(status_code=404, detail="Supplier not found")
-    
-    if not current_user.is_superuser:
-        raise HTTPException(status_code=400, detail="Not enough permission")
-    
+
     supplier.is_active = False
     supplier.updated_at = datetime.now()
     supplier.updated_by_id = current_user.id
-    
+
     session.add(supplier)
-    session.commit()
-    session.refresh(supplier)
-    return Message(message="Supplier is deleted successfully")
\ No newline at end of file
+    await session.commit()
+    return Message(message="Supplier is deleted successfully")
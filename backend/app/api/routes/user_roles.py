@@ -1,45 +1,46 @@
 import uuid
 from typing import Any, List
 
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Depends
 from sqlmodel import func, select
 
-from app.api.deps import CurrentUser, SessionDep
+from app import crud
+from app.api.deps import AsyncCurrentUser, CurrentUser, ReadSessionDep, SessionDep
+from app.api.permissions import require_claim
+from app.api.pagination import paginate
 
-from app.models import UserRole, UserRolesPublic, UserRoleCreate, UserRolePublic, UserRoleUpdate, Message
+from app.models import CountMode, UserRole, UserRolesPublic, UserRoleCreate, UserRolePublic, UserRoleUpdate, Message
 
 router = APIRouter(prefix="/userroles", tags=["UserRole"])
 
 @router.get("/", response_model=UserRolesPublic)
-def read_user_roles(
-    session: SessionDep, current_user: CurrentUser, skip: int = 0, limit: int = 100
+async def read_user_roles(
+    session: ReadSessionDep, current_user: AsyncCurrentUser, skip: int = 0, limit: int = 100,
+    cursor: str | None = None, count: CountMode = CountMode.exact
 ) -> Any:
     """
     Retrieve user roles.
     """
     if current_user.is_superuser:
-        count_statement = select(func.count()).select_from(UserRole)
-        count = session.exec(count_statement).one()
-        statement = select(UserRole).offset(skip).limit(limit)
-        user_roles = session.exec(statement).all()
+        statement = select(UserRole)
     else:
-        count_statement = (
-            select(func.count())
-            .where(UserRole.user_role_isactive == True)
-            .select_from(UserRole)
-        )
-        count = session.exec(count_statement).one()
         statement = (
             select(UserRole)
             .where(UserRole.user_role_isactive == True)
-            .offset(skip)
-            .limit(limit)
         )
-        user_roles = session.exec(statement).all()
 
-    return UserRolesPublic(data=user_roles, count=count)
+    page = await paginate(
+        session,
+        statement,
+        pk_column=UserRole.user_role_id,
+        cursor=cursor,
+        skip=skip,
+        limit=limit,
+        count=count,
+    )
+    return UserRolesPublic(**page)
 
-@router.post("/", response_model=UserRolesPublic)
+@router.post("/", response_model=UserRolesPublic, dependencies=[Depends(require_claim("user_roles", "create"))])
 def create_user_role(*, session: SessionDep, current_user: CurrentUser, user_role_in: UserRoleCreate) -> Any:
     """
     Assign a role to a user.
@@ -60,11 +61,11 @@ def create_user_role(*, session: SessionDep, current_user: CurrentUser, user_rol
         "updated_by_id": current_user.id
     })
     session.add(user_role)
+    crud.bump_permissions_version(session=session, user_id=user_role.user_id)
     session.commit()
-    session.refresh(user_role)
     return user_role
 
-@router.put("/{id}", response_model=UserRolesPublic)
+@router.put("/{id}", response_model=UserRolesPublic, dependencies=[Depends(require_claim("user_roles", "update"))])
 def update_user_role(*, session: SessionDep, current_user: CurrentUser, id: uuid.UUID, user_role_in: UserRoleUpdate) -> Any:
     """
     Update a user role.
@@ -72,13 +73,11 @@ def update_user_role(*, session: SessionDep, current_user: CurrentUser, id: uuid
     user_role = session.get(UserRole, id)
     if not user_role:
         raise HTTPException(status_code=404, detail="User role not found")
-    if not current_user.is_superuser:
-        raise HTTPException(status_code=400, detail="Not enough permission")
     update_dict = user_role_in.model_dump(exclude_unset=True)
     user_role.sqlmodel_update(update_dict)
     session.add(user_role)
+    crud.bump_permissions_version(session=session, user_id=user_role.user_id)
     session.commit()
-    session.refresh(user_role)
     return user_role
 
 @router.get("/{id}", response_model=UserRolesPublic)
@@ -152,7 +151,7 @@ def read_users_by_role(*, session: SessionDep, current_user: CurrentUser, role_i
     
     return UserRolePublic(data=user_roles, count=count)
 
-@router.delete("/{id}")
+@router.delete("/{id}", dependencies=[Depends(require_claim("user_roles", "delete"))])
 def delete_user_role(
     session: SessionDep, current_user: CurrentUser, id: uuid.UUID
 ) -> Message:
@@ -162,11 +161,9 @@ def delete_user_role(
     user_role = session.get(UserRole, id)
     if not user_role:
         raise HTTPException(status_code=404, detail="User role not found")
-    if not current_user.is_superuser:
-        raise HTTPException(status_code=400, detail="Not enough permission")
     update_dict = UserRoleUpdate(user_role_isactive=False)
     user_role.sqlmodel_update(update_dict)
     session.add(user_role)
+    crud.bump_permissions_version(session=session, user_id=user_role.user_id)
     session.commit()
-    session.refresh(user_role)
     return Message(message="User role is removed successfully")
\ No newline at end of file
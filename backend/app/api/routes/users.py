@@ -2,17 +2,21 @@ import uuid
 from typing import Any
 
 from fastapi import APIRouter, Depends, HTTPException
-from sqlmodel import col, delete, func, select
+from sqlmodel import col, delete, select
 
 from app import crud
 from app.api.deps import (
     CurrentUser,
+    ReadSessionDep,
     SessionDep,
     get_current_active_superuser,
 )
+from app.api.pagination import paginate
 from app.core.config import settings
 from app.core.security import get_password_hash, verify_password
+from app.core.user_invalidation import drop_cached_users
 from app.models import (
+    CountMode,
     Item,
     Message,
     UpdatePassword,
@@ -24,7 +28,7 @@ from app.models import (
     UserUpdate,
     UserUpdateMe,
 )
-from app.utils import generate_new_account_email, send_email
+from app.utils import generate_new_account_email
 
 router = APIRouter(prefix="/users", tags=["users"])
 
@@ -34,18 +38,27 @@ router = APIRouter(prefix="/users", tags=["users"])
     dependencies=[Depends(get_current_active_superuser)],
     response_model=UsersPublic,
 )
-def read_users(session: SessionDep, skip: int = 0, limit: int = 100) -> Any:
+async def read_users(
+    session: ReadSessionDep,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: str | None = None,
+    count: CountMode = CountMode.exact,
+) -> Any:
     """
     Retrieve users.
     """
 
-    count_statement = select(func.count()).select_from(User)
-    count = session.exec(count_statement).one()
-
-    statement = select(User).offset(skip).limit(limit)
-    users = session.exec(statement).all()
-
-    return UsersPublic(data=users, count=count)
+    page = await paginate(
+        session,
+        select(User),
+        pk_column=User.id,
+        cursor=cursor,
+        skip=skip,
+        limit=limit,
+        count=count,
+    )
+    return UsersPublic(**page)
 
 
 @router.post(
@@ -62,16 +75,18 @@ def create_user(*, session: SessionDep, user_in: UserCreate) -> Any:
             detail="The user with this email already exists in the system.",
         )
 
-    user = crud.create_user(session=session, user_create=user_in)
     if settings.emails_enabled and user_in.email:
         email_data = generate_new_account_email(
             email_to=user_in.email, username=user_in.email, password=user_in.password
         )
-        send_email(
+        # Queued first, committed along with the new user
+        crud.enqueue_email(
+            session=session,
             email_to=user_in.email,
             subject=email_data.subject,
             html_content=email_data.html_content,
         )
+    user = crud.create_user(session=session, user_create=user_in)
     return user
 
 
@@ -92,8 +107,8 @@ def update_user_me(
     user_data = user_in.model_dump(exclude_unset=True)
     current_user.sqlmodel_update(user_data)
     session.add(current_user)
+    drop_cached_users(session, [current_user.id])
     session.commit()
-    session.refresh(current_user)
     return current_user
 
 
@@ -113,6 +128,8 @@ def update_password_me(
     hashed_password = get_password_hash(body.new_password)
     current_user.hashed_password = hashed_password
     session.add(current_user)
+    crud.revoke_user_refresh_tokens(session=session, user_id=current_user.id)
+    drop_cached_users(session, [current_user.id])
     session.commit()
     return Message(message="Password updated successfully")
 
@@ -135,6 +152,7 @@ def delete_user_me(session: SessionDep, current_user: CurrentUser) -> Any:
             status_code=403, detail="Super users are not allowed to delete themselves"
         )
     session.delete(current_user)
+    drop_cached_users(session, [current_user.id])
     session.commit()
     return Message(message="User deleted successfully")
 
@@ -222,5 +240,6 @@ def delete_user(
     statement = delete(Item).where(col(Item.owner_id) == user_id)
     session.exec(statement)  # type: ignore
     session.delete(user)
+    drop_cached_users(session, [user_id])
     session.commit()
     return Message(message="User deleted successfully")
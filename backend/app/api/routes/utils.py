@@ -1,9 +1,18 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, HTTPException
 from pydantic.networks import EmailStr
 
-from app.api.deps import get_current_active_superuser
-from app.models import Message
-from app.utils import generate_test_email, send_email
+from app import crud
+from app.api.deps import SessionDep, get_current_active_superuser
+from app.core.config import settings
+from app.core.db import async_engine, engine, get_pool_stats, replica_engines
+from app.core.passwords import password_hasher
+from app.models import (
+    EmailOutboxStats,
+    Message,
+    PasswordHashStats,
+    PoolStatsPublic,
+)
+from app.utils import generate_test_email
 
 router = APIRouter(prefix="/utils", tags=["utils"])
 
@@ -13,19 +22,65 @@ router = APIRouter(prefix="/utils", tags=["utils"])
     dependencies=[Depends(get_current_active_superuser)],
     status_code=201,
 )
-def test_email(email_to: EmailStr) -> Message:
+def test_email(email_to: EmailStr, session: SessionDep) -> Message:
     """
     Test emails.
     """
+    # Nothing could ever send it
+    if not settings.emails_enabled:
+        raise HTTPException(status_code=503, detail="Emails are not configured")
     email_data = generate_test_email(email_to=email_to)
-    send_email(
+    crud.enqueue_email(
+        session=session,
         email_to=email_to,
         subject=email_data.subject,
         html_content=email_data.html_content,
     )
+    session.commit()
     return Message(message="Test email sent")
 
 
+@router.get(
+    "/pool-stats/",
+    dependencies=[Depends(get_current_active_superuser)],
+    response_model=PoolStatsPublic,
+)
+def pool_stats() -> PoolStatsPublic:
+    """
+    Connection pool usage of the worker that served this request.
+    """
+    stats = [get_pool_stats("sync", engine), get_pool_stats("async", async_engine)]
+    stats += [
+        get_pool_stats(f"replica-{index}", replica)
+        for index, replica in enumerate(replica_engines)
+    ]
+    return PoolStatsPublic(data=stats)
+
+
+@router.get(
+    "/password-hash-stats/",
+    dependencies=[Depends(get_current_active_superuser)],
+    response_model=PasswordHashStats,
+)
+def password_hash_stats() -> PasswordHashStats:
+    """
+    Password hashing pool usage of the worker that served this request.
+    """
+    return password_hasher.stats()
+
+
+@router.get(
+    "/email-outbox-stats/",
+    dependencies=[Depends(get_current_active_superuser)],
+    response_model=EmailOutboxStats,
+)
+def email_outbox_stats(session: SessionDep) -> EmailOutboxStats:
+    """
+    Emails waiting in the outbox for the email worker.
+    """
+    return crud.get_email_outbox_stats(session=session)
+
+
 @router.get("/health-check/")
 async def health_check() -> bool:
     return True
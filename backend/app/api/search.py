@@ -0,0 +1,50 @@
+"""
+Substring search shared by the list routes.
+
+The searched columns carry ``pg_trgm`` GIN indexes (see
+``app.models.trigram_index``), which serve ``ILIKE '%term%'`` without a
+sequential scan. Matches are ranked by trigram similarity so the closest
+names come first, which is what typeahead lookups want.
+"""
+
+from typing import Any
+
+from sqlalchemy import ColumnElement, or_
+from sqlalchemy.orm import InstrumentedAttribute
+from sqlmodel import func
+
+
+def like_pattern(term: str) -> str:
+    """
+    ILIKE pattern matching ``term`` anywhere, its own % and _ taken literally.
+    """
+    escaped = term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return f"%{escaped}%"
+
+
+def pattern_condition(
+    pattern: str | ColumnElement[str], *columns: InstrumentedAttribute[Any]
+) -> ColumnElement[bool]:
+    """
+    True for rows where any of ``columns`` matches the ILIKE ``pattern``,
+    which may be a bound parameter filled in at execution.
+    """
+    return or_(*(column.ilike(pattern, escape="\\") for column in columns))
+
+
+def search_condition(
+    term: str, *columns: InstrumentedAttribute[Any]
+) -> ColumnElement[bool]:
+    """
+    True for rows where any of ``columns`` contains ``term``, case-insensitive.
+    """
+    return pattern_condition(like_pattern(term), *columns)
+
+
+def search_rank(
+    term: str | ColumnElement[str], *columns: InstrumentedAttribute[Any]
+) -> ColumnElement[float]:
+    """
+    Best trigram similarity between ``term`` and any of ``columns``.
+    """
+    return func.greatest(*(func.similarity(column, term) for column in columns))
@@ -0,0 +1,86 @@
+"""
+Time email rendering, reading and compiling the template on every call as
+render_email_template used to, against the preloaded template environment.
+
+    python app/benchmark_email_templates.py [--renders 2000]
+
+Uses the built templates in email-templates/build, or a stand-in of similar
+size when they have not been built.
+"""
+
+import argparse
+import tempfile
+import time
+from collections.abc import Callable
+from pathlib import Path
+from typing import Any
+
+from jinja2 import Template
+
+from app.utils import (
+    EMAIL_TEMPLATES_DIR,
+    email_template_environment,
+    preload_email_templates,
+)
+
+CONTEXT = {
+    "project_name": "Culinary Institute Inventory",
+    "username": "chef@example.com",
+    "email": "chef@example.com",
+    "valid_hours": 48,
+    "link": "http://localhost:5173/reset-password?token=abc",
+}
+
+STAND_IN = (
+    "<html><body>"
+    + "<table><tr><td style='font-family:Arial;font-size:16px'>{{ project_name }}</td></tr></table>"
+    * 150
+    + "<p>Hello {{ username }}, use <a href='{{ link }}'>this link</a> within "
+    "{{ valid_hours }} hours.</p>"
+    + "{% if email %}<p>Sent to {{ email }}</p>{% endif %}"
+    + "</body></html>"
+)
+
+
+def per_render(render: Callable[[], Any], renders: int) -> float:
+    started = time.perf_counter()
+    for _ in range(renders):
+        render()
+    return (time.perf_counter() - started) / renders
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--renders", type=int, default=2000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as stand_in_dir:
+        directory = EMAIL_TEMPLATES_DIR
+        environment = email_template_environment(directory)
+        names = preload_email_templates(environment)
+        if not names:
+            directory = Path(stand_in_dir)
+            (directory / "stand_in.html").write_text(STAND_IN)
+            environment = email_template_environment(directory)
+            names = preload_email_templates(environment)
+
+        for name in names:
+            path = directory / name
+
+            def before(path: Path = path) -> str:
+                return Template(path.read_text()).render(CONTEXT)
+
+            def after(name: str = name) -> str:
+                return environment.get_template(name).render(CONTEXT)
+
+            assert before() == after()
+            old = per_render(before, args.renders)
+            new = per_render(after, args.renders)
+            print(
+                f"{name}: {old * 1e6:.1f} us -> {new * 1e6:.1f} us per render "
+                f"({old / new:.0f}x)"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""
+Check the user_effective_claims projection against its source tables.
+
+    python app/check_effective_claims.py          # report differences
+    python app/check_effective_claims.py --fix    # and rebuild the projection
+
+Exits with status 1 when differences were found.
+"""
+
+import argparse
+import logging
+import sys
+from typing import Any
+
+import sqlalchemy as sa
+from sqlalchemy import and_, func
+from sqlmodel import Session, col, delete, select
+
+from app.core.db import engine
+from app.models import RoleClaims, Roles, UserEffectiveClaim, UserRole
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+Row = tuple[Any, Any, str, str | None, str | None]
+
+
+def expected_rows(session: Session) -> set[Row]:
+    """
+    The projection rebuilt from scratch, same rules as the
+    refresh_user_effective_claims database function.
+    """
+    # sqlmodel's select() is only typed up to four columns
+    statement = (
+        sa.select(
+            col(UserRole.user_id),
+            col(Roles.role_id),
+            col(Roles.role_name),
+            col(RoleClaims.role_claim_type),
+            col(RoleClaims.role_claim_value),
+        )
+        .join(
+            Roles,
+            and_(col(Roles.role_id) == UserRole.role_id, col(Roles.role_is_active)),
+        )
+        .outerjoin(
+            RoleClaims,
+            and_(
+                col(RoleClaims.role_id) == Roles.role_id,
+                col(RoleClaims.role_claim_isactive) == True,  # noqa: E712
+            ),
+        )
+        .where(col(UserRole.is_active) == True)  # noqa: E712
+    )
+    return set(session.execute(statement).tuples().all())
+
+
+def stored_rows(session: Session) -> set[Row]:
+    statement = sa.select(
+        col(UserEffectiveClaim.user_id),
+        col(UserEffectiveClaim.role_id),
+        col(UserEffectiveClaim.role_name),
+        col(UserEffectiveClaim.claim_type),
+        col(UserEffectiveClaim.claim_value),
+    )
+    return set(session.execute(statement).tuples().all())
+
+
+def rebuild(session: Session) -> None:
+    session.exec(delete(UserEffectiveClaim))
+    all_users = select(
+        func.array_agg(col(UserRole.user_id).distinct())
+    ).scalar_subquery()
+    session.exec(select(func.refresh_user_effective_claims(all_users)))
+    session.commit()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--fix", action="store_true", help="rebuild the projection")
+    args = parser.parse_args()
+
+    with Session(engine) as session:
+        # One snapshot for both reads
+        session.connection(execution_options={"isolation_level": "REPEATABLE READ"})
+        expected = expected_rows(session)
+        stored = stored_rows(session)
+        missing = expected - stored
+        extra = stored - expected
+        for row in sorted(missing, key=str):
+            logger.warning("Missing: %s", row)
+        for row in sorted(extra, key=str):
+            logger.warning("Unexpected: %s", row)
+        logger.info(
+            "%d rows expected, %d missing, %d unexpected",
+            len(expected),
+            len(missing),
+            len(extra),
+        )
+        if (missing or extra) and args.fix:
+            session.rollback()
+            rebuild(session)
+            logger.info("Projection rebuilt")
+
+    if missing or extra:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,12 @@
+import hashlib
+import hmac
 import secrets
 import warnings
 from typing import Annotated, Any, Literal
 
 from pydantic import (
     AnyUrl,
+    BaseModel,
     BeforeValidator,
     EmailStr,
     HttpUrl,
@@ -24,6 +27,16 @@ def parse_cors(v: Any) -> list[str] | str:
     raise ValueError(v)
 
 
+class SigningKey(BaseModel):
+    kid: str
+    algorithm: Literal["HS256", "RS256", "EdDSA"] = "HS256"
+    # HS256 keys use ``secret``; RS256 and EdDSA keys take PEM text, a
+    # private key to sign with or just a public key to verify old tokens
+    secret: str | None = None
+    private_key: str | None = None
+    public_key: str | None = None
+
+
 class Settings(BaseSettings):
     model_config = SettingsConfigDict(
         # Use top level .env file (one level above ./backend/)
@@ -33,8 +46,17 @@ class Settings(BaseSettings):
     )
     API_V1_STR: str = "/api/v1"
     SECRET_KEY: str = secrets.token_urlsafe(32)
-    # 60 minutes * 24 hours * 8 days = 8 days
-    ACCESS_TOKEN_EXPIRE_MINUTES: int = 60 * 24 * 8
+    # Access tokens are short lived, clients renew them with the refresh token
+    ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
+    REFRESH_TOKEN_EXPIRE_DAYS: int = 8
+    # Token signing keys as a JSON list of SigningKey, tokens name their key
+    # in the ``kid`` header. New tokens are signed with JWT_SIGNING_KID, the
+    # other keys still verify. Without keys SECRET_KEY signs as kid "default".
+    JWT_KEYS: list[SigningKey] = []
+    JWT_SIGNING_KID: str | None = None
+    # Whether SECRET_KEY still verifies the tokens it signed as kid "default"
+    # once JWT_KEYS is set, turn off when they have all expired
+    JWT_KEEP_DEFAULT_KEY: bool = True
     FRONTEND_HOST: str = "http://localhost:5173"
     ENVIRONMENT: Literal["local", "staging", "production"] = "local"
 
@@ -56,6 +78,20 @@ class Settings(BaseSettings):
     POSTGRES_USER: str = "postgres"
     POSTGRES_PASSWORD: str = "changeme"
     POSTGRES_DB: str = "postgres"
+    # Connection pool, per engine and per worker process: every worker can open
+    # up to POOL_SIZE + MAX_OVERFLOW connections to Postgres
+    POSTGRES_POOL_SIZE: int = 5
+    POSTGRES_MAX_OVERFLOW: int = 10
+    # seconds to wait for a free connection before giving up
+    POSTGRES_POOL_TIMEOUT: float = 30
+    # seconds after which a connection is replaced, -1 keeps them forever
+    POSTGRES_POOL_RECYCLE: int = 1800
+    POSTGRES_POOL_PRE_PING: bool = True
+    # Optional read replicas, comma separated DSNs. Read-only routes are
+    # spread over them round-robin, everything else uses the primary.
+    POSTGRES_REPLICA_URIS: Annotated[
+        list[PostgresDsn] | str, BeforeValidator(parse_cors)
+    ] = []
 
     @computed_field  # type: ignore[prop-decorator]
     @property
@@ -69,6 +105,15 @@ class Settings(BaseSettings):
             path=self.POSTGRES_DB,
         )
 
+    @computed_field  # type: ignore[prop-decorator]
+    @property
+    def SQLALCHEMY_REPLICA_URIS(self) -> list[str]:
+        # psycopg 3 is the only driver installed, default plain postgresql:// to it
+        return [
+            str(uri).replace("postgresql://", "postgresql+psycopg://", 1)
+            for uri in self.POSTGRES_REPLICA_URIS
+        ]
+
     SMTP_TLS: bool = True
     SMTP_SSL: bool = False
     SMTP_PORT: int = 587
@@ -86,11 +131,53 @@ class Settings(BaseSettings):
 
     EMAIL_RESET_TOKEN_EXPIRE_HOURS: int = 48
 
+    # Emails are queued in the emailoutbox table and sent by app/email_worker.py,
+    # up to BATCH_SIZE over one SMTP connection. A failed email is retried
+    # after RETRY_SECONDS, doubled on every further attempt up to
+    # MAX_RETRY_SECONDS, and given up on after MAX_ATTEMPTS. Sent and given up
+    # emails are deleted RETENTION_DAYS after they were queued.
+    EMAIL_OUTBOX_BATCH_SIZE: int = 50
+    EMAIL_OUTBOX_POLL_SECONDS: float = 5
+    EMAIL_OUTBOX_MAX_ATTEMPTS: int = 8
+    EMAIL_OUTBOX_RETRY_SECONDS: float = 30
+    EMAIL_OUTBOX_MAX_RETRY_SECONDS: float = 3600
+    EMAIL_OUTBOX_RETENTION_DAYS: int = 7
+
     @computed_field  # type: ignore[prop-decorator]
     @property
     def emails_enabled(self) -> bool:
         return bool(self.SMTP_HOST and self.EMAILS_FROM_EMAIL)
 
+    # bcrypt runs in this many processes per worker, 0 hashes in the request
+    # thread. Beyond MAX_PENDING running or queued operations requests get a
+    # 503, keep it well below the request thread pool (40 threads).
+    PASSWORD_HASH_WORKERS: int = 2
+    PASSWORD_HASH_MAX_PENDING: int = 8
+    PASSWORD_BCRYPT_ROUNDS: int = 12
+
+    # Sliding-window limits on login and password recovery attempts, per
+    # worker process. 0 disables a limit.
+    LOGIN_RATE_LIMIT_PER_EMAIL: int = 5
+    LOGIN_RATE_LIMIT_PER_IP: int = 100
+    LOGIN_RATE_LIMIT_WINDOW_SECONDS: float = 60
+    PASSWORD_RECOVERY_RATE_LIMIT_PER_EMAIL: int = 3
+    PASSWORD_RECOVERY_RATE_LIMIT_WINDOW_SECONDS: float = 3600
+
+    # Rows accepted by one bulk create/update request
+    BULK_MAX_ROWS: int = 5000
+
+    # Rows an export reads from its server-side cursor and writes at a time
+    EXPORT_BATCH_SIZE: int = 1000
+
+    # Verified access tokens kept per worker process, 0 disables the cache
+    TOKEN_CACHE_MAX_SIZE: int = 4096
+
+    # Authenticated users are cached per worker process for this many seconds,
+    # 0 disables the cache. Changes made through another worker drop the entry
+    # through LISTEN/NOTIFY, or show up once it expires when that is down.
+    USER_CACHE_TTL_SECONDS: float = 60
+    USER_CACHE_MAX_SIZE: int = 1024
+
     EMAIL_TEST_USER: EmailStr = "test@example.com"
     FIRST_SUPERUSER: EmailStr
     FIRST_SUPERUSER_PASSWORD: str
@@ -116,5 +203,38 @@ class Settings(BaseSettings):
 
         return self
 
+    @model_validator(mode="after")
+    def _check_signing_keys(self) -> Self:
+        kids = [key.kid for key in self.JWT_KEYS]
+        if len(set(kids)) != len(kids):
+            raise ValueError("JWT_KEYS has several keys with the same kid")
+        if self.JWT_KEYS:
+            if self.JWT_SIGNING_KID is None:
+                self.JWT_SIGNING_KID = kids[0]
+            elif self.JWT_SIGNING_KID not in kids:
+                raise ValueError(
+                    f'JWT_SIGNING_KID "{self.JWT_SIGNING_KID}" is not in JWT_KEYS'
+                )
+        elif "SECRET_KEY" not in self.model_fields_set:
+            # The random default differs on every worker and after a restart,
+            # tokens would only work on the process that issued them
+            if self.ENVIRONMENT != "local":
+                raise ValueError(
+                    "Set SECRET_KEY or JWT_KEYS, all workers must share the key "
+                    "signing tokens"
+                )
+            self.SECRET_KEY = hmac.new(
+                self.FIRST_SUPERUSER_PASSWORD.encode(),
+                f"{self.PROJECT_NAME}:{self.POSTGRES_PASSWORD}".encode(),
+                hashlib.sha256,
+            ).hexdigest()
+            warnings.warn(
+                "Neither SECRET_KEY nor JWT_KEYS is set, tokens are signed with a "
+                "key derived from FIRST_SUPERUSER_PASSWORD, set SECRET_KEY for "
+                "deployments.",
+                stacklevel=1,
+            )
+        return self
+
 
 settings = Settings()  # type: ignore
@@ -1,10 +1,149 @@
+import itertools
+import os
+import time
+from typing import Any
+
+from sqlalchemy import Engine, Select, event
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+from sqlalchemy.orm import ORMExecuteState
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
 from sqlmodel import Session, create_engine, select
 
 from app import crud
 from app.core.config import settings
-from app.models import User, UserCreate
+from app.models import PoolStats, User, UserCreate
+
+
+class _InstrumentedPoolMixin:
+    """
+    Counts checkouts and the time callers spend getting a connection from the
+    pool. Time spent opening brand new connections is tracked separately so
+    the difference is the time spent queueing for a free one.
+    """
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self.checkouts = 0
+        self.timeouts = 0
+        self.checkout_seconds = 0.0
+        self.connect_seconds = 0.0
+
+    def connect(self) -> Any:
+        start = time.perf_counter()
+        try:
+            return super().connect()  # type: ignore[misc]
+        except PoolTimeoutError:
+            self.timeouts += 1
+            raise
+        finally:
+            self.checkouts += 1
+            self.checkout_seconds += time.perf_counter() - start
+
+    def _create_connection(self) -> Any:
+        start = time.perf_counter()
+        try:
+            return super()._create_connection()  # type: ignore[misc]
+        finally:
+            self.connect_seconds += time.perf_counter() - start
+
+
+class InstrumentedQueuePool(_InstrumentedPoolMixin, QueuePool):
+    pass
+
+
+class InstrumentedAsyncQueuePool(_InstrumentedPoolMixin, AsyncAdaptedQueuePool):
+    pass
+
+
+pool_options: dict[str, Any] = {
+    "pool_size": settings.POSTGRES_POOL_SIZE,
+    "max_overflow": settings.POSTGRES_MAX_OVERFLOW,
+    "pool_timeout": settings.POSTGRES_POOL_TIMEOUT,
+    "pool_recycle": settings.POSTGRES_POOL_RECYCLE,
+    "pool_pre_ping": settings.POSTGRES_POOL_PRE_PING,
+}
+
+engine = create_engine(
+    str(settings.SQLALCHEMY_DATABASE_URI),
+    poolclass=InstrumentedQueuePool,
+    **pool_options,
+)
+# psycopg 3 speaks asyncio natively, so the same DSN gives us the async dialect
+async_engine = create_async_engine(
+    str(settings.SQLALCHEMY_DATABASE_URI),
+    poolclass=InstrumentedAsyncQueuePool,
+    **pool_options,
+)
+
+replica_engines = [
+    create_async_engine(uri, poolclass=InstrumentedAsyncQueuePool, **pool_options)
+    for uri in settings.SQLALCHEMY_REPLICA_URIS
+]
+_replica_cycle = itertools.cycle(replica_engines)
+
+
+def next_replica_engine() -> AsyncEngine | None:
+    """
+    Round-robin over the configured read replicas, None when there are none.
+    """
+    return next(_replica_cycle) if replica_engines else None
+
+
+@event.listens_for(Session, "after_flush")
+def _mark_flush_writes(session: Session, _flush_context: Any) -> None:
+    session.info["has_writes"] = True
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _mark_statement_writes(orm_execute_state: ORMExecuteState) -> None:
+    if not orm_execute_state.is_select:
+        orm_execute_state.session.info["has_writes"] = True
+
+
+class ReadSession(Session):
+    """
+    Session for read-only routes.
+
+    SELECTs go to the replica stored in ``info["replica"]``. Once the request's
+    primary session (``info["primary"]``) has written anything, or when this
+    session flushes itself, statements fall back to the primary so a request
+    always reads its own writes.
+    """
+
+    def get_bind(self, mapper: Any = None, clause: Any = None, **kw: Any) -> Any:
+        replica: AsyncEngine | None = self.info.get("replica")
+        primary: Session | None = self.info.get("primary")
+        if (
+            replica is None
+            or self._flushing
+            or self.info.get("has_writes")
+            or (primary is not None and primary.info.get("has_writes"))
+            or not isinstance(clause, Select)
+        ):
+            return super().get_bind(mapper, clause=clause, **kw)
+        return replica.sync_engine
+
 
-engine = create_engine(str(settings.SQLALCHEMY_DATABASE_URI))
+def get_pool_stats(name: str, db_engine: Engine | AsyncEngine) -> PoolStats:
+    """
+    Snapshot of an engine's pool for the current worker process.
+    """
+    pool = db_engine.pool
+    assert isinstance(pool, _InstrumentedPoolMixin) and isinstance(pool, QueuePool)
+    return PoolStats(
+        engine=name,
+        pid=os.getpid(),
+        pool_size=pool.size(),
+        max_overflow=settings.POSTGRES_MAX_OVERFLOW,
+        checked_out=pool.checkedout(),
+        idle=pool.checkedin(),
+        # QueuePool counts overflow from -pool_size until the pool is full
+        overflow=max(pool.overflow(), 0),
+        checkouts=pool.checkouts,
+        timeouts=pool.timeouts,
+        wait_seconds=max(pool.checkout_seconds - pool.connect_seconds, 0.0),
+    )
 
 
 # make sure all SQLModel models are imported (app.models) before initializing DB
@@ -0,0 +1,116 @@
+"""
+Keys signing and verifying the tokens this app issues.
+
+Every token names its key in the ``kid`` header. New tokens are signed with
+``JWT_SIGNING_KID``, every other configured key still verifies, so a key is
+rotated by first adding the new one to ``JWT_KEYS`` on all workers, then
+switching ``JWT_SIGNING_KID`` to it, and dropping the old key once the tokens
+it signed have expired. Nobody has to log in again along the way.
+
+Keys are parsed once when the ring is built, PEM parsing is not repeated for
+each token. ``SECRET_KEY`` is in the ring as kid "default" (unless a
+configured key takes that kid), signing while ``JWT_KEYS`` is empty. Tokens
+carrying no ``kid``, issued before the key ring, are only accepted while it
+signs. Once ``JWT_KEYS`` is set, "default" still verifies the tokens it
+signed until ``JWT_KEEP_DEFAULT_KEY`` is turned off.
+"""
+
+from collections.abc import Iterable
+from typing import Any
+
+import jwt
+from jwt.algorithms import get_default_algorithms
+
+from app.core.config import SigningKey, settings
+
+DEFAULT_KID = "default"
+
+
+class KeyRing:
+    def __init__(
+        self,
+        keys: Iterable[SigningKey],
+        *,
+        signing_kid: str,
+        kidless_kid: str | None = None,
+    ) -> None:
+        # Key verifying tokens without a kid header, none are accepted if None
+        self.kidless_kid = kidless_kid
+        algorithms = get_default_algorithms()
+        self._signing: dict[str, tuple[str, Any]] = {}
+        self._verifying: dict[str, tuple[str, Any]] = {}
+        for key in keys:
+            algorithm = algorithms.get(key.algorithm)
+            if algorithm is None:
+                raise ValueError(
+                    f'Key "{key.kid}" uses {key.algorithm}, which needs the '
+                    "cryptography package"
+                )
+            if key.algorithm == "HS256":
+                if not key.secret:
+                    raise ValueError(f'HS256 key "{key.kid}" has no secret')
+                prepared = algorithm.prepare_key(key.secret)
+                self._signing[key.kid] = (key.algorithm, prepared)
+                self._verifying[key.kid] = (key.algorithm, prepared)
+                continue
+            if key.private_key:
+                private_key = algorithm.prepare_key(key.private_key)
+                self._signing[key.kid] = (key.algorithm, private_key)
+                public_key = private_key.public_key()
+            elif key.public_key:
+                public_key = algorithm.prepare_key(key.public_key)
+            else:
+                raise ValueError(f'Key "{key.kid}" has no private or public key')
+            self._verifying[key.kid] = (key.algorithm, public_key)
+        if signing_kid not in self._signing:
+            raise ValueError(f'Cannot sign with key "{signing_kid}", no private key')
+        self.signing_kid = signing_kid
+
+    @property
+    def kids(self) -> list[str]:
+        return list(self._verifying)
+
+    def encode(self, payload: dict[str, Any]) -> str:
+        algorithm, key = self._signing[self.signing_kid]
+        return jwt.encode(
+            payload, key, algorithm=algorithm, headers={"kid": self.signing_kid}
+        )
+
+    def decode(self, token: str, **options: Any) -> dict[str, Any]:
+        """
+        Verify ``token`` with the key its header names. The key's own
+        algorithm is the only one accepted, whatever the header claims.
+        Raises ``jwt.InvalidTokenError`` like ``jwt.decode``.
+        """
+        kid = jwt.get_unverified_header(token).get("kid", self.kidless_kid)
+        if kid is None:
+            raise jwt.InvalidTokenError("Token names no signing key")
+        entry = self._verifying.get(kid) if isinstance(kid, str) else None
+        if entry is None:
+            raise jwt.InvalidTokenError(f"Unknown signing key {kid!r}")
+        algorithm, key = entry
+        return jwt.decode(token, key, algorithms=[algorithm], **options)
+
+
+def build_key_ring(
+    keys: list[SigningKey],
+    *,
+    signing_kid: str | None,
+    secret_key: str,
+    keep_default: bool = True,
+) -> KeyRing:
+    if signing_kid is None:
+        # SECRET_KEY signs, and verifies the tokens from before the key ring
+        keys = [*keys, SigningKey(kid=DEFAULT_KID, secret=secret_key)]
+        return KeyRing(keys, signing_kid=DEFAULT_KID, kidless_kid=DEFAULT_KID)
+    if keep_default and not any(key.kid == DEFAULT_KID for key in keys):
+        keys = [*keys, SigningKey(kid=DEFAULT_KID, secret=secret_key)]
+    return KeyRing(keys, signing_kid=signing_kid)
+
+
+key_ring = build_key_ring(
+    settings.JWT_KEYS,
+    signing_kid=settings.JWT_SIGNING_KID,
+    secret_key=settings.SECRET_KEY,
+    keep_default=settings.JWT_KEEP_DEFAULT_KEY,
+)
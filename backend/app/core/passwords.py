@@ -0,0 +1,152 @@
+"""
+bcrypt hashing off the request threads.
+
+bcrypt is deliberately slow, a login costs tens of milliseconds of CPU. Run
+inline, a burst of logins holds the GIL and every thread of the request pool.
+Hashes are computed by a small process pool instead, and at most
+``PASSWORD_HASH_MAX_PENDING`` operations may be running or queued per worker:
+callers past that get ``PasswordHashingBusy`` (answered with a 503) instead
+of tying up yet another request thread while they wait.
+"""
+
+import multiprocessing
+import os
+import threading
+import time
+from collections.abc import Callable
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, TypeVar, cast
+
+from passlib.context import CryptContext
+
+from app.core.config import settings
+from app.models import PasswordHashStats
+
+# Hashes below the configured cost are flagged for an update, raising
+# PASSWORD_BCRYPT_ROUNDS upgrades stored hashes as users log in
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__rounds=settings.PASSWORD_BCRYPT_ROUNDS,
+    bcrypt__min_rounds=settings.PASSWORD_BCRYPT_ROUNDS,
+)
+
+T = TypeVar("T")
+
+
+class PasswordHashingBusy(Exception):
+    """
+    Too many password operations are already pending in this worker.
+    """
+
+
+# Run in the pool processes
+
+
+def _hash(password: str) -> str:
+    return cast(str, pwd_context.hash(password))
+
+
+def _verify_and_update(password: str, hashed_password: str) -> tuple[bool, str | None]:
+    return cast(
+        tuple[bool, str | None],
+        pwd_context.verify_and_update(password, hashed_password),
+    )
+
+
+def _timed(function: Callable[..., T], *args: Any) -> tuple[T, float, float]:
+    started = time.perf_counter()
+    result = function(*args)
+    return result, started, time.perf_counter()
+
+
+class PasswordHasher:
+    def __init__(self, *, workers: int, max_pending: int) -> None:
+        """
+        With ``workers`` set to 0 hashing runs inline in the calling thread,
+        still bounded by ``max_pending``.
+        """
+        self.workers = workers
+        self.max_pending = max_pending
+        self._executor: ProcessPoolExecutor | None = None
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self.pending = 0
+        self.completed = 0
+        self.rejected = 0
+        self.queue_seconds = 0.0
+        self.hash_seconds = 0.0
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                # Spawned, forking would copy the worker's threads and
+                # open database connections into the hashing processes
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+            return self._executor
+
+    def _run(self, function: Callable[..., T], *args: Any) -> T:
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self.rejected += 1
+            raise PasswordHashingBusy()
+        submitted = time.perf_counter()
+        with self._lock:
+            self.pending += 1
+        try:
+            if self.workers > 0:
+                future = self._get_executor().submit(_timed, function, *args)
+                result, started, finished = future.result()
+            else:
+                result, started, finished = _timed(function, *args)
+            with self._lock:
+                self.completed += 1
+                # perf_counter is system wide on Linux, comparable across processes
+                self.queue_seconds += max(started - submitted, 0.0)
+                self.hash_seconds += finished - started
+            return result
+        finally:
+            with self._lock:
+                self.pending -= 1
+            self._slots.release()
+
+    def hash(self, password: str) -> str:
+        return self._run(_hash, password)
+
+    def verify_and_update(
+        self, password: str, hashed_password: str
+    ) -> tuple[bool, str | None]:
+        """
+        Check ``password``, and when the hash uses outdated settings return
+        a fresh hash to store along with the result.
+        """
+        return self._run(_verify_and_update, password, hashed_password)
+
+    def stats(self) -> PasswordHashStats:
+        with self._lock:
+            return PasswordHashStats(
+                pid=os.getpid(),
+                workers=self.workers,
+                max_pending=self.max_pending,
+                pending=self.pending,
+                queued=max(self.pending - self.workers, 0) if self.workers else 0,
+                completed=self.completed,
+                rejected=self.rejected,
+                queue_seconds=self.queue_seconds,
+                hash_seconds=self.hash_seconds,
+            )
+
+    def shutdown(self) -> None:
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(cancel_futures=True)
+                self._executor = None
+
+
+password_hasher = PasswordHasher(
+    workers=settings.PASSWORD_HASH_WORKERS,
+    max_pending=settings.PASSWORD_HASH_MAX_PENDING,
+)
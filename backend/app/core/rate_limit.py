@@ -0,0 +1,114 @@
+"""
+Sliding-window rate limiting for the unauthenticated endpoints.
+
+Each key (an email, a client address) may be hit ``limit`` times in any
+``window`` seconds. The in-process backend keeps one timestamp per hit, so
+the window truly slides instead of resetting on fixed boundaries. With
+several workers or hosts each process counts on its own; a shared store can
+be plugged in by implementing ``RateLimitBackend``.
+"""
+
+import threading
+import time
+from collections import deque
+from collections.abc import Callable
+from typing import Protocol
+
+from app.core.config import settings
+
+
+class RateLimitBackend(Protocol):
+    def hit(self, key: str, *, limit: int, window: float) -> float | None:
+        """
+        Record a hit on ``key`` and return None, or, when ``key`` already had
+        ``limit`` hits in the last ``window`` seconds, record nothing and
+        return the seconds until the next hit would be allowed.
+        """
+        ...
+
+
+class MemoryRateLimitBackend:
+    def __init__(
+        self, *, max_keys: int = 100_000, clock: Callable[[], float] = time.monotonic
+    ) -> None:
+        self.max_keys = max_keys
+        self.clock = clock
+        self._hits: dict[str, deque[float]] = {}
+        self._lock = threading.Lock()
+
+    def hit(self, key: str, *, limit: int, window: float) -> float | None:
+        now = self.clock()
+        with self._lock:
+            hits = self._hits.get(key)
+            if hits is None:
+                if len(self._hits) >= self.max_keys:
+                    self._sweep(now - window)
+                hits = self._hits[key] = deque()
+            while hits and hits[0] <= now - window:
+                hits.popleft()
+            if len(hits) >= limit:
+                return hits[0] + window - now
+            hits.append(now)
+            return None
+
+    def clear(self) -> None:
+        with self._lock:
+            self._hits.clear()
+
+    def _sweep(self, cutoff: float) -> None:
+        # Drop keys without recent hits, then the oldest ones if still full
+        for key in [
+            key for key, hits in self._hits.items() if not hits or hits[-1] <= cutoff
+        ]:
+            del self._hits[key]
+        while len(self._hits) >= self.max_keys:
+            del self._hits[next(iter(self._hits))]
+
+
+class RateLimiter:
+    def __init__(
+        self, backend: RateLimitBackend, *, name: str, limit: int, window: float
+    ) -> None:
+        self.backend = backend
+        self.name = name
+        self.limit = limit
+        self.window = window
+
+    def hit(self, key: str) -> float | None:
+        """
+        None when the attempt may go ahead, else seconds to wait.
+        """
+        if self.limit <= 0:
+            return None
+        return self.backend.hit(
+            f"{self.name}:{key}", limit=self.limit, window=self.window
+        )
+
+
+rate_limit_backend = MemoryRateLimitBackend()
+
+login_email_limiter = RateLimiter(
+    rate_limit_backend,
+    name="login-email",
+    limit=settings.LOGIN_RATE_LIMIT_PER_EMAIL,
+    window=settings.LOGIN_RATE_LIMIT_WINDOW_SECONDS,
+)
+# Higher, a classroom signing in at once shares one address
+login_ip_limiter = RateLimiter(
+    rate_limit_backend,
+    name="login-ip",
+    limit=settings.LOGIN_RATE_LIMIT_PER_IP,
+    window=settings.LOGIN_RATE_LIMIT_WINDOW_SECONDS,
+)
+recovery_email_limiter = RateLimiter(
+    rate_limit_backend,
+    name="recovery-email",
+    limit=settings.PASSWORD_RECOVERY_RATE_LIMIT_PER_EMAIL,
+    window=settings.PASSWORD_RECOVERY_RATE_LIMIT_WINDOW_SECONDS,
+)
+recovery_ip_limiter = RateLimiter(
+    rate_limit_backend,
+    name="recovery-ip",
+    limit=settings.LOGIN_RATE_LIMIT_PER_IP,
+    window=settings.PASSWORD_RECOVERY_RATE_LIMIT_WINDOW_SECONDS,
+)
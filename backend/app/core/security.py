@@ -1,23 +1,88 @@
-from datetime import datetime, timedelta, timezone
-from sqlmodel import select
-from typing import Any
 import uuid
+from datetime import datetime, timedelta
 from typing import Any, Dict, List, Optional
-import jwt
-from passlib.context import CryptContext
-from app.models import User, UserRole, RoleClaims, Roles
-from app.core.config import settings
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+from sqlmodel import Session, col, select
 
+from app.core.config import settings
+from app.core.keys import key_ring
+from app.core.passwords import password_hasher, pwd_context  # noqa: F401
+from app.core.token_cache import token_cache
+from app.models import User, UserEffectiveClaim
 
+# Algorithm of the "default" key, see app.core.keys for the configured ones
 ALGORITHM = "HS256"
 
 
+def get_permissions(session: Session, user: User) -> Dict[str, Any]:
+    """
+    Roles and claims to embed in the user's access tokens.
+
+    Args:
+        session: Database session for reading the user's effective claims
+        user: The user
+
+    Returns:
+        Dictionary with the "roles" and "claims" token fields, empty for superusers
+    """
+    # If superuser, we can skip detailed permissions as they have all
+    if user.is_superuser:
+        return {}
+
+    # One indexed read of the trigger-maintained projection
+    statement = select(UserEffectiveClaim).where(
+        col(UserEffectiveClaim.user_id) == user.id
+    )
+    roles: Dict[str, str] = {}
+    claims: dict[str, set[str]] = {}
+    for row in session.exec(statement):
+        roles[str(row.role_id)] = row.role_name
+        if row.claim_type is not None and row.claim_value is not None:
+            claims.setdefault(row.claim_type, set()).add(row.claim_value)
+
+    return {
+        "roles": [{"id": role_id, "name": name} for role_id, name in roles.items()],
+        "claims": {claim_type: sorted(values) for claim_type, values in claims.items()},
+    }
+
+
+def encode_access_token(
+    user: User,
+    permissions: Dict[str, Any],
+    expires_delta: Optional[timedelta] = None,
+) -> str:
+    """
+    Create a JWT access token from already resolved permissions.
+
+    Args:
+        user: The user the token is issued to
+        permissions: Roles and claims, as returned by get_permissions
+        expires_delta: Optional expiration time delta, defaults to settings.ACCESS_TOKEN_EXPIRE_MINUTES
+
+    Returns:
+        JWT token as a string
+    """
+    if expires_delta:
+        expire = datetime.utcnow() + expires_delta
+    else:
+        expire = datetime.utcnow() + timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
+
+    token_data = {
+        "sub": str(user.id),  # subject (user ID)
+        "exp": expire,        # expiration time
+        "iat": datetime.utcnow(),  # issued at
+        "is_superuser": user.is_superuser,
+        "is_active": user.is_active,
+        "permissions_version": user.permissions_version,
+        **permissions,
+    }
+    return key_ring.encode(token_data)
+
+
 def create_access_token(
     user_id: uuid.UUID, 
     expires_delta: Optional[timedelta] = None,
-    session = None
+    session: Session | None = None
 ) -> str:
     """
     Create a JWT access token that includes user roles and role claims.
@@ -30,81 +95,28 @@ def create_access_token(
     Returns:
         JWT token as a string
     """
+    # If a database session is provided, fetch and include roles and claims
+    user = session.get(User, user_id) if session else None
+    if session and user:
+        return encode_access_token(
+            user, get_permissions(session, user), expires_delta
+        )
+
     if expires_delta:
         expire = datetime.utcnow() + expires_delta
     else:
         expire = datetime.utcnow() + timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
-    
-    # Start with basic token data
     token_data = {
         "sub": str(user_id),  # subject (user ID)
         "exp": expire,        # expiration time
         "iat": datetime.utcnow()  # issued at
     }
-    
-    # If a database session is provided, fetch and include roles and claims
-    if session:
-        # Get user to check if superuser
-        user = session.get(User, user_id)
-        if user:
-            token_data["is_superuser"] = user.is_superuser
-            token_data["is_active"] = user.is_active
-            
-            # If superuser, we can skip detailed permissions as they have all
-            if not user.is_superuser:
-                # Get user's active roles
-                user_roles_query = select(UserRole, Roles).join(
-                    Roles, UserRole.role_id == Roles.role_id
-                ).where(
-                    UserRole.user_id == user_id,
-                    UserRole.is_active == True
-                )
-                user_role_results = session.exec(user_roles_query).all()
-                
-                # Extract role IDs and names
-                roles = []
-                role_ids = []
-                for user_role, role in user_role_results:
-                    roles.append({
-                        "id": str(role.role_id),
-                        "name": role.role_name
-                    })
-                    role_ids.append(role.role_id)
-                
-                token_data["roles"] = roles
-                
-                # If there are roles, get the claims
-                if role_ids:
-                    # Get all active claims for the user's roles
-                    claims_query = select(RoleClaims).where(
-                        RoleClaims.role_id.in_(role_ids),
-                        RoleClaims.role_claim_isactive == True
-                    )
-                    role_claims = session.exec(claims_query).all()
-                    
-                    # Organize claims by type
-                    claims_by_type = {}
-                    for claim in role_claims:
-                        if claim.role_claim_type not in claims_by_type:
-                            claims_by_type[claim.role_claim_type] = []
-                        
-                        claims_by_type[claim.role_claim_type].append(claim.role_claim_value)
-                    
-                    token_data["claims"] = claims_by_type
-    
-    # Create the JWT token
-    encoded_jwt = jwt.encode(
-        token_data, 
-        settings.SECRET_KEY, 
-        algorithm=ALGORITHM
-    )
-    print(encoded_jwt)
-    
-    return encoded_jwt
+    return key_ring.encode(token_data)
 
 def decode_access_token(token: str) -> Dict[str, Any]:
     """
-    Decode a JWT token and return its contents.
+    Decode a JWT token and return its contents. Tokens verified before are
+    served from the token cache until they expire.
     
     Args:
         token: JWT token string
@@ -112,11 +124,12 @@ def decode_access_token(token: str) -> Dict[str, Any]:
     Returns:
         Decoded token payload as a dictionary
     """
-    return jwt.decode(
-        token,
-        settings.SECRET_KEY,
-        algorithms=[ALGORITHM]
-    )
+    payload = token_cache.get(token)
+    if payload is None:
+        payload = key_ring.decode(token)
+        token_cache.put(token, payload)
+    # Copied, callers must not change the cached payload
+    return dict(payload)
 
 def get_claims_from_token(token: str) -> Dict[str, List[str]]:
     """
@@ -134,7 +147,8 @@ def get_claims_from_token(token: str) -> Dict[str, List[str]]:
     if decoded_token.get("is_superuser", False):
         return {"*": ["*"]}
     
-    return decoded_token.get("claims", {})
+    claims: dict[str, list[str]] = decoded_token.get("claims", {})
+    return claims
 
 def has_claim_in_token(token: str, claim_type: str, claim_value: str) -> bool:
     """
@@ -157,7 +171,9 @@ def has_claim_in_token(token: str, claim_type: str, claim_value: str) -> bool:
     # Check for specific claim
     return claim_type in claims and claim_value in claims[claim_type]
 
-def has_role_in_token(token: str, role_id: str = None, role_name: str = None) -> bool:
+def has_role_in_token(
+    token: str, role_id: str | None = None, role_name: str | None = None
+) -> bool:
     """
     Check if a token has a specific role.
     
@@ -189,8 +205,11 @@ def has_role_in_token(token: str, role_id: str = None, role_name: str = None) ->
     return False
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return pwd_context.verify(plain_password, hashed_password)
+    verified, _new_hash = password_hasher.verify_and_update(
+        plain_password, hashed_password
+    )
+    return verified
 
 
 def get_password_hash(password: str) -> str:
-    return pwd_context.hash(password)
+    return password_hasher.hash(password)
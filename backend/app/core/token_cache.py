@@ -0,0 +1,68 @@
+"""
+Per-process cache of verified access tokens.
+
+Checking a token's signature and claims on every request is repeated work,
+clients send the same token until it expires. Verified payloads are kept by
+the token's sha256 until the token's own ``exp``, so an expired token is
+never served from the cache and goes back through ``jwt.decode``.
+"""
+
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable
+from typing import Any
+
+from app.core.config import settings
+
+
+class TokenCache:
+    def __init__(
+        self, *, max_size: int, clock: Callable[[], float] = time.time
+    ) -> None:
+        self.max_size = max_size
+        self.clock = clock
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[str, tuple[float, dict[str, Any]]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(token: str) -> str:
+        return hashlib.sha256(token.encode()).hexdigest()
+
+    def get(self, token: str) -> dict[str, Any] | None:
+        key = self.key(token)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] <= self.clock():
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, token: str, payload: dict[str, Any]) -> None:
+        """
+        Keep a verified ``payload`` until its ``exp``, tokens without one are
+        not cached.
+        """
+        expires = payload.get("exp")
+        if self.max_size <= 0 or not isinstance(expires, int | float):
+            return
+        key = self.key(token)
+        with self._lock:
+            self._entries[key] = (float(expires), payload)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+token_cache = TokenCache(max_size=settings.TOKEN_CACHE_MAX_SIZE)
@@ -0,0 +1,137 @@
+"""
+Per-process cache of authenticated users.
+
+``get_current_user`` runs on every authenticated request. Caching the user row
+by id saves the primary-key SELECT on each of them; the routes that change or
+delete a user drop its entry, on every worker through
+``app.core.user_invalidation``. Entries are detached snapshots: a request gets
+its own copy merged into its session, so the cached object is never mutated
+and changes made by a route are flushed the usual way.
+"""
+
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from collections.abc import Callable
+
+from sqlalchemy import inspect
+from sqlalchemy.orm import make_transient_to_detached
+from sqlmodel import Session
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.core.config import settings
+from app.models import User
+
+
+class UserCache:
+    """
+    Bounded LRU of user snapshots, each entry kept for ``ttl`` seconds.
+    """
+
+    def __init__(
+        self,
+        *,
+        ttl: float,
+        max_size: int,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.ttl = ttl
+        self.max_size = max_size
+        self.clock = clock
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[uuid.UUID, tuple[float, User]] = OrderedDict()
+        self._lock = threading.Lock()
+        # Bumped by every invalidation, a user read before it must not be stored
+        self._generation = 0
+        # True while the invalidations of the other workers reach this one,
+        # see app.core.user_invalidation
+        self.shared = False
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl > 0 and self.max_size > 0
+
+    @property
+    def generation(self) -> int:
+        return self._generation
+
+    def get(self, user_id: uuid.UUID) -> User | None:
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is None:
+                self.misses += 1
+                return None
+            expires, snapshot = entry
+            if expires <= self.clock():
+                del self._entries[user_id]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(user_id)
+            self.hits += 1
+            return snapshot
+
+    def put(self, user: User, *, generation: int) -> None:
+        """
+        Store a snapshot of ``user``, unless the cache was invalidated since
+        ``generation`` was read (the row may have changed after it was loaded).
+        """
+        if not self.enabled:
+            return
+        snapshot = User(
+            **{attr.key: getattr(user, attr.key) for attr in inspect(User).column_attrs}
+        )
+        make_transient_to_detached(snapshot)
+        with self._lock:
+            if generation != self._generation:
+                return
+            self._entries[snapshot.id] = (self.clock() + self.ttl, snapshot)
+            self._entries.move_to_end(snapshot.id)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, user_id: uuid.UUID) -> None:
+        with self._lock:
+            self._generation += 1
+            self._entries.pop(user_id, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
+
+    def load(self, session: Session, user_id: uuid.UUID) -> User | None:
+        """
+        The user as an instance of ``session``, read from the database only
+        when it is not cached.
+        """
+        snapshot = self.get(user_id)
+        if snapshot is not None:
+            # load=False copies the snapshot into the session without a SELECT
+            return session.merge(snapshot, load=False)
+        generation = self.generation
+        user = session.get(User, user_id)
+        if user is not None:
+            self.put(user, generation=generation)
+        return user
+
+    async def load_async(
+        self, session: AsyncSession, user_id: uuid.UUID
+    ) -> User | None:
+        """
+        ``load`` for an AsyncSession.
+        """
+        snapshot = self.get(user_id)
+        if snapshot is not None:
+            return await session.merge(snapshot, load=False)
+        generation = self.generation
+        user = await session.get(User, user_id)
+        if user is not None:
+            self.put(user, generation=generation)
+        return user
+
+
+user_cache = UserCache(
+    ttl=settings.USER_CACHE_TTL_SECONDS, max_size=settings.USER_CACHE_MAX_SIZE
+)
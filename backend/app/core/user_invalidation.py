@@ -0,0 +1,92 @@
+"""
+User cache invalidation shared by every worker.
+
+Each worker caches authenticated users (``app.core.user_cache``), including
+the ``permissions_version`` that claim checks compare tokens with. Writes that
+change users drop them through ``drop_cached_users``, which also queues a
+Postgres ``NOTIFY`` with their ids in the writing transaction. Postgres
+delivers it to every listening worker on commit, and each one drops those
+users from its own cache, so a role change or a deactivation applies to the
+whole cluster as soon as it commits rather than once the entries expire.
+"""
+
+import asyncio
+import logging
+import uuid
+from collections.abc import Sequence
+
+import psycopg
+from sqlalchemy import Engine, event, func, select
+from sqlmodel import Session
+
+from app.core.user_cache import user_cache
+
+logger = logging.getLogger(__name__)
+
+CHANNEL = "user_invalidation"
+# Payload asking every worker to empty its cache
+CLEAR_ALL = "*"
+# NOTIFY payloads are limited to 8000 bytes, an id takes 37 with its comma
+IDS_PER_NOTIFICATION = 200
+
+
+def drop_cached_users(session: Session, user_ids: Sequence[uuid.UUID]) -> None:
+    """
+    Drop ``user_ids`` from the user cache of every worker once the session's
+    transaction commits: this worker's right away, the others when the
+    notification reaches their listener. Nothing is dropped on rollback.
+    """
+    for start in range(0, len(user_ids), IDS_PER_NOTIFICATION):
+        batch = user_ids[start : start + IDS_PER_NOTIFICATION]
+        payload = ",".join(str(user_id) for user_id in batch)
+        session.execute(select(func.pg_notify(CHANNEL, payload)))
+
+    @event.listens_for(session, "after_commit", once=True)
+    def _drop_cached_users(_session: Session) -> None:
+        for user_id in user_ids:
+            user_cache.invalidate(user_id)
+
+
+def apply(payload: str) -> None:
+    """
+    Handle a notification: comma separated user ids, or CLEAR_ALL.
+    """
+    try:
+        user_ids = [uuid.UUID(part) for part in payload.split(",")]
+    except ValueError:
+        if payload != CLEAR_ALL:
+            logger.warning("Unknown user invalidation %r, clearing the cache", payload)
+        user_cache.clear()
+        return
+    for user_id in user_ids:
+        user_cache.invalidate(user_id)
+
+
+async def listen_for_invalidations(
+    engine: Engine, *, retry_seconds: float = 5.0
+) -> None:
+    """
+    Apply the invalidations of every worker until cancelled. Notifications
+    sent while the connection was down are lost, so the cache is emptied each
+    time listening (re)starts, and ``user_cache.shared`` is only set while it
+    runs.
+    """
+    # LISTEN needs a connection of its own, outside the pool and in autocommit
+    dsn = engine.url.set(drivername="postgresql").render_as_string(hide_password=False)
+    while True:
+        try:
+            async with await psycopg.AsyncConnection.connect(
+                dsn, autocommit=True
+            ) as connection:
+                await connection.execute(f"LISTEN {CHANNEL}")
+                user_cache.clear()
+                user_cache.shared = True
+                async for notification in connection.notifies():
+                    apply(notification.payload)
+        except Exception:
+            logger.exception(
+                "User invalidation listener failed, retrying in %ss", retry_seconds
+            )
+        finally:
+            user_cache.shared = False
+        await asyncio.sleep(retry_seconds)
@@ -1,10 +1,28 @@
+import hashlib
+import secrets
 import uuid
-from typing import Any
+from datetime import datetime, timedelta
+from typing import Any, cast
 
-from sqlmodel import Session, select
+from sqlalchemy import ColumnElement, CursorResult, delete, func, update
+from sqlmodel import Session, col, select
 
-from app.core.security import get_password_hash, verify_password
-from app.models import Item, ItemCreate, User, UserCreate, UserUpdate
+from app.core.config import settings
+from app.core.passwords import password_hasher
+from app.core.security import get_password_hash
+from app.core.user_cache import user_cache
+from app.core.user_invalidation import drop_cached_users
+from app.models import (
+    EmailOutbox,
+    EmailOutboxStats,
+    Item,
+    ItemCreate,
+    RefreshToken,
+    User,
+    UserCreate,
+    UserRole,
+    UserUpdate,
+)
 
 
 def create_user(*, session: Session, user_create: UserCreate) -> User:
@@ -13,24 +31,55 @@ def create_user(*, session: Session, user_create: UserCreate) -> User:
     )
     session.add(db_obj)
     session.commit()
-    session.refresh(db_obj)
     return db_obj
 
 
 def update_user(*, session: Session, db_user: User, user_in: UserUpdate) -> Any:
     user_data = user_in.model_dump(exclude_unset=True)
-    extra_data = {}
+    extra_data: dict[str, Any] = {}
     if "password" in user_data:
         password = user_data["password"]
         hashed_password = get_password_hash(password)
         extra_data["hashed_password"] = hashed_password
+        revoke_user_refresh_tokens(session=session, user_id=db_user.id)
+    # Superusers' tokens carry no roles or claims, refreshes must rebuild them
+    if user_data.get("is_superuser", db_user.is_superuser) != db_user.is_superuser:
+        extra_data["permissions_version"] = db_user.permissions_version + 1
     db_user.sqlmodel_update(user_data, update=extra_data)
     session.add(db_user)
+    drop_cached_users(session, [db_user.id])
     session.commit()
-    session.refresh(db_user)
     return db_user
 
 
+def bump_permissions_version(
+    *,
+    session: Session,
+    user_id: uuid.UUID | None = None,
+    role_id: uuid.UUID | None = None,
+) -> None:
+    """
+    Outdate the permissions embedded in tokens of a user, or of every holder
+    of a role. Runs in the caller's transaction, the cached users are dropped
+    on every worker once it commits.
+    """
+    condition: ColumnElement[bool]
+    if role_id is not None:
+        holders = select(UserRole.user_id).where(UserRole.role_id == role_id)
+        condition = col(User.id).in_(holders)
+    else:
+        condition = col(User.id) == user_id
+    statement = (
+        update(User)
+        .where(condition)
+        .values(permissions_version=col(User.permissions_version) + 1)
+        .returning(col(User.id))
+        .execution_options(synchronize_session=False)
+    )
+    user_ids = session.exec(statement).scalars().all()
+    drop_cached_users(session, user_ids)
+
+
 def get_user_by_email(*, session: Session, email: str) -> User | None:
     statement = select(User).where(User.email == email)
     session_user = session.exec(statement).first()
@@ -41,14 +90,169 @@ def authenticate(*, session: Session, email: str, password: str) -> User | None:
     db_user = get_user_by_email(session=session, email=email)
     if not db_user:
         return None
-    if not verify_password(password, db_user.hashed_password):
+    verified, new_hash = password_hasher.verify_and_update(
+        password, db_user.hashed_password
+    )
+    if not verified:
         return None
+    # Hashes made with outdated settings are upgraded while we have the password
+    if new_hash:
+        db_user.hashed_password = new_hash
+        session.add(db_user)
+        session.commit()
+        # Only this worker's copy: the old hash still verifies the same password
+        user_cache.invalidate(db_user.id)
     return db_user
 
 
+# Expired refresh tokens deleted along with each new one, more than are ever
+# created at once so that the table cannot outgrow its live tokens
+REFRESH_TOKENS_PRUNED_PER_TOKEN = 10
+
+
+def _refresh_token_hash(token: str) -> str:
+    return hashlib.sha256(token.encode()).hexdigest()
+
+
+def create_refresh_token(
+    *,
+    session: Session,
+    user: User,
+    permissions: dict[str, Any],
+    family_id: uuid.UUID | None = None,
+    expires_at: datetime | None = None,
+) -> str:
+    """
+    Store a new refresh token for ``user`` and return it, only its hash is kept.
+    Rotations pass the family and its expiry on, so that a chain of refreshes
+    still ends REFRESH_TOKEN_EXPIRE_DAYS after the login.
+    """
+    prune_refresh_tokens(session=session, limit=REFRESH_TOKENS_PRUNED_PER_TOKEN)
+    token = secrets.token_urlsafe(32)
+    session.add(
+        RefreshToken(
+            token_hash=_refresh_token_hash(token),
+            user_id=user.id,
+            family_id=family_id or uuid.uuid4(),
+            permissions_version=user.permissions_version,
+            permissions=permissions,
+            expires_at=expires_at
+            or datetime.utcnow() + timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS),
+        )
+    )
+    session.commit()
+    return token
+
+
+def prune_refresh_tokens(*, session: Session, limit: int) -> int:
+    """
+    Delete up to ``limit`` expired refresh tokens, returns how many. A family
+    expires as a whole, so this never hides a reused token of a live family.
+    Rows locked by another transaction are skipped. Runs in the caller's
+    transaction.
+    """
+    expired = (
+        select(RefreshToken.refresh_token_id)
+        .where(col(RefreshToken.expires_at) <= datetime.utcnow())
+        .limit(limit)
+        .with_for_update(skip_locked=True)
+    )
+    statement = delete(RefreshToken).where(
+        col(RefreshToken.refresh_token_id).in_(expired)
+    )
+    result = cast(CursorResult[Any], session.execute(statement))
+    return result.rowcount
+
+
+def get_refresh_token(
+    *, session: Session, token: str
+) -> tuple[RefreshToken, User] | None:
+    statement = (
+        select(RefreshToken, User)
+        .join(User, col(User.id) == RefreshToken.user_id)
+        .where(RefreshToken.token_hash == _refresh_token_hash(token))
+    )
+    return session.exec(statement).first()
+
+
+def revoke_refresh_token(*, session: Session, refresh_token: RefreshToken) -> bool:
+    """
+    Revoke a refresh token, False when it was already revoked, e.g. by a
+    concurrent refresh.
+    """
+    statement = (
+        update(RefreshToken)
+        .where(
+            col(RefreshToken.refresh_token_id) == refresh_token.refresh_token_id,
+            col(RefreshToken.revoked_at).is_(None),
+        )
+        .values(revoked_at=datetime.utcnow())
+    )
+    result = session.exec(statement)
+    return result.rowcount == 1
+
+
+def revoke_refresh_token_family(*, session: Session, family_id: uuid.UUID) -> None:
+    statement = (
+        update(RefreshToken)
+        .where(
+            col(RefreshToken.family_id) == family_id,
+            col(RefreshToken.revoked_at).is_(None),
+        )
+        .values(revoked_at=datetime.utcnow())
+    )
+    session.exec(statement)
+    session.commit()
+
+
+def revoke_user_refresh_tokens(*, session: Session, user_id: uuid.UUID) -> None:
+    """
+    Revoke every refresh token of a user, e.g. when the password changes.
+    Runs in the caller's transaction.
+    """
+    statement = (
+        update(RefreshToken)
+        .where(
+            col(RefreshToken.user_id) == user_id,
+            col(RefreshToken.revoked_at).is_(None),
+        )
+        .values(revoked_at=datetime.utcnow())
+    )
+    session.exec(statement)
+
+
+def enqueue_email(
+    *, session: Session, email_to: str, subject: str, html_content: str
+) -> EmailOutbox:
+    """
+    Queue an email for the email worker. Not committed here, it is sent
+    once the caller's transaction commits.
+    """
+    email = EmailOutbox(email_to=email_to, subject=subject, html_content=html_content)
+    session.add(email)
+    return email
+
+
+def get_email_outbox_stats(*, session: Session) -> EmailOutboxStats:
+    now = datetime.utcnow()
+    retrying = col(EmailOutbox.attempts) < settings.EMAIL_OUTBOX_MAX_ATTEMPTS
+    statement = select(
+        func.count().filter(retrying),
+        func.count().filter(retrying, col(EmailOutbox.next_attempt_at) <= now),
+        func.count().filter(~retrying),
+        func.min(EmailOutbox.created_at).filter(retrying),
+    ).where(col(EmailOutbox.sent_at).is_(None))
+    pending, due, failed, oldest = session.exec(statement).one()
+    return EmailOutboxStats(
+        pending=pending,
+        due=due,
+        failed=failed,
+        oldest_pending_seconds=(now - oldest).total_seconds() if oldest else None,
+    )
+
+
 def create_item(*, session: Session, item_in: ItemCreate, owner_id: uuid.UUID) -> Item:
     db_item = Item.model_validate(item_in, update={"owner_id": owner_id})
     session.add(db_item)
     session.commit()
-    session.refresh(db_item)
     return db_item
@@ -0,0 +1,152 @@
+"""
+Send the emails queued in the emailoutbox table.
+
+    python app/email_worker.py
+
+Runs until stopped. Each round claims up to EMAIL_OUTBOX_BATCH_SIZE due
+emails with ``FOR UPDATE SKIP LOCKED``, so several workers can run side by
+side without sending an email twice, and sends them over one SMTP
+connection. An email may be sent again if the worker dies between sending
+it and committing the batch. Once an hour, sent and given up emails older
+than EMAIL_OUTBOX_RETENTION_DAYS are deleted.
+"""
+
+import logging
+import smtplib
+import time
+from collections.abc import Sequence
+from datetime import datetime, timedelta
+from typing import Any, cast
+
+from sqlalchemy import CursorResult, delete, or_
+from sqlmodel import Session, col, select
+
+from app.core.config import settings
+from app.core.db import engine
+from app.models import EmailOutbox
+from app.utils import send_email, smtp_connection
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+PRUNE_INTERVAL_SECONDS = 3600
+
+
+def retry_delay(attempts: int) -> timedelta:
+    """
+    Wait before the next try of an email that failed ``attempts`` times.
+    """
+    seconds = settings.EMAIL_OUTBOX_RETRY_SECONDS * 2 ** (attempts - 1)
+    return timedelta(seconds=min(seconds, settings.EMAIL_OUTBOX_MAX_RETRY_SECONDS))
+
+
+def _failed(email: EmailOutbox, error: Exception) -> None:
+    email.attempts += 1
+    email.last_error = repr(error)
+    email.next_attempt_at = datetime.utcnow() + retry_delay(email.attempts)
+    if email.attempts >= settings.EMAIL_OUTBOX_MAX_ATTEMPTS:
+        logger.error("Giving up on email %s: %r", email.email_outbox_id, error)
+        # Never sent now, new account emails carry the initial password
+        email.html_content = ""
+    else:
+        logger.warning("Email %s failed: %r", email.email_outbox_id, error)
+
+
+def deliver(emails: Sequence[EmailOutbox]) -> None:
+    """
+    Send ``emails`` over one SMTP connection, marking each sent, or failed
+    and due again after the retry delay.
+    """
+    connection = smtp_connection()
+    try:
+        for index, email in enumerate(emails):
+            try:
+                send_email(
+                    email_to=email.email_to,
+                    subject=email.subject,
+                    html_content=email.html_content,
+                    smtp=connection,
+                )
+            except (smtplib.SMTPResponseException, smtplib.SMTPRecipientsRefused) as e:
+                # The server refused this email
+                _failed(email, e)
+            except OSError as e:
+                # Connection lost or refused, the rest of the batch would only
+                # wait for the same timeout
+                for unsent in emails[index:]:
+                    _failed(unsent, e)
+                return
+            except Exception as e:
+                _failed(email, e)
+            else:
+                email.sent_at = datetime.utcnow()
+                email.html_content = ""
+    finally:
+        connection.close()
+
+
+def drain(session: Session) -> int:
+    """
+    Send one batch of due emails, returns how many were claimed.
+    """
+    statement = (
+        select(EmailOutbox)
+        .where(
+            col(EmailOutbox.sent_at).is_(None),
+            col(EmailOutbox.attempts) < settings.EMAIL_OUTBOX_MAX_ATTEMPTS,
+            col(EmailOutbox.next_attempt_at) <= datetime.utcnow(),
+        )
+        .order_by(col(EmailOutbox.next_attempt_at))
+        .limit(settings.EMAIL_OUTBOX_BATCH_SIZE)
+        .with_for_update(skip_locked=True)
+    )
+    emails = session.exec(statement).all()
+    if emails:
+        deliver(emails)
+        session.add_all(emails)
+    session.commit()
+    return len(emails)
+
+
+def prune(session: Session) -> int:
+    """
+    Delete the sent and given up emails queued more than
+    EMAIL_OUTBOX_RETENTION_DAYS ago, returns how many.
+    """
+    cutoff = datetime.utcnow() - timedelta(days=settings.EMAIL_OUTBOX_RETENTION_DAYS)
+    statement = delete(EmailOutbox).where(
+        col(EmailOutbox.created_at) < cutoff,
+        or_(
+            col(EmailOutbox.sent_at).is_not(None),
+            col(EmailOutbox.attempts) >= settings.EMAIL_OUTBOX_MAX_ATTEMPTS,
+        ),
+    )
+    result = cast(CursorResult[Any], session.execute(statement))
+    pruned = result.rowcount
+    session.commit()
+    return pruned
+
+
+def main() -> None:
+    if not settings.emails_enabled:
+        logger.warning("SMTP_HOST or EMAILS_FROM_EMAIL is not set, not sending emails")
+        return
+    logger.info("Sending queued emails")
+    pruned_at = 0.0
+    while True:
+        try:
+            with Session(engine) as session:
+                if time.monotonic() - pruned_at >= PRUNE_INTERVAL_SECONDS:
+                    pruned_at = time.monotonic()
+                    logger.info("Deleted %d old emails", prune(session))
+                claimed = drain(session)
+        except Exception:
+            logger.exception("Sending queued emails failed")
+            claimed = 0
+        # A full batch likely left more behind, go on without waiting
+        if claimed < settings.EMAIL_OUTBOX_BATCH_SIZE:
+            time.sleep(settings.EMAIL_OUTBOX_POLL_SECONDS)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,367 @@
+"""
+Load catalog rows from CSV or XLSX files.
+
+    python app/import_catalog.py categories ../postgres/item_categories.csv
+    python app/import_catalog.py suppliers suppliers.xlsx --user chef@example.com
+
+The first row names the columns, using the API field names (see CATALOGS).
+Rows are streamed into a temporary staging table with COPY, then merged into
+the real table in the same transaction on the natural key: rows whose key
+exists are updated, the others inserted. When a file repeats a key the last
+row wins. Nothing is written if any row is rejected.
+
+XLSX files need the openpyxl package.
+"""
+
+import argparse
+import csv
+import logging
+import sys
+import uuid
+from collections.abc import Iterator
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+import psycopg
+from sqlalchemy import Connection, exc, text
+from sqlmodel import Session, select
+
+from app.core.config import settings
+from app.core.db import engine
+from app.models import User
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+class CatalogImportError(Exception):
+    pass
+
+
+@dataclass(frozen=True)
+class Column:
+    name: str
+    sql_type: str
+    required: bool = False
+
+
+@dataclass(frozen=True)
+class Parent:
+    """
+    File column holding the natural key of the parent row, stored as the
+    parent's primary key in ``column``.
+    """
+
+    file_column: str
+    column: str
+    table: str
+    key: str
+    pk: str
+    active: str
+
+
+@dataclass(frozen=True)
+class Catalog:
+    table: str
+    pk: str
+    key: str
+    active: str
+    columns: tuple[Column, ...]
+    parent: Parent | None = None
+
+
+CATALOGS = {
+    "categories": Catalog(
+        table="itemcategory",
+        pk="item_category_id",
+        key="item_category_code",
+        active="item_category_isactive",
+        columns=(
+            Column("item_category_code", "varchar(100)", required=True),
+            Column("item_category_name", "varchar(255)", required=True),
+            Column("item_category_isactive", "boolean"),
+        ),
+    ),
+    "subcategories": Catalog(
+        table="itemsubcategory",
+        pk="item_subcategory_id",
+        key="item_subcategory_code",
+        active="item_subcategory_isactive",
+        columns=(
+            Column("item_subcategory_code", "varchar(100)", required=True),
+            Column("item_subcategory_name", "varchar(255)", required=True),
+            Column("item_subcategory_isactive", "boolean"),
+            Column("item_category_code", "varchar(100)", required=True),
+        ),
+        parent=Parent(
+            file_column="item_category_code",
+            column="item_category_id",
+            table="itemcategory",
+            key="item_category_code",
+            pk="item_category_id",
+            active="item_category_isactive",
+        ),
+    ),
+    "suppliers": Catalog(
+        table="suppliers",
+        pk="supplier_id",
+        key="supplier_name",
+        active="is_active",
+        columns=(
+            Column("supplier_name", "varchar(255)", required=True),
+            Column("contact_person", "varchar(255)"),
+            Column("phone_number", "varchar(20)"),
+            Column("email", "varchar(255)"),
+            Column("address", "text"),
+            Column("is_active", "boolean"),
+        ),
+    ),
+    "locations": Catalog(
+        table="locations",
+        pk="location_id",
+        key="location_name",
+        active="location_is_active",
+        columns=(
+            Column("location_name", "varchar(255)", required=True),
+            Column("location_is_active", "boolean"),
+        ),
+    ),
+}
+
+
+@dataclass
+class ImportResult:
+    rows: int
+    keys: int
+    inserted: int
+    updated: int
+
+    @property
+    def unchanged(self) -> int:
+        return self.keys - self.inserted - self.updated
+
+
+def _cell(value: Any) -> str | None:
+    if value is None:
+        return None
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    value = str(value).strip()
+    return value or None
+
+
+def _csv_rows(path: Path) -> Iterator[list[str | None]]:
+    with path.open(newline="", encoding="utf-8-sig") as file:
+        for row in csv.reader(file):
+            yield [_cell(value) for value in row]
+
+
+def _xlsx_rows(path: Path) -> Iterator[list[str | None]]:
+    try:
+        import openpyxl  # type: ignore
+    except ImportError:
+        raise CatalogImportError("Reading XLSX files needs openpyxl installed")
+    workbook = openpyxl.load_workbook(path, read_only=True, data_only=True)
+    try:
+        for row in workbook.active.iter_rows(values_only=True):
+            yield [_cell(value) for value in row]
+    finally:
+        workbook.close()
+
+
+def read_rows(
+    catalog: Catalog, path: Path
+) -> tuple[list[Column], Iterator[list[str | None]]]:
+    """
+    The catalog columns the file provides, in file order, and its data rows
+    with empty cells as None. Blank rows are skipped.
+    """
+    rows = _xlsx_rows(path) if path.suffix.lower() == ".xlsx" else _csv_rows(path)
+    header = next(rows, None)
+    if not header:
+        raise CatalogImportError(f"{path} is empty")
+    known = {column.name: column for column in catalog.columns}
+    names = [(name or "").lower() for name in header]
+    unknown = [name for name in names if name not in known]
+    if unknown:
+        raise CatalogImportError(f"Unknown columns: {', '.join(unknown)}")
+    if len(set(names)) != len(names):
+        raise CatalogImportError("A column appears more than once")
+    missing = [
+        column.name
+        for column in catalog.columns
+        if column.required and column.name not in names
+    ]
+    if missing:
+        raise CatalogImportError(f"Missing columns: {', '.join(missing)}")
+
+    def data() -> Iterator[list[str | None]]:
+        for line, row in enumerate(rows, start=2):
+            if not any(row):
+                continue
+            if len(row) > len(names) and any(row[len(names) :]):
+                raise CatalogImportError(f"Line {line} has more cells than columns")
+            row = (row + [None] * len(names))[: len(names)]
+            for name, value in zip(names, row, strict=True):
+                if value is None and known[name].required:
+                    raise CatalogImportError(f"Line {line} has no {name}")
+            yield row
+
+    return [known[name] for name in names], data()
+
+
+def import_rows(
+    connection: Connection,
+    catalog: Catalog,
+    columns: list[Column],
+    rows: Iterator[list[str | None]],
+    *,
+    user_id: uuid.UUID,
+) -> ImportResult:
+    """
+    Stage ``rows`` with COPY and merge them into the catalog table, within
+    the transaction of ``connection``.
+    """
+    names = [column.name for column in columns]
+    staged = ", ".join(
+        f"{column.name} {column.sql_type}" + (" NOT NULL" if column.required else "")
+        for column in columns
+    )
+    connection.execute(
+        text(
+            f"CREATE TEMP TABLE import_rows (line bigint NOT NULL, {staged}) "
+            "ON COMMIT DROP"
+        )
+    )
+    count = 0
+    cursor = connection.connection.driver_connection.cursor()  # type: ignore[union-attr]
+    with cursor.copy(f"COPY import_rows (line, {', '.join(names)}) FROM STDIN") as copy:
+        for count, row in enumerate(rows, start=1):
+            copy.write_row([count, *row])
+    cursor.close()
+
+    # Values the target columns take, by target column
+    values = {
+        name: f"l.{name}"
+        for name in names
+        if catalog.parent is None or name != catalog.parent.file_column
+    }
+    parent_column = ""
+    parent = catalog.parent
+    if parent is not None:
+        # Legacy rows may share a code, prefer the active, oldest one
+        parent_column = (
+            f", (SELECT p.{parent.pk} FROM {parent.table} p "
+            f"WHERE p.{parent.key} = r.{parent.file_column} "
+            f"ORDER BY p.{parent.active} DESC, p.created_at LIMIT 1) "
+            f"AS {parent.column}"
+        )
+        values[parent.column] = f"l.{parent.column}"
+    connection.execute(
+        text(
+            f"CREATE TEMP TABLE import_latest ON COMMIT DROP AS "
+            f"SELECT DISTINCT ON (r.{catalog.key}) r.*{parent_column} "
+            f"FROM import_rows r ORDER BY r.{catalog.key}, r.line DESC"
+        )
+    )
+    keys = connection.execute(text("SELECT count(*) FROM import_latest")).scalar_one()
+    if parent is not None:
+        orphans = (
+            connection.execute(
+                text(
+                    f"SELECT DISTINCT {parent.file_column} FROM import_latest "
+                    f"WHERE {parent.column} IS NULL ORDER BY 1 LIMIT 20"
+                )
+            )
+            .scalars()
+            .all()
+        )
+        if orphans:
+            raise CatalogImportError(
+                f"Unknown {parent.file_column}: {', '.join(orphans)}"
+            )
+
+    # Keeps concurrent writers out between the update and the insert, the
+    # natural keys have no unique constraint to conflict on
+    connection.execute(text(f"LOCK TABLE {catalog.table} IN SHARE ROW EXCLUSIVE MODE"))
+    # An empty active cell keeps the current flag, and means active when new
+    if catalog.active in values:
+        values[catalog.active] = f"coalesce(l.{catalog.active}, t.{catalog.active})"
+    changed = [name for name in values if name != catalog.key]
+    updated = 0
+    if changed:
+        updated = connection.execute(
+            text(
+                f"UPDATE {catalog.table} t SET "
+                + ", ".join(f"{name} = {values[name]}" for name in changed)
+                + ", updated_at = LOCALTIMESTAMP, updated_by_id = :user_id "
+                f"FROM import_latest l WHERE t.{catalog.key} = l.{catalog.key} "
+                f"AND ROW({', '.join(f't.{name}' for name in changed)}) "
+                f"IS DISTINCT FROM ROW({', '.join(values[name] for name in changed)})"
+            ),
+            {"user_id": user_id},
+        ).rowcount
+    values[catalog.active] = (
+        f"coalesce(l.{catalog.active}, true)" if catalog.active in names else "true"
+    )
+    inserted = connection.execute(
+        text(
+            f"INSERT INTO {catalog.table} ({catalog.pk}, {', '.join(values)}, "
+            "created_at, created_by_id) "
+            f"SELECT gen_random_uuid(), {', '.join(values.values())}, "
+            "LOCALTIMESTAMP, :user_id FROM import_latest l "
+            f"WHERE NOT EXISTS (SELECT 1 FROM {catalog.table} t "
+            f"WHERE t.{catalog.key} = l.{catalog.key})"
+        ),
+        {"user_id": user_id},
+    ).rowcount
+    return ImportResult(rows=count, keys=keys, inserted=inserted, updated=updated)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("catalog", choices=sorted(CATALOGS))
+    parser.add_argument("file", type=Path)
+    parser.add_argument(
+        "--user",
+        default=settings.FIRST_SUPERUSER,
+        help="email of the user recorded as creator or last editor",
+    )
+    args = parser.parse_args()
+    catalog = CATALOGS[args.catalog]
+
+    with Session(engine) as session:
+        user_id = session.exec(select(User.id).where(User.email == args.user)).first()
+    if user_id is None:
+        logger.error("No user with email %s", args.user)
+        sys.exit(1)
+
+    try:
+        columns, rows = read_rows(catalog, args.file)
+        with engine.begin() as connection:
+            result = import_rows(connection, catalog, columns, rows, user_id=user_id)
+    except CatalogImportError as e:
+        logger.error("Nothing imported: %s", e)
+        sys.exit(1)
+    except (psycopg.DataError, exc.DataError) as e:
+        # A value too long, a bad flag: raised by psycopg when the COPY into
+        # the staging table rejects it, wrapped by SQLAlchemy when the update
+        # or insert into the catalog does
+        error = e.orig if isinstance(e, exc.DataError) else e
+        context = error.diag.context if isinstance(error, psycopg.Error) else None
+        logger.error("Nothing imported: %s (%s)", error, context)
+        sys.exit(1)
+    logger.info(
+        "%d rows, %d distinct %s: %d inserted, %d updated, %d unchanged",
+        result.rows,
+        result.keys,
+        catalog.key,
+        result.inserted,
+        result.updated,
+        result.unchanged,
+    )
+
+
+if __name__ == "__main__":
+    main()
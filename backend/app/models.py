@@ -1,11 +1,75 @@
 from datetime import datetime 
 import uuid
+from enum import Enum
 from typing import Any, Dict, List, Optional, ClassVar
 from pydantic import EmailStr
 from sqlmodel import Field, Relationship, SQLModel,Column,TIMESTAMP, text
+from sqlalchemy import Index, Text
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import relationship
 
 
+# How the total of a list response is computed
+class CountMode(str, Enum):
+    exact = "exact"
+    estimate = "estimate"
+    none = "none"
+
+
+# File format of a list export
+class ExportFormat(str, Enum):
+    csv = "csv"
+    ndjson = "ndjson"
+
+
+# Outcome of one row of a bulk create/update request
+class BulkStatus(str, Enum):
+    created = "created"
+    updated = "updated"
+
+
+class BulkRowResult(SQLModel):
+    # position of the row in the request
+    index: int
+    status: BulkStatus
+    id: uuid.UUID
+
+
+class BulkResult(SQLModel):
+    created: int
+    updated: int
+    data: list[BulkRowResult]
+
+
+# GIN trigram index so ilike('%term%') and similarity() search avoid a sequential scan
+def trigram_index(table: str, column: str) -> Index:
+    return Index(
+        f"ix_{table}_{column}_trgm",
+        column,
+        postgresql_using="gin",
+        postgresql_ops={column: "gin_trgm_ops"},
+    )
+
+
+# Primary key index limited to active rows, serves the default ordered list query
+def active_index(table: str, pk: str, flag: str) -> Index:
+    return Index(
+        f"ix_{table}_active",
+        pk,
+        postgresql_where=text(flag),
+    )
+
+
+# (column, primary key) index over active rows, a list sorted by column walks it
+def sort_index(table: str, column: str, pk: str, flag: str) -> Index:
+    return Index(
+        f"ix_{table}_{column}_active",
+        column,
+        pk,
+        postgresql_where=text(flag),
+    )
+
+
 # Shared properties
 class UserBase(SQLModel):
     email: EmailStr = Field(unique=True, index=True, max_length=255)
@@ -45,6 +109,9 @@ class UpdatePassword(SQLModel):
 class User(UserBase, table=True):
     id: uuid.UUID = Field(default_factory=uuid.uuid4, primary_key=True)
     hashed_password: str
+    # Bumped whenever the user's roles or their claims change, tokens carrying
+    # an older version no longer authorize claim checks
+    permissions_version: int = Field(default=0)
     items: list["Item"] = Relationship(back_populates="owner", cascade_delete=True)
 
 
@@ -55,7 +122,9 @@ class UserPublic(UserBase):
 
 class UsersPublic(SQLModel):
     data: list[UserPublic]
-    count: int
+    count: int | None
+    count_mode: CountMode = CountMode.exact
+    next_cursor: str | None = None
 
 
 # Shared properties
@@ -79,7 +148,7 @@ class Item(ItemBase, table=True):
     id: uuid.UUID = Field(default_factory=uuid.uuid4, primary_key=True)
     title: str = Field(max_length=255)
     owner_id: uuid.UUID = Field(
-        foreign_key="user.id", nullable=False, ondelete="CASCADE"
+        foreign_key="user.id", nullable=False, ondelete="CASCADE", index=True
     )
     owner: User | None = Relationship(back_populates="items")
 
@@ -92,7 +161,9 @@ class ItemPublic(ItemBase):
 
 class ItemsPublic(SQLModel):
     data: list[ItemPublic]
-    count: int
+    count: int | None
+    count_mode: CountMode = CountMode.exact
+    next_cursor: str | None = None
 
 
 # Item Category shared propeties
@@ -113,6 +184,13 @@ class ItemCategoryUpdate(SQLModel):
     item_category_isactive: bool| None = Field(default=None)
 
 class ItemCategory(ItemCategoryBase, table=True):
+    __table_args__ = (
+        trigram_index("itemcategory", "item_category_name"),
+        trigram_index("itemcategory", "item_category_code"),
+        active_index("itemcategory", "item_category_id", "item_category_isactive"),
+        sort_index("itemcategory", "item_category_name", "item_category_id", "item_category_isactive"),
+        sort_index("itemcategory", "item_category_code", "item_category_id", "item_category_isactive"),
+    )
     item_category_id: uuid.UUID = Field(default_factory=uuid.uuid4, primary_key=True)
     item_category_name: str = Field(max_length=255)
     item_category_code: str = Field(max_length=100)
@@ -121,7 +199,7 @@ class ItemCategory(ItemCategoryBase, table=True):
     updated_at: datetime | None = Field(default=None, nullable=True)
     
     # Foreign keys
-    created_by_id: uuid.UUID = Field(foreign_key="user.id", nullable=False)
+    created_by_id: uuid.UUID = Field(foreign_key="user.id", nullable=False, index=True)
     updated_by_id: uuid.UUID | None= Field(foreign_key="user.id", nullable=True)
 
      # Relationships
@@ -150,7 +228,9 @@ class ItemCategoryPublic(ItemCategoryBase):
 class ItemCategoriesPublic(SQLModel):
     """Container for multiple categories"""
     data: List[ItemCategoryPublic]
-    count: int
+    count: int | None
+    count_mode: CountMode = CountMode.exact
+    next_cursor: str | None = None
 
 
 
@@ -160,7 +240,7 @@ class ItemSubCategoryBase(SQLModel):
     item_subcategory_code: str = Field(min_length=1, max_length=100)
     item_subcategory_isactive: bool = Field(default=True)
     # Foreign key to parent category
-    item_category_id: uuid.UUID = Field(foreign_key="itemcategory.item_category_id")
+    item_category_id: uuid.UUID = Field(foreign_key="itemcategory.item_category_id", index=True)
 
 
 class ItemSubCategoryCreate(ItemSubCategoryBase):
@@ -177,6 +257,13 @@ class ItemSubCategoryUpdate(SQLModel):
 
 
 class ItemSubCategory(ItemSubCategoryBase, table=True):
+    __table_args__ = (
+        trigram_index("itemsubcategory", "item_subcategory_name"),
+        trigram_index("itemsubcategory", "item_subcategory_code"),
+        active_index("itemsubcategory", "item_subcategory_id", "item_subcategory_isactive"),
+        sort_index("itemsubcategory", "item_subcategory_name", "item_subcategory_id", "item_subcategory_isactive"),
+        sort_index("itemsubcategory", "item_subcategory_code", "item_subcategory_id", "item_subcategory_isactive"),
+    )
     item_subcategory_id: uuid.UUID = Field(default_factory=uuid.uuid4, primary_key=True)
     item_subcategory_name: str = Field(max_length=255)
     item_subcategory_code: str = Field(max_length=100)
@@ -186,7 +273,7 @@ class ItemSubCategory(ItemSubCategoryBase, table=True):
     updated_at: datetime | None = Field(default=None, nullable=True)
     
     # Foreign keys
-    created_by_id: uuid.UUID = Field(foreign_key="user.id", nullable=False)
+    created_by_id: uuid.UUID = Field(foreign_key="user.id", nullable=False, index=True)
     updated_by_id: uuid.UUID | None = Field(foreign_key="user.id", nullable=True)
 
     # Relationships
@@ -233,7 +320,9 @@ class ItemSubCategoryPublic(ItemSubCategoryBase):
 class ItemSubCategoriesPublic(SQLModel):
     """Container for multiple subcategories"""
     data: List[ItemSubCategoryPublic]
-    count: int
+    count: int | None
+    count_mode: CountMode = CountMode.exact
+    next_cursor: str | None = None
 
 
 # For a more complete response that includes the parent category information
@@ -259,6 +348,11 @@ class RolesUpdate(SQLModel):
 
 class Roles(RolesBase, table=True):
     __tablename__ = "roles"
+    __table_args__ = (
+        trigram_index("roles", "role_name"),
+        active_index("roles", "role_id", "role_is_active"),
+        sort_index("roles", "role_name", "role_id", "role_is_active"),
+    )
     role_id: uuid.UUID = Field(default_factory=uuid.uuid4, primary_key=True)
     role_name: str = Field(max_length=255)
     role_is_active :bool = Field(default = True)
@@ -267,7 +361,7 @@ class Roles(RolesBase, table=True):
     updated_at: datetime | None = Field(default=None, nullable=True)
     
     # Foreign keys
-    created_by_id: uuid.UUID = Field(foreign_key="user.id", nullable=False)
+    created_by_id: uuid.UUID = Field(foreign_key="user.id", nullable=False, index=True)
     updated_by_id: uuid.UUID | None= Field(foreign_key="user.id", nullable=True)
 
      # Relationships
@@ -289,7 +383,9 @@ class RolesPublic(RolesBase):
 class RolesPublicList(SQLModel):
     """Container for multiple categories"""
     data: List[RolesPublic]
-    count: int
+    count: int | None
+    count_mode: CountMode = CountMode.exact
+    next_cursor: str | None = None
 
 class RolesClaimsBase(SQLModel):
     role_claim_type: str = Field(min_length=1, max_length=100)
@@ -309,6 +405,13 @@ class RolesClaimsUpdate(RolesClaimsBase):
 
 class RoleClaims(RolesClaimsBase, table=True):
     __tablename__ = "roleclaims"
+    __table_args__ = (
+        trigram_index("roleclaims", "role_claim_type"),
+        trigram_index("roleclaims", "role_claim_value"),
+        active_index("roleclaims", "role_claim_id", "role_claim_isactive"),
+        sort_index("roleclaims", "role_claim_type", "role_claim_id", "role_claim_isactive"),
+        sort_index("roleclaims", "role_claim_value", "role_claim_id", "role_claim_isactive"),
+    )
     
     role_claim_id: uuid.UUID = Field(default_factory=uuid.uuid4, primary_key=True)
     
@@ -317,9 +420,9 @@ class RoleClaims(RolesClaimsBase, table=True):
     updated_at: datetime | None = Field(default=None, nullable=True)
     
     # Foreign keys
-    created_by_id: uuid.UUID = Field(foreign_key="user.id", nullable=False)
+    created_by_id: uuid.UUID = Field(foreign_key="user.id", nullable=False, index=True)
     updated_by_id: uuid.UUID | None = Field(foreign_key="user.id", nullable=True)
-    role_id: uuid.UUID = Field(foreign_key="roles.role_id", nullable=False)
+    role_id: uuid.UUID = Field(foreign_key="roles.role_id", nullable=False, index=True)
 
     # Relationships without back_populates
     created_by: User = Relationship(
@@ -349,7 +452,9 @@ class RolesClaimsPublic(RolesClaimsBase):
 class RolesClaimsPublicList(SQLModel):
     """Container for multiple subcategories"""
     data: List[RolesClaimsPublic]
-    count: int
+    count: int | None
+    count_mode: CountMode = CountMode.exact
+    next_cursor: str | None = None
 
 class UserRoleBase(SQLModel):
     """Base model for user role association"""
@@ -373,9 +478,9 @@ class UserRole(UserRoleBase, table=True):
     user_role_id: uuid.UUID = Field(default_factory=uuid.uuid4, primary_key=True)
     
     # Foreign keys
-    user_id: uuid.UUID = Field(foreign_key="user.id", nullable=False)
-    role_id: uuid.UUID = Field(foreign_key="roles.role_id", nullable=False)
-    created_by_id: uuid.UUID = Field(foreign_key="user.id", nullable=False)
+    user_id: uuid.UUID = Field(foreign_key="user.id", nullable=False, index=True)
+    role_id: uuid.UUID = Field(foreign_key="roles.role_id", nullable=False, index=True)
+    created_by_id: uuid.UUID = Field(foreign_key="user.id", nullable=False, index=True)
     updated_by_id: uuid.UUID | None = Field(foreign_key="user.id", nullable=True)
     
     # Audit fields
@@ -408,7 +513,9 @@ class UserRolePublic(UserRoleBase):
 class UserRolesPublic(SQLModel):
     """Container for multiple user role associations"""
     data: list[UserRolePublic]
-    count: int
+    count: int | None
+    count_mode: CountMode = CountMode.exact
+    next_cursor: str | None = None
 
 
 
@@ -427,6 +534,11 @@ class LocationsUpdate(SQLModel):
 
 class Locations(LocationsBase, table=True):
     __tablename__ = "locations"
+    __table_args__ = (
+        trigram_index("locations", "location_name"),
+        active_index("locations", "location_id", "location_is_active"),
+        sort_index("locations", "location_name", "location_id", "location_is_active"),
+    )
     location_id: uuid.UUID = Field(default_factory=uuid.uuid4, primary_key=True)
     location_name: str = Field(max_length=255)
     location_is_active: bool = Field(default=True)
@@ -436,7 +548,7 @@ class Locations(LocationsBase, table=True):
     updated_at: datetime | None = Field(default=None, nullable=True)
     
     # Foreign keys
-    created_by_id: uuid.UUID = Field(foreign_key="user.id", nullable=False)
+    created_by_id: uuid.UUID = Field(foreign_key="user.id", nullable=False, index=True)
     updated_by_id: uuid.UUID | None = Field(foreign_key="user.id", nullable=True)
 
     # Relationships
@@ -458,7 +570,9 @@ class LocationsPublic(LocationsBase):
 class LocationsPublicList(SQLModel):
     """Container for multiple locations"""
     data: List[LocationsPublic]
-    count: int
+    count: int | None
+    count_mode: CountMode = CountMode.exact
+    next_cursor: str | None = None
 
 
 # Semester Models
@@ -482,6 +596,12 @@ class SemestersUpdate(SQLModel):
 
 class Semesters(SemestersBase, table=True):
     __tablename__ = "semesters"
+    __table_args__ = (
+        trigram_index("semesters", "semester_name"),
+        active_index("semesters", "semester_id", "is_active"),
+        sort_index("semesters", "semester_name", "semester_id", "is_active"),
+        sort_index("semesters", "start_date", "semester_id", "is_active"),
+    )
     semester_id: uuid.UUID = Field(default_factory=uuid.uuid4, primary_key=True)
 
     # Audit fields
@@ -489,7 +609,7 @@ class Semesters(SemestersBase, table=True):
     updated_at: datetime | None = Field(default=None, nullable=True)
 
     # Foreign keys
-    created_by_id: uuid.UUID = Field(foreign_key="user.id", nullable=False)
+    created_by_id: uuid.UUID = Field(foreign_key="user.id", nullable=False, index=True)
     updated_by_id: uuid.UUID | None = Field(foreign_key="user.id", nullable=True)
 
     # Relationships
@@ -512,7 +632,9 @@ class SemestersPublic(SemestersBase):
 class SemestersPublicList(SQLModel):
     """Container for multiple semesters"""
     data: List[SemestersPublic]
-    count: int
+    count: int | None
+    count_mode: CountMode = CountMode.exact
+    next_cursor: str | None = None
 
 
 
@@ -543,11 +665,19 @@ class CoursesPublic(CoursesBase):
 class CoursesPublicList(SQLModel):
     """Container for multiple courses"""
     data: List[CoursesPublic]
-    count: int
+    count: int | None
+    count_mode: CountMode = CountMode.exact
+    next_cursor: str | None = None
 
 
 class Courses(CoursesBase, table=True):
     __tablename__ = "courses"
+    __table_args__ = (
+        trigram_index("courses", "course_name"),
+        trigram_index("courses", "course_description"),
+        active_index("courses", "course_id", "is_active"),
+        sort_index("courses", "course_name", "course_id", "is_active"),
+    )
     course_id: uuid.UUID = Field(default_factory=uuid.uuid4, primary_key=True)
 
     
@@ -556,7 +686,7 @@ class Courses(CoursesBase, table=True):
     updated_at: datetime | None = Field(default=None, nullable=True)
     
     # Foreign keys for audit
-    created_by_id: uuid.UUID = Field(foreign_key="user.id", nullable=False)
+    created_by_id: uuid.UUID = Field(foreign_key="user.id", nullable=False, index=True)
     updated_by_id: uuid.UUID = Field(foreign_key="user.id", nullable=True)
 
     # Relationships
@@ -595,6 +725,13 @@ class SuppliersUpdate(SQLModel):
 
 class Suppliers(SuppliersBase, table=True):
     __tablename__ = "suppliers"
+    __table_args__ = (
+        trigram_index("suppliers", "supplier_name"),
+        trigram_index("suppliers", "contact_person"),
+        trigram_index("suppliers", "email"),
+        active_index("suppliers", "supplier_id", "is_active"),
+        sort_index("suppliers", "supplier_name", "supplier_id", "is_active"),
+    )
     supplier_id: uuid.UUID = Field(default_factory=uuid.uuid4, primary_key=True)
     
     # Audit fields
@@ -602,7 +739,7 @@ class Suppliers(SuppliersBase, table=True):
     updated_at: datetime | None = Field(default=None, nullable=True)
     
     # Foreign keys for audit
-    created_by_id: uuid.UUID = Field(foreign_key="user.id", nullable=False)
+    created_by_id: uuid.UUID = Field(foreign_key="user.id", nullable=False, index=True)
     updated_by_id: uuid.UUID | None = Field(foreign_key="user.id", nullable=True)
 
     # Relationships
@@ -624,7 +761,9 @@ class SuppliersPublic(SuppliersBase):
 class SuppliersPublicList(SQLModel):
     """Container for multiple suppliers"""
     data: List[SuppliersPublic]
-    count: int
+    count: int | None
+    count_mode: CountMode = CountMode.exact
+    next_cursor: str | None = None
 
 
 
@@ -637,10 +776,148 @@ class Message(SQLModel):
     message: str
 
 
+# Connection pool statistics of one engine in one worker process
+class PoolStats(SQLModel):
+    engine: str
+    pid: int
+    pool_size: int
+    max_overflow: int
+    checked_out: int
+    idle: int
+    overflow: int
+    checkouts: int
+    timeouts: int
+    # cumulative seconds spent waiting for a free connection
+    wait_seconds: float
+
+
+class PoolStatsPublic(SQLModel):
+    data: list[PoolStats]
+
+
+class PasswordHashStats(SQLModel):
+    pid: int
+    # pool processes, 0 when hashing runs in the request thread
+    workers: int
+    max_pending: int
+    # operations running or waiting for a pool process
+    pending: int
+    queued: int
+    completed: int
+    # operations refused because max_pending was reached
+    rejected: int
+    # cumulative seconds spent waiting for a pool process, and hashing
+    queue_seconds: float
+    hash_seconds: float
+
+
+class UserEffectiveClaim(SQLModel, table=True):
+    """
+    Projection of the claims each user holds through active roles, kept up
+    to date by triggers on userrole, roles and roleclaims. One row per
+    (user, role, claim), with NULL claim columns for a role without claims.
+    Read by token minting instead of joining the source tables.
+    """
+    __tablename__ = "user_effective_claims"
+
+    user_effective_claim_id: int | None = Field(default=None, primary_key=True)
+    user_id: uuid.UUID = Field(
+        foreign_key="user.id", nullable=False, ondelete="CASCADE", index=True
+    )
+    role_id: uuid.UUID = Field(
+        foreign_key="roles.role_id", nullable=False, ondelete="CASCADE"
+    )
+    role_name: str = Field(max_length=255)
+    claim_type: str | None = Field(default=None, max_length=100)
+    claim_value: str | None = Field(default=None, max_length=100)
+
+
+class EmailOutbox(SQLModel, table=True):
+    """
+    Email waiting to be sent by the email worker (app/email_worker.py).
+    Added in the transaction of the change it announces, so it is sent once
+    that change commits and never when it rolls back.
+    """
+    __tablename__ = "emailoutbox"
+    __table_args__ = (
+        # Serves the worker's poll for unsent, due emails
+        Index(
+            "ix_emailoutbox_next_attempt_at_unsent",
+            "next_attempt_at",
+            postgresql_where=text("sent_at IS NULL"),
+        ),
+    )
+
+    email_outbox_id: uuid.UUID = Field(default_factory=uuid.uuid4, primary_key=True)
+    email_to: str = Field(max_length=255)
+    subject: str = Field(max_length=998)
+    # Emptied once sent, new account emails carry the initial password
+    html_content: str = Field(sa_column=Column(Text, nullable=False))
+    attempts: int = Field(default=0)
+    next_attempt_at: datetime = Field(default_factory=lambda: datetime.utcnow())
+    last_error: str | None = Field(default=None, sa_column=Column(Text))
+    created_at: datetime = Field(default_factory=lambda: datetime.utcnow())
+    sent_at: datetime | None = Field(default=None)
+
+
+class EmailOutboxStats(SQLModel):
+    # unsent emails the worker will still try, and those already due
+    pending: int
+    due: int
+    # emails given up on after EMAIL_OUTBOX_MAX_ATTEMPTS
+    failed: int
+    # age of the oldest pending email
+    oldest_pending_seconds: float | None = None
+
+
+class TableVersion(SQLModel, table=True):
+    """
+    Change counter of a reference table, bumped by a trigger on every
+    statement writing to it (see the table_versions migration). The ETags of
+    the table's list and detail responses are built from it.
+    """
+    __tablename__ = "table_versions"
+
+    table_name: str = Field(max_length=63, primary_key=True)
+    version: int = Field(default=0)
+
+
 # JSON payload containing access token
 class Token(SQLModel):
     access_token: str
     token_type: str = "bearer"
+    refresh_token: str | None = None
+
+
+class RefreshTokenRequest(SQLModel):
+    refresh_token: str
+
+
+class RefreshToken(SQLModel, table=True):
+    """
+    Refresh token issued at login, rotated on every use. Keeps the roles and
+    claims embedded in the access tokens so a refresh can reuse them while
+    the user's permissions_version is unchanged.
+    """
+    __tablename__ = "refreshtoken"
+
+    refresh_token_id: uuid.UUID = Field(default_factory=uuid.uuid4, primary_key=True)
+    # sha256 of the token handed to the client, the token itself is not stored
+    token_hash: str = Field(max_length=64, unique=True, index=True)
+    user_id: uuid.UUID = Field(
+        foreign_key="user.id", nullable=False, ondelete="CASCADE", index=True
+    )
+    # Tokens rotated from the same login, revoked together when one is reused
+    family_id: uuid.UUID = Field(index=True)
+    permissions_version: int
+    # {"roles": [...], "claims": {...}} as put in the access token
+    permissions: Dict[str, Any] = Field(
+        default_factory=dict, sa_column=Column(JSONB, nullable=False)
+    )
+    # Indexed for the pruning of expired tokens
+    expires_at: datetime = Field(index=True)
+    created_at: datetime = Field(default_factory=lambda: datetime.utcnow())
+    revoked_at: datetime | None = Field(default=None)
 
 
 # Contents of JWT token
@@ -655,6 +932,7 @@ class TokenPayload(SQLModel):
     is_active: Optional[bool] = True
     roles: Optional[List[Dict[str, str]]] = []
     claims: Optional[Dict[str, List[str]]] = {}
+    permissions_version: Optional[int] = None
 
 
 class NewPassword(SQLModel):
@@ -0,0 +1,69 @@
+import uuid
+
+from fastapi.testclient import TestClient
+from sqlmodel import Session, col, delete, select
+
+from app.core.config import settings
+from app.models import Locations
+from app.tests.utils.utils import random_lower_string
+
+
+def test_bulk_creates_and_updates(
+    client: TestClient, superuser_token_headers: dict[str, str], db: Session
+) -> None:
+    prefix = random_lower_string()[:10]
+    url = f"{settings.API_V1_STR}/locations/bulk"
+    first = [{"location_name": f"{prefix}-{n}"} for n in range(3)]
+    r = client.post(url, headers=superuser_token_headers, json=first)
+    assert r.status_code == 200
+    content = r.json()
+    assert (content["created"], content["updated"]) == (3, 0)
+
+    second = [
+        {"location_name": f"{prefix}-1", "location_is_active": False},
+        {"location_name": f"{prefix}-3"},
+    ]
+    r = client.post(url, headers=superuser_token_headers, json=second)
+    assert r.status_code == 200
+    content = r.json()
+    assert [row["status"] for row in content["data"]] == ["updated", "created"]
+
+    locations = db.exec(
+        select(Locations).where(col(Locations.location_name).startswith(prefix))
+    ).all()
+    assert len(locations) == 4
+    updated = next(
+        location for location in locations if location.location_name == f"{prefix}-1"
+    )
+    assert updated.location_is_active is False
+    assert str(updated.location_id) == content["data"][0]["id"]
+    db.exec(delete(Locations).where(col(Locations.location_name).startswith(prefix)))  # type: ignore
+    db.commit()
+
+
+def test_bulk_rejects_the_whole_batch(
+    client: TestClient, superuser_token_headers: dict[str, str]
+) -> None:
+    code = random_lower_string()
+    rows = [
+        {
+            "item_subcategory_name": "Milk",
+            "item_subcategory_code": code,
+            "item_category_id": str(uuid.uuid4()),
+        },
+        {
+            "item_subcategory_name": "Milk again",
+            "item_subcategory_code": code,
+            "item_category_id": str(uuid.uuid4()),
+        },
+    ]
+    r = client.post(
+        f"{settings.API_V1_STR}/itemsSubCategory/bulk",
+        headers=superuser_token_headers,
+        json=rows,
+    )
+    assert r.status_code == 400
+    assert r.json()["detail"] == [
+        {"index": 0, "detail": "Parent category not found"},
+        {"index": 1, "detail": "Repeats the item_subcategory_code of an earlier row"},
+    ]
@@ -1,12 +1,15 @@
-from unittest.mock import patch
+from unittest.mock import MagicMock, patch
 
+import pytest
+from fastapi import HTTPException
 from fastapi.testclient import TestClient
-from sqlmodel import Session
+from sqlmodel import Session, select
 
+from app.api.routes.login import throttle
 from app.core.config import settings
 from app.core.security import verify_password
-from app.crud import create_user
-from app.models import UserCreate
+from app.crud import create_user, get_refresh_token
+from app.models import EmailOutbox, UserCreate
 from app.tests.utils.user import user_authentication_headers
 from app.tests.utils.utils import random_email, random_lower_string
 from app.utils import generate_password_reset_token
@@ -24,6 +27,62 @@ def test_get_access_token(client: TestClient) -> None:
     assert tokens["access_token"]
 
 
+def test_refresh_token_rotates(client: TestClient) -> None:
+    login_data = {
+        "username": settings.FIRST_SUPERUSER,
+        "password": settings.FIRST_SUPERUSER_PASSWORD,
+    }
+    r = client.post(f"{settings.API_V1_STR}/login/access-token", data=login_data)
+    refresh_token = r.json()["refresh_token"]
+    assert refresh_token
+
+    r = client.post(
+        f"{settings.API_V1_STR}/login/refresh-token",
+        json={"refresh_token": refresh_token},
+    )
+    assert r.status_code == 200
+    tokens = r.json()
+    assert tokens["access_token"]
+    assert tokens["refresh_token"] != refresh_token
+    r = client.post(
+        f"{settings.API_V1_STR}/login/test-token",
+        headers={"Authorization": f"Bearer {tokens['access_token']}"},
+    )
+    assert r.status_code == 200
+
+    # Reusing a rotated token revokes the tokens issued from it
+    r = client.post(
+        f"{settings.API_V1_STR}/login/refresh-token",
+        json={"refresh_token": refresh_token},
+    )
+    assert r.status_code == 401
+    r = client.post(
+        f"{settings.API_V1_STR}/login/refresh-token",
+        json={"refresh_token": tokens["refresh_token"]},
+    )
+    assert r.status_code == 401
+
+
+def test_refresh_token_keeps_the_family_expiry(client: TestClient, db: Session) -> None:
+    login_data = {
+        "username": settings.FIRST_SUPERUSER,
+        "password": settings.FIRST_SUPERUSER_PASSWORD,
+    }
+    r = client.post(f"{settings.API_V1_STR}/login/access-token", data=login_data)
+    refresh_token = r.json()["refresh_token"]
+    r = client.post(
+        f"{settings.API_V1_STR}/login/refresh-token",
+        json={"refresh_token": refresh_token},
+    )
+    assert r.status_code == 200
+
+    first = get_refresh_token(session=db, token=refresh_token)
+    rotated = get_refresh_token(session=db, token=r.json()["refresh_token"])
+    assert first and rotated
+    assert rotated[0].family_id == first[0].family_id
+    assert rotated[0].expires_at == first[0].expires_at
+
+
 def test_get_access_token_incorrect_password(client: TestClient) -> None:
     login_data = {
         "username": settings.FIRST_SUPERUSER,
@@ -33,6 +92,29 @@ def test_get_access_token_incorrect_password(client: TestClient) -> None:
     assert r.status_code == 400
 
 
+def test_login_attempts_are_throttled(client: TestClient) -> None:
+    login_data = {"username": random_email(), "password": "incorrect"}
+    for _ in range(settings.LOGIN_RATE_LIMIT_PER_EMAIL):
+        r = client.post(f"{settings.API_V1_STR}/login/access-token", data=login_data)
+        assert r.status_code == 400
+    r = client.post(f"{settings.API_V1_STR}/login/access-token", data=login_data)
+    assert r.status_code == 429
+    assert int(r.headers["Retry-After"]) > 0
+
+
+def test_throttle_rejects_a_zero_retry_after() -> None:
+    # A window just expiring leaves nothing to wait for, yet the hit was
+    # rejected: the email limiter must not get the final say
+    ip_limiter = MagicMock(hit=MagicMock(return_value=0.0))
+    email_limiter = MagicMock(hit=MagicMock(return_value=None))
+    request = MagicMock(client=MagicMock(host="203.0.113.7"))
+    with pytest.raises(HTTPException) as exc_info:
+        throttle(request, "a@example.com", email_limiter, ip_limiter)
+    assert exc_info.value.status_code == 429
+    assert exc_info.value.headers == {"Retry-After": "0"}
+    email_limiter.hit.assert_not_called()
+
+
 def test_use_access_token(
     client: TestClient, superuser_token_headers: dict[str, str]
 ) -> None:
@@ -61,6 +143,19 @@ def test_recovery_password(
         assert r.json() == {"message": "Password recovery email sent"}
 
 
+def test_recovery_password_without_emails_queues_nothing(
+    client: TestClient, db: Session
+) -> None:
+    email = random_email()
+    create_user(
+        session=db, user_create=UserCreate(email=email, password=random_lower_string())
+    )
+    with patch("app.core.config.settings.SMTP_HOST", None):
+        r = client.post(f"{settings.API_V1_STR}/password-recovery/{email}")
+    assert r.status_code == 200
+    assert not db.exec(select(EmailOutbox).where(EmailOutbox.email_to == email)).all()
+
+
 def test_recovery_password_user_not_exits(
     client: TestClient, normal_user_token_headers: dict[str, str]
 ) -> None:
@@ -102,6 +197,31 @@ def test_reset_password(client: TestClient, db: Session) -> None:
     assert verify_password(new_password, user.hashed_password)
 
 
+def test_reset_password_revokes_refresh_tokens(client: TestClient, db: Session) -> None:
+    email = random_email()
+    password = random_lower_string()
+    user_create = UserCreate(email=email, password=password)
+    create_user(session=db, user_create=user_create)
+    r = client.post(
+        f"{settings.API_V1_STR}/login/access-token",
+        data={"username": email, "password": password},
+    )
+    refresh_token = r.json()["refresh_token"]
+
+    data = {
+        "new_password": random_lower_string(),
+        "token": generate_password_reset_token(email=email),
+    }
+    r = client.post(f"{settings.API_V1_STR}/reset-password/", json=data)
+    assert r.status_code == 200
+
+    r = client.post(
+        f"{settings.API_V1_STR}/login/refresh-token",
+        json={"refresh_token": refresh_token},
+    )
+    assert r.status_code == 401
+
+
 def test_reset_password_invalid_token(
     client: TestClient, superuser_token_headers: dict[str, str]
 ) -> None:
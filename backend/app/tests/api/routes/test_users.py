@@ -7,7 +7,7 @@ from sqlmodel import Session, select
 from app import crud
 from app.core.config import settings
 from app.core.security import verify_password
-from app.models import User, UserCreate
+from app.models import EmailOutbox, User, UserCreate
 from app.tests.utils.utils import random_email, random_lower_string
 
 
@@ -37,9 +37,9 @@ def test_create_user_new_email(
     client: TestClient, superuser_token_headers: dict[str, str], db: Session
 ) -> None:
     with (
-        patch("app.utils.send_email", return_value=None),
         patch("app.core.config.settings.SMTP_HOST", "smtp.example.com"),
         patch("app.core.config.settings.SMTP_USER", "admin@example.com"),
+        patch("app.core.config.settings.EMAILS_FROM_EMAIL", "noreply@example.com"),
     ):
         username = random_email()
         password = random_lower_string()
@@ -54,6 +54,10 @@ def test_create_user_new_email(
         user = crud.get_user_by_email(session=db, email=username)
         assert user
         assert user.email == created_user["email"]
+        queued = db.exec(
+            select(EmailOutbox).where(EmailOutbox.email_to == username)
+        ).all()
+        assert len(queued) == 1
 
 
 def test_get_existing_user(
@@ -230,6 +234,34 @@ def test_update_password_me(
     assert verify_password(settings.FIRST_SUPERUSER_PASSWORD, user_db.hashed_password)
 
 
+def test_update_password_me_revokes_refresh_tokens(
+    client: TestClient, db: Session
+) -> None:
+    email = random_email()
+    password = random_lower_string()
+    user_in = UserCreate(email=email, password=password)
+    crud.create_user(session=db, user_create=user_in)
+    r = client.post(
+        f"{settings.API_V1_STR}/login/access-token",
+        data={"username": email, "password": password},
+    )
+    tokens = r.json()
+
+    data = {"current_password": password, "new_password": random_lower_string()}
+    r = client.patch(
+        f"{settings.API_V1_STR}/users/me/password",
+        headers={"Authorization": f"Bearer {tokens['access_token']}"},
+        json=data,
+    )
+    assert r.status_code == 200
+
+    r = client.post(
+        f"{settings.API_V1_STR}/login/refresh-token",
+        json={"refresh_token": tokens["refresh_token"]},
+    )
+    assert r.status_code == 401
+
+
 def test_update_password_me_incorrect_password(
     client: TestClient, superuser_token_headers: dict[str, str]
 ) -> None:
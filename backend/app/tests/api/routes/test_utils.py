@@ -0,0 +1,40 @@
+from unittest.mock import patch
+
+from fastapi.testclient import TestClient
+from sqlmodel import Session, select
+
+from app.core.config import settings
+from app.models import EmailOutbox
+from app.tests.utils.utils import random_email
+
+
+def test_test_email(
+    client: TestClient, superuser_token_headers: dict[str, str], db: Session
+) -> None:
+    email = random_email()
+    with (
+        patch("app.core.config.settings.SMTP_HOST", "smtp.example.com"),
+        patch("app.core.config.settings.SMTP_USER", "admin@example.com"),
+    ):
+        r = client.post(
+            f"{settings.API_V1_STR}/utils/test-email/",
+            headers=superuser_token_headers,
+            params={"email_to": email},
+        )
+    assert r.status_code == 201
+    assert r.json() == {"message": "Test email sent"}
+    assert db.exec(select(EmailOutbox).where(EmailOutbox.email_to == email)).one()
+
+
+def test_test_email_without_emails_queues_nothing(
+    client: TestClient, superuser_token_headers: dict[str, str], db: Session
+) -> None:
+    email = random_email()
+    with patch("app.core.config.settings.SMTP_HOST", None):
+        r = client.post(
+            f"{settings.API_V1_STR}/utils/test-email/",
+            headers=superuser_token_headers,
+            params={"email_to": email},
+        )
+    assert r.status_code == 503
+    assert not db.exec(select(EmailOutbox).where(EmailOutbox.email_to == email)).all()
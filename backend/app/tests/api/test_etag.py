@@ -0,0 +1,41 @@
+from fastapi.testclient import TestClient
+from sqlmodel import Session, col, delete, select
+
+from app.api.etag import etag_matches
+from app.core.config import settings
+from app.models import Locations, User
+from app.tests.utils.utils import random_lower_string
+
+
+def test_etag_matches_weakly() -> None:
+    etag = 'W/"locations-7-1"'
+    assert etag_matches('W/"locations-7-1"', etag)
+    assert etag_matches('"locations-6-1", "locations-7-1"', etag)
+    assert etag_matches("*", etag)
+    assert not etag_matches('W/"locations-7-0"', etag)
+    assert not etag_matches(None, etag)
+
+
+def test_unchanged_locations_are_not_sent_again(
+    client: TestClient, superuser_token_headers: dict[str, str], db: Session
+) -> None:
+    url = f"{settings.API_V1_STR}/locations/"
+    r = client.get(url, headers=superuser_token_headers)
+    assert r.status_code == 200
+    etag = r.headers["etag"]
+
+    r = client.get(url, headers={**superuser_token_headers, "If-None-Match": etag})
+    assert r.status_code == 304
+    assert r.headers["etag"] == etag
+    assert r.content == b""
+
+    user = db.exec(select(User)).first()
+    assert user
+    name = random_lower_string()
+    db.add(Locations(location_name=name, created_by_id=user.id))
+    db.commit()
+    r = client.get(url, headers={**superuser_token_headers, "If-None-Match": etag})
+    assert r.status_code == 200
+    assert r.headers["etag"] != etag
+    db.exec(delete(Locations).where(col(Locations.location_name) == name))  # type: ignore
+    db.commit()
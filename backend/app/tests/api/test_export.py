@@ -0,0 +1,115 @@
+import asyncio
+import csv
+import io
+import json
+import uuid
+from collections.abc import AsyncIterator, Sequence
+from datetime import datetime
+from typing import Any
+
+from fastapi.testclient import TestClient
+from sqlmodel import Session, col, delete, select
+
+from app.api.export import csv_lines, ndjson_lines
+from app.core.config import settings
+from app.models import Courses, Locations, LocationsPublic, User
+from app.tests.utils.utils import random_lower_string
+
+
+def _locations(*names: str) -> list[Locations]:
+    return [
+        Locations(
+            location_id=uuid.uuid4(),
+            location_name=name,
+            created_at=datetime(2024, 1, 1),
+            created_by_id=uuid.uuid4(),
+        )
+        for name in names
+    ]
+
+
+async def _batches(*batches: Sequence[Any]) -> AsyncIterator[Sequence[Any]]:
+    for batch in batches:
+        yield batch
+
+
+async def _collect(lines: AsyncIterator[str]) -> list[str]:
+    return [chunk async for chunk in lines]
+
+
+def test_csv_writes_a_header_then_a_chunk_per_batch() -> None:
+    chunks = asyncio.run(
+        _collect(
+            csv_lines(
+                LocationsPublic,
+                _batches(_locations("Pantry", 'Cold, "walk-in"'), _locations("Bar")),
+            )
+        )
+    )
+    assert len(chunks) == 3
+    rows = list(csv.DictReader(io.StringIO("".join(chunks))))
+    assert [row["location_name"] for row in rows] == [
+        "Pantry",
+        'Cold, "walk-in"',
+        "Bar",
+    ]
+    assert rows[0]["created_at"] == "2024-01-01T00:00:00"
+
+
+def test_ndjson_writes_a_record_per_line() -> None:
+    chunks = asyncio.run(
+        _collect(ndjson_lines(LocationsPublic, _batches(_locations("Pantry", "Bar"))))
+    )
+    records = [json.loads(line) for line in "".join(chunks).splitlines()]
+    assert [record["location_name"] for record in records] == ["Pantry", "Bar"]
+
+
+def test_export_route_applies_the_list_filters(
+    client: TestClient, superuser_token_headers: dict[str, str], db: Session
+) -> None:
+    user = db.exec(select(User)).first()
+    assert user
+    prefix = random_lower_string()[:10]
+    db.add_all(
+        Locations(
+            location_name=f"{prefix}-{name}",
+            location_is_active=active,
+            created_by_id=user.id,
+        )
+        for name, active in (("b", True), ("a", True), ("gone", False))
+    )
+    db.commit()
+
+    r = client.get(
+        f"{settings.API_V1_STR}/locations/export",
+        headers=superuser_token_headers,
+        params={"format": "ndjson", "search": prefix, "sortBy": "location_name"},
+    )
+    assert r.status_code == 200
+    assert r.headers["content-type"] == "application/x-ndjson"
+    names = [json.loads(line)["location_name"] for line in r.text.splitlines()]
+    assert names == [f"{prefix}-a", f"{prefix}-b"]
+    db.exec(delete(Locations).where(col(Locations.location_name).startswith(prefix)))  # type: ignore
+    db.commit()
+
+
+def test_export_courses_ignores_a_semester_filter(
+    client: TestClient, superuser_token_headers: dict[str, str], db: Session
+) -> None:
+    # Courses are not linked to semesters, the old filter must not fail
+    user = db.exec(select(User)).first()
+    assert user
+    name = random_lower_string()
+    db.add(Courses(course_name=name, created_by_id=user.id))
+    db.commit()
+
+    r = client.get(
+        f"{settings.API_V1_STR}/courses/export",
+        headers=superuser_token_headers,
+        params={"search": name, "semester_id": str(uuid.uuid4())},
+    )
+    assert r.status_code == 200
+    rows = list(csv.DictReader(io.StringIO(r.text)))
+    assert [row["course_name"] for row in rows] == [name]
+    db.exec(delete(Courses).where(col(Courses.course_name) == name))  # type: ignore
+    db.commit()
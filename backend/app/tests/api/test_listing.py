@@ -0,0 +1,68 @@
+from sqlalchemy.dialects import postgresql
+
+from app.api.listing import ListQuery
+from app.models import ItemCategory
+
+
+def _query() -> ListQuery:
+    return ListQuery(
+        ItemCategory,
+        pk_column=ItemCategory.item_category_id,
+        active=ItemCategory.item_category_isactive,
+        search=(ItemCategory.item_category_name, ItemCategory.item_category_code),
+        sortable=("item_category_name",),
+    )
+
+
+def test_page_statement_is_reused() -> None:
+    query = _query()
+    first = query.page(
+        searching=True,
+        sort_column=ItemCategory.item_category_name,
+        descending=False,
+        after=False,
+        windowed=False,
+    )
+    again = query.page(
+        searching=True,
+        sort_column=ItemCategory.item_category_name,
+        descending=False,
+        after=False,
+        windowed=False,
+    )
+    assert first is again
+    assert first is not query.page(
+        searching=True,
+        sort_column=ItemCategory.item_category_name,
+        descending=True,
+        after=False,
+        windowed=False,
+    )
+
+
+def test_page_statement_binds_request_values() -> None:
+    statement = _query().page(
+        searching=True,
+        sort_column=ItemCategory.item_category_name,
+        descending=False,
+        after=True,
+        windowed=False,
+    )
+    compiled = statement.compile(dialect=postgresql.dialect())
+    assert {"search_pattern", "after_value", "after_id", "limit"} <= set(
+        compiled.params
+    )
+    assert "OFFSET" not in str(compiled)
+
+
+def test_export_statement_keeps_the_list_order_without_paging() -> None:
+    statement = _query().export(
+        searching=True,
+        sort_column=ItemCategory.item_category_name,
+        descending=True,
+    )
+    compiled = str(statement.compile(dialect=postgresql.dialect()))
+    assert "LIMIT" not in compiled and "OFFSET" not in compiled
+    assert compiled.endswith(
+        "ORDER BY itemcategory.item_category_name DESC, itemcategory.item_category_id DESC"
+    )
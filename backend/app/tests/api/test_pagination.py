@@ -0,0 +1,89 @@
+import uuid
+from datetime import datetime
+from types import SimpleNamespace
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy.dialects import postgresql
+from sqlmodel import select
+
+from app.api.pagination import (
+    apply_keyset,
+    decode_cursor,
+    encode_cursor,
+    next_cursor,
+    sort_column_for,
+    sortable_fields,
+    with_window_count,
+)
+from app.models import Courses
+
+
+def test_cursor_round_trip() -> None:
+    course_id = uuid.uuid4()
+    created_at = datetime(2025, 1, 15, 9, 30)
+    cursor = encode_cursor("created_at", created_at, course_id)
+    assert decode_cursor(cursor, Courses.created_at, Courses.course_id) == (
+        created_at,
+        course_id,
+    )
+
+
+def test_cursor_for_other_sort_field_is_rejected() -> None:
+    cursor = encode_cursor("course_name", "Baking", uuid.uuid4())
+    with pytest.raises(HTTPException) as exc_info:
+        decode_cursor(cursor, Courses.created_at, Courses.course_id)
+    assert exc_info.value.status_code == 400
+
+
+def test_apply_keyset_seeks_past_cursor() -> None:
+    cursor = encode_cursor("course_name", "Baking", uuid.uuid4())
+    statement = apply_keyset(
+        select(Courses),
+        pk_column=Courses.course_id,
+        sort_column=Courses.course_name,
+        descending=True,
+        cursor=cursor,
+    )
+    sql = str(statement.compile(dialect=postgresql.dialect()))
+    assert "(courses.course_name, courses.course_id) <" in sql
+    assert "ORDER BY courses.course_name DESC, courses.course_id DESC" in sql
+
+
+def test_next_cursor_only_for_full_pages() -> None:
+    rows = [SimpleNamespace(course_name="Baking", course_id=uuid.uuid4())]
+    assert next_cursor(rows, limit=2, pk_column=Courses.course_id) is None
+    cursor = next_cursor(
+        rows, limit=1, pk_column=Courses.course_id, sort_column=Courses.course_name
+    )
+    assert cursor is not None
+    assert decode_cursor(cursor, Courses.course_name, Courses.course_id) == (
+        "Baking",
+        rows[0].course_id,
+    )
+
+
+def test_sort_column_for_ignores_non_columns() -> None:
+    assert sort_column_for(Courses, "course_name") is Courses.course_name
+    assert sort_column_for(Courses, "created_by") is None
+    assert sort_column_for(Courses, "model_dump") is None
+    assert sort_column_for(Courses, None) is None
+
+
+def test_window_count_adds_a_column() -> None:
+    statement = with_window_count(
+        select(Courses).where(Courses.is_active == True).offset(20).limit(10)  # noqa: E712
+    )
+    assert [column.name for column in statement.selected_columns][-1] == "total_count"
+    sql = str(statement.compile(dialect=postgresql.dialect()))
+    assert "count(*) OVER () AS total_count" in sql
+    assert "LIMIT" in sql and "OFFSET" in sql
+
+
+def test_sortable_fields_need_an_ordered_index() -> None:
+    sort_field = sortable_fields(Courses, "course_id", "course_name")
+    assert [field.value for field in sort_field] == ["course_id", "course_name"]
+    assert sort_column_for(Courses, sort_field("course_name")) is Courses.course_name
+    # course_description only has a trigram index, which cannot sort
+    with pytest.raises(ValueError):
+        sortable_fields(Courses, "course_description")
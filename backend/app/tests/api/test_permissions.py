@@ -0,0 +1,120 @@
+import asyncio
+import uuid
+from collections.abc import Generator
+from typing import Any
+
+import pytest
+from fastapi import HTTPException
+
+from app.api.permissions import (
+    require_any_claim,
+    require_claim,
+    require_claim_async,
+)
+from app.core.user_cache import user_cache
+from app.models import TokenPayload, User
+
+
+class FakeResult:
+    def __init__(self, value: Any) -> None:
+        self.value = value
+
+    def first(self) -> Any:
+        return self.value
+
+
+class FakeSession:
+    """
+    Answers the permissions_version query with ``version``.
+    """
+
+    def __init__(self, version: int | None) -> None:
+        self.version = version
+        self.queries = 0
+
+    def exec(self, _statement: Any) -> FakeResult:
+        self.queries += 1
+        return FakeResult(self.version)
+
+
+class FakeAsyncSession(FakeSession):
+    async def exec(self, statement: Any) -> FakeResult:  # type: ignore[override]
+        return super().exec(statement)
+
+
+@pytest.fixture(autouse=True)
+def listening() -> Generator[None, None, None]:
+    # As in a worker whose invalidation listener is up
+    shared = user_cache.shared
+    user_cache.shared = True
+    yield
+    user_cache.shared = shared
+
+
+def _user(*, is_superuser: bool = False, permissions_version: int = 3) -> User:
+    return User(
+        id=uuid.uuid4(),
+        email="user@example.com",
+        hashed_password="x",
+        is_superuser=is_superuser,
+        permissions_version=permissions_version,
+    )
+
+
+def _token(*, permissions_version: int | None = 3) -> TokenPayload:
+    return TokenPayload(
+        claims={"items": ["read", "create"]}, permissions_version=permissions_version
+    )
+
+
+def test_claim_in_token_passes() -> None:
+    user = _user()
+    session = FakeSession(3)
+    assert require_claim("items", "read")(user, _token(), session) is user
+    # The cached user is current while the listener runs
+    assert session.queries == 0
+
+
+def test_missing_claim_is_forbidden() -> None:
+    with pytest.raises(HTTPException) as exc:
+        require_claim("items", "delete")(_user(), _token(), FakeSession(3))
+    assert exc.value.status_code == 403
+
+
+def test_any_claim() -> None:
+    check = require_any_claim(("items", "delete"), ("items", "create"))
+    assert check(_user(), _token(), FakeSession(3)).email == "user@example.com"
+
+
+def test_outdated_token_is_rejected() -> None:
+    for token in (_token(permissions_version=2), _token(permissions_version=None)):
+        with pytest.raises(HTTPException) as exc:
+            require_claim("items", "read")(_user(), token, FakeSession(3))
+        assert exc.value.status_code == 401
+
+
+def test_superuser_passes_without_claims() -> None:
+    user = _user(is_superuser=True)
+    assert (
+        require_claim("items", "delete")(user, TokenPayload(), FakeSession(3)) is user
+    )
+
+
+def test_version_is_read_from_the_database_without_listener() -> None:
+    user_cache.shared = False
+    # The cached user still has version 3, another worker bumped it to 4
+    session = FakeSession(4)
+    with pytest.raises(HTTPException) as exc:
+        require_claim("items", "read")(_user(), _token(), session)
+    assert exc.value.status_code == 401
+    assert session.queries == 1
+
+
+def test_async_claim_check() -> None:
+    user = _user()
+    check = require_claim_async("items", "create")
+    assert asyncio.run(check(user, _token(), FakeAsyncSession(3))) is user
+    user_cache.shared = False
+    with pytest.raises(HTTPException) as exc:
+        asyncio.run(check(user, _token(), FakeAsyncSession(4)))
+    assert exc.value.status_code == 401
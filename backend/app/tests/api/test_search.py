@@ -0,0 +1,40 @@
+import asyncio
+import uuid
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy.dialects import postgresql
+from sqlmodel import select
+
+from app.api.pagination import encode_cursor, paginate
+from app.api.search import search_condition, search_rank
+from app.models import Suppliers
+
+
+def test_search_condition_matches_term_literally() -> None:
+    condition = search_condition("50%_off", Suppliers.supplier_name, Suppliers.email)
+    compiled = condition.compile(dialect=postgresql.dialect())
+    assert "suppliers.supplier_name ILIKE" in str(compiled)
+    assert "suppliers.email ILIKE" in str(compiled)
+    assert set(compiled.params.values()) == {"%50\\%\\_off%"}
+
+
+def test_search_rank_takes_best_similarity() -> None:
+    rank = search_rank("flour", Suppliers.supplier_name, Suppliers.contact_person)
+    sql = str(rank.compile(dialect=postgresql.dialect()))
+    assert sql.startswith("greatest(similarity(suppliers.supplier_name")
+
+
+def test_ranked_search_rejects_cursor() -> None:
+    cursor = encode_cursor("supplier_id", None, uuid.uuid4())
+    with pytest.raises(HTTPException) as exc_info:
+        asyncio.run(
+            paginate(
+                None,  # type: ignore[arg-type]
+                select(Suppliers),
+                pk_column=Suppliers.supplier_id,
+                cursor=cursor,
+                rank=search_rank("flour", Suppliers.supplier_name),
+            )
+        )
+    assert exc_info.value.status_code == 400
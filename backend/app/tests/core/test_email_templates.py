@@ -0,0 +1,14 @@
+from pathlib import Path
+
+from app.utils import email_template_environment, preload_email_templates
+
+
+def test_preloaded_templates_render_without_the_files(tmp_path: Path) -> None:
+    (tmp_path / "hello.html").write_text("<p>Hello {{ username }}</p>")
+    (tmp_path / "notes.txt").write_text("not a template")
+    environment = email_template_environment(tmp_path)
+    assert preload_email_templates(environment) == ["hello.html"]
+
+    (tmp_path / "hello.html").unlink()
+    template = environment.get_template("hello.html")
+    assert template.render(username="chef") == "<p>Hello chef</p>"
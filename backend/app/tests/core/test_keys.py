@@ -0,0 +1,111 @@
+import jwt
+import pytest
+
+from app.core.config import Settings, SigningKey
+from app.core.keys import DEFAULT_KID, KeyRing, build_key_ring
+
+OLD = SigningKey(kid="2024", secret="old-secret-" + "x" * 32)
+NEW = SigningKey(kid="2025", secret="new-secret-" + "x" * 32)
+
+
+def test_tokens_name_the_signing_key() -> None:
+    ring = KeyRing([OLD, NEW], signing_kid="2025")
+    token = ring.encode({"sub": "someone"})
+    assert jwt.get_unverified_header(token)["kid"] == "2025"
+    assert ring.decode(token) == {"sub": "someone"}
+
+
+def test_rotation_keeps_older_tokens_valid() -> None:
+    before = KeyRing([OLD], signing_kid="2024")
+    token = before.encode({"sub": "someone"})
+    after = KeyRing([OLD, NEW], signing_kid="2025")
+    assert after.decode(token) == {"sub": "someone"}
+    retired = KeyRing([NEW], signing_kid="2025")
+    with pytest.raises(jwt.InvalidTokenError):
+        retired.decode(token)
+
+
+SECRET = "legacy-" + "x" * 32
+
+
+def test_tokens_without_kid_use_the_default_key() -> None:
+    ring = build_key_ring([], signing_kid=None, secret_key=SECRET)
+    legacy = jwt.encode({"sub": "someone"}, SECRET, algorithm="HS256")
+    assert ring.decode(legacy) == {"sub": "someone"}
+    assert jwt.get_unverified_header(ring.encode({}))["kid"] == DEFAULT_KID
+
+
+def test_configured_keys_stop_trusting_tokens_without_kid() -> None:
+    before = build_key_ring([], signing_kid=None, secret_key=SECRET)
+    token = before.encode({"sub": "someone"})
+    legacy = jwt.encode({"sub": "someone"}, SECRET, algorithm="HS256")
+    ring = build_key_ring([NEW], signing_kid="2025", secret_key=SECRET)
+    with pytest.raises(jwt.InvalidTokenError):
+        ring.decode(legacy)
+    # Until JWT_KEEP_DEFAULT_KEY is turned off
+    assert ring.decode(token) == {"sub": "someone"}
+    ring = build_key_ring(
+        [NEW], signing_kid="2025", secret_key=SECRET, keep_default=False
+    )
+    with pytest.raises(jwt.InvalidTokenError):
+        ring.decode(token)
+
+
+def test_workers_share_the_key_without_secret_key() -> None:
+    def load(**values: str) -> Settings:
+        return Settings(
+            _env_file=None,  # type: ignore[call-arg]
+            PROJECT_NAME="x",
+            FIRST_SUPERUSER="admin@example.com",
+            FIRST_SUPERUSER_PASSWORD="x" * 8,
+            **values,  # type: ignore[arg-type]
+        )
+
+    with pytest.warns(UserWarning):
+        assert load().SECRET_KEY == load().SECRET_KEY
+    with pytest.raises(ValueError):
+        load(ENVIRONMENT="production")
+
+
+def test_key_algorithm_is_enforced() -> None:
+    ring = KeyRing([OLD], signing_kid="2024")
+    token = jwt.encode(
+        {"sub": "someone"}, OLD.secret, algorithm="HS512", headers={"kid": "2024"}
+    )
+    with pytest.raises(jwt.InvalidAlgorithmError):
+        ring.decode(token)
+
+
+def test_public_keys_only_verify() -> None:
+    pytest.importorskip("cryptography")
+    from cryptography.hazmat.primitives import serialization
+    from cryptography.hazmat.primitives.asymmetric.ed25519 import Ed25519PrivateKey
+
+    private_key = Ed25519PrivateKey.generate()
+    private_pem = private_key.private_bytes(
+        serialization.Encoding.PEM,
+        serialization.PrivateFormat.PKCS8,
+        serialization.NoEncryption(),
+    ).decode()
+    public_pem = (
+        private_key.public_key()
+        .public_bytes(
+            serialization.Encoding.PEM,
+            serialization.PublicFormat.SubjectPublicKeyInfo,
+        )
+        .decode()
+    )
+    signer = KeyRing(
+        [SigningKey(kid="ed", algorithm="EdDSA", private_key=private_pem)],
+        signing_kid="ed",
+    )
+    token = signer.encode({"sub": "someone"})
+    verifier_keys = [
+        SigningKey(kid="ed", algorithm="EdDSA", public_key=public_pem),
+        NEW,
+    ]
+    assert KeyRing(verifier_keys, signing_kid="2025").decode(token) == {
+        "sub": "someone"
+    }
+    with pytest.raises(ValueError):
+        KeyRing(verifier_keys, signing_kid="ed")
@@ -0,0 +1,48 @@
+import threading
+
+import pytest
+
+from app.core.passwords import PasswordHasher, PasswordHashingBusy, pwd_context
+
+
+def test_hash_and_verify_in_pool() -> None:
+    hasher = PasswordHasher(workers=1, max_pending=2)
+    try:
+        hashed = hasher.hash("correct horse")
+        assert hasher.verify_and_update("correct horse", hashed) == (True, None)
+        assert hasher.verify_and_update("wrong horse", hashed)[0] is False
+        stats = hasher.stats()
+        assert stats.completed == 3
+        assert stats.pending == 0
+    finally:
+        hasher.shutdown()
+
+
+def test_outdated_hash_is_replaced() -> None:
+    hasher = PasswordHasher(workers=0, max_pending=1)
+    weak_hash = pwd_context.handler("bcrypt").using(rounds=4).hash("secret-pass")
+    verified, new_hash = hasher.verify_and_update("secret-pass", weak_hash)
+    assert verified
+    assert new_hash is not None
+    assert not pwd_context.needs_update(new_hash)
+
+
+def test_requests_beyond_max_pending_are_rejected() -> None:
+    hasher = PasswordHasher(workers=0, max_pending=1)
+    release = threading.Event()
+    started = threading.Event()
+
+    def slow(password: str) -> str:
+        started.set()
+        release.wait()
+        return password
+
+    thread = threading.Thread(target=hasher._run, args=(slow, "x"))
+    thread.start()
+    started.wait()
+    with pytest.raises(PasswordHashingBusy):
+        hasher.hash("another")
+    release.set()
+    thread.join()
+    assert hasher.stats().rejected == 1
+    assert hasher.hash("again")
@@ -0,0 +1,205 @@
+"""
+Plan regression tests: the hot list and lookup queries must be served by an
+index. Sequential scans are disabled for the transaction, so the planner only
+falls back to one when no usable index exists.
+"""
+
+import uuid
+from collections.abc import Generator, Iterator
+from typing import Any
+
+import pytest
+from sqlalchemy import Connection
+from sqlmodel import Session, select
+
+from app import crud
+from app.api.routes import (
+    Item_sub_category,
+    courses,
+    item_category,
+    location,
+    role_claim,
+    roles,
+    semester,
+    supplier,
+)
+from app.core.config import settings
+from app.core.db import engine
+from app.models import (
+    Courses,
+    ItemCategory,
+    ItemSubCategory,
+    Locations,
+    RoleClaims,
+    Roles,
+    Semesters,
+    Suppliers,
+    UserRole,
+)
+
+
+@pytest.fixture(scope="module")
+def seeded(db: Session) -> Generator[tuple[Connection, dict[str, Any]], None, None]:
+    superuser = crud.get_user_by_email(session=db, email=settings.FIRST_SUPERUSER)
+    assert superuser
+    with engine.connect() as connection:
+        transaction = connection.begin()
+        session = Session(bind=connection)
+        categories = [
+            ItemCategory(
+                item_category_name=f"Category {i}",
+                item_category_code=f"C{i}",
+                created_by_id=superuser.id,
+            )
+            for i in range(50)
+        ]
+        roles = [
+            Roles(role_name=f"Role {i}", created_by_id=superuser.id) for i in range(50)
+        ]
+        session.add_all(categories + roles)
+        session.flush()
+        session.add_all(
+            ItemSubCategory(
+                item_subcategory_name=f"Sub {i}",
+                item_subcategory_code=f"S{i}",
+                item_category_id=categories[i % 50].item_category_id,
+                created_by_id=superuser.id,
+            )
+            for i in range(200)
+        )
+        session.add_all(
+            RoleClaims(
+                role_claim_type="permission",
+                role_claim_value=f"claim.{i}",
+                role_claim_isactive=True,
+                role_id=roles[i % 50].role_id,
+                created_by_id=superuser.id,
+            )
+            for i in range(200)
+        )
+        session.add_all(
+            UserRole(
+                user_id=superuser.id, role_id=role.role_id, created_by_id=superuser.id
+            )
+            for role in roles[:5]
+        )
+        session.flush()
+        connection.exec_driver_sql("ANALYZE")
+        connection.exec_driver_sql("SET LOCAL enable_seqscan = off")
+        yield (
+            connection,
+            {
+                "user_id": superuser.id,
+                "category_id": categories[0].item_category_id,
+                "role_id": roles[0].role_id,
+            },
+        )
+        session.close()
+        transaction.rollback()
+
+
+def _plan_nodes(plan: dict[str, Any]) -> Iterator[dict[str, Any]]:
+    yield plan
+    for child in plan.get("Plans", []):
+        yield from _plan_nodes(child)
+
+
+def _seq_scans(connection: Connection, statement: Any) -> list[str]:
+    compiled = statement.compile(
+        dialect=connection.dialect, compile_kwargs={"render_postcompile": True}
+    )
+    plan = connection.exec_driver_sql(
+        f"EXPLAIN (FORMAT JSON) {compiled}", compiled.params
+    ).scalar_one()
+    return [
+        node["Relation Name"]
+        for node in _plan_nodes(plan[0]["Plan"])
+        if node["Node Type"] == "Seq Scan"
+    ]
+
+
+@pytest.mark.parametrize(
+    "model, pk, flag",
+    [
+        (ItemCategory, "item_category_id", "item_category_isactive"),
+        (ItemSubCategory, "item_subcategory_id", "item_subcategory_isactive"),
+        (Roles, "role_id", "role_is_active"),
+        (RoleClaims, "role_claim_id", "role_claim_isactive"),
+        (Locations, "location_id", "location_is_active"),
+        (Semesters, "semester_id", "is_active"),
+        (Courses, "course_id", "is_active"),
+        (Suppliers, "supplier_id", "is_active"),
+    ],
+)
+def test_active_list_uses_index(
+    seeded: tuple[Connection, dict[str, Any]], model: Any, pk: str, flag: str
+) -> None:
+    connection, _ = seeded
+    statement = (
+        select(model)
+        .where(getattr(model, flag) == True)  # noqa: E712
+        .order_by(getattr(model, pk))
+        .limit(100)
+    )
+    assert _seq_scans(connection, statement) == []
+
+
+@pytest.mark.parametrize(
+    "model, sort_field, flag",
+    [
+        (ItemCategory, item_category.ItemCategorySortField, "item_category_isactive"),
+        (
+            ItemSubCategory,
+            Item_sub_category.ItemSubCategorySortField,
+            "item_subcategory_isactive",
+        ),
+        (Roles, roles.RolesSortField, "role_is_active"),
+        (RoleClaims, role_claim.RoleClaimsSortField, "role_claim_isactive"),
+        (Locations, location.LocationsSortField, "location_is_active"),
+        (Semesters, semester.SemestersSortField, "is_active"),
+        (Courses, courses.CoursesSortField, "is_active"),
+        (Suppliers, supplier.SuppliersSortField, "is_active"),
+    ],
+)
+def test_declared_sorts_use_index(
+    seeded: tuple[Connection, dict[str, Any]], model: Any, sort_field: Any, flag: str
+) -> None:
+    connection, _ = seeded
+    pk_column = model.__table__.primary_key.columns[0]
+    for field in sort_field:
+        statement = (
+            select(model)
+            .where(getattr(model, flag) == True)  # noqa: E712
+            .order_by(getattr(model, field.value), pk_column)
+            .limit(100)
+        )
+        assert _seq_scans(connection, statement) == [], field.value
+
+
+def test_subcategories_by_category_use_index(
+    seeded: tuple[Connection, dict[str, Any]],
+) -> None:
+    connection, ids = seeded
+    statement = select(ItemSubCategory).where(
+        ItemSubCategory.item_category_id == ids["category_id"],
+        ItemSubCategory.item_subcategory_isactive == True,  # noqa: E712
+    )
+    assert _seq_scans(connection, statement) == []
+
+
+def test_token_role_lookups_use_index(
+    seeded: tuple[Connection, dict[str, Any]],
+) -> None:
+    connection, ids = seeded
+    # The queries create_access_token runs for a non-superuser
+    roles_statement = (
+        select(UserRole, Roles)
+        .join(Roles, UserRole.role_id == Roles.role_id)
+        .where(UserRole.user_id == ids["user_id"], UserRole.is_active == True)  # noqa: E712
+    )
+    claims_statement = select(RoleClaims).where(
+        RoleClaims.role_id.in_([ids["role_id"], uuid.uuid4()]),
+        RoleClaims.role_claim_isactive == True,  # noqa: E712
+    )
+    assert _seq_scans(connection, roles_statement) == []
+    assert _seq_scans(connection, claims_statement) == []
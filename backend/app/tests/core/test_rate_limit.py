@@ -0,0 +1,49 @@
+from app.core.rate_limit import MemoryRateLimitBackend, RateLimiter
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_window_slides() -> None:
+    clock = FakeClock()
+    limiter = RateLimiter(
+        MemoryRateLimitBackend(clock=clock), name="test", limit=2, window=60
+    )
+    assert limiter.hit("a@example.com") is None
+    clock.now = 30
+    assert limiter.hit("a@example.com") is None
+    assert limiter.hit("a@example.com") == 30
+    # The first hit left the window, the second one still counts
+    clock.now = 60
+    assert limiter.hit("a@example.com") is None
+    assert limiter.hit("a@example.com") == 30
+    assert limiter.hit("b@example.com") is None
+
+
+def test_rejected_hits_are_not_counted() -> None:
+    clock = FakeClock()
+    limiter = RateLimiter(
+        MemoryRateLimitBackend(clock=clock), name="test", limit=1, window=10
+    )
+    assert limiter.hit("key") is None
+    for clock.now in (2.0, 5.0, 9.0):
+        assert limiter.hit("key") is not None
+    clock.now = 10
+    assert limiter.hit("key") is None
+
+
+def test_keys_are_bounded() -> None:
+    clock = FakeClock()
+    backend = MemoryRateLimitBackend(max_keys=2, clock=clock)
+    limiter = RateLimiter(backend, name="test", limit=1, window=10)
+    limiter.hit("first")
+    limiter.hit("second")
+    clock.now = 5
+    limiter.hit("third")
+    assert len(backend._hits) == 2
+    assert limiter.hit("third") is not None
@@ -0,0 +1,58 @@
+import time
+from datetime import timedelta
+
+import jwt
+import pytest
+
+from app.core.security import create_access_token, decode_access_token
+from app.core.token_cache import TokenCache, token_cache
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_entries_expire_with_the_token() -> None:
+    clock = FakeClock()
+    cache = TokenCache(max_size=10, clock=clock)
+    cache.put("token", {"sub": "someone", "exp": 1060})
+    assert cache.get("token") == {"sub": "someone", "exp": 1060}
+    clock.now = 1060
+    assert cache.get("token") is None
+
+
+def test_tokens_without_expiry_are_not_cached() -> None:
+    cache = TokenCache(max_size=10)
+    cache.put("token", {"sub": "someone"})
+    assert cache.get("token") is None
+
+
+def test_decode_verifies_each_token_once(monkeypatch: pytest.MonkeyPatch) -> None:
+    token = create_access_token("5d5a1ad4-2d7e-4b4e-9a0d-3f1f4f1c7b1a")
+    calls = []
+    real_decode = jwt.decode
+
+    def counting_decode(*args, **kwargs):  # type: ignore[no-untyped-def]
+        calls.append(args[0])
+        return real_decode(*args, **kwargs)
+
+    monkeypatch.setattr(jwt, "decode", counting_decode)
+    first = decode_access_token(token)
+    first["sub"] = "changed"
+    assert decode_access_token(token)["sub"] != "changed"
+    assert calls == [token]
+
+
+def test_expired_token_is_rejected_after_caching() -> None:
+    token = create_access_token(
+        "5d5a1ad4-2d7e-4b4e-9a0d-3f1f4f1c7b1a", expires_delta=timedelta(seconds=1)
+    )
+    decode_access_token(token)
+    time.sleep(1.1)
+    with pytest.raises(jwt.ExpiredSignatureError):
+        decode_access_token(token)
+    token_cache.clear()
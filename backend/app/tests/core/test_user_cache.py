@@ -0,0 +1,102 @@
+import asyncio
+import uuid
+
+from sqlalchemy import inspect
+
+from app.core.user_cache import UserCache
+from app.models import User
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def _user() -> User:
+    return User(
+        id=uuid.uuid4(), email=f"{uuid.uuid4().hex}@example.com", hashed_password="x"
+    )
+
+
+def test_snapshot_is_a_detached_copy() -> None:
+    cache = UserCache(ttl=60, max_size=10)
+    user = _user()
+    cache.put(user, generation=cache.generation)
+    snapshot = cache.get(user.id)
+    assert snapshot is not None
+    assert snapshot is not user
+    assert snapshot.email == user.email
+    assert inspect(snapshot).detached
+
+
+def test_entries_expire() -> None:
+    clock = FakeClock()
+    cache = UserCache(ttl=60, max_size=10, clock=clock)
+    user = _user()
+    cache.put(user, generation=cache.generation)
+    clock.now = 59
+    assert cache.get(user.id) is not None
+    clock.now = 60
+    assert cache.get(user.id) is None
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_least_recently_used_is_evicted() -> None:
+    cache = UserCache(ttl=60, max_size=2)
+    first, second, third = _user(), _user(), _user()
+    cache.put(first, generation=cache.generation)
+    cache.put(second, generation=cache.generation)
+    cache.get(first.id)
+    cache.put(third, generation=cache.generation)
+    assert cache.get(second.id) is None
+    assert cache.get(first.id) is not None
+    assert cache.get(third.id) is not None
+
+
+def test_invalidation_drops_entry_and_stale_reads() -> None:
+    cache = UserCache(ttl=60, max_size=10)
+    user = _user()
+    cache.put(user, generation=cache.generation)
+    cache.invalidate(user.id)
+    assert cache.get(user.id) is None
+
+    # Loaded before a concurrent change was committed, must not be stored
+    generation = cache.generation
+    cache.invalidate(user.id)
+    cache.put(user, generation=generation)
+    assert cache.get(user.id) is None
+
+
+def test_disabled_cache_stores_nothing() -> None:
+    cache = UserCache(ttl=0, max_size=10)
+    user = _user()
+    cache.put(user, generation=cache.generation)
+    assert cache.get(user.id) is None
+
+
+class FakeAsyncSession:
+    def __init__(self, user: User) -> None:
+        self.user = user
+        self.gets = 0
+
+    async def get(self, _model: type[User], _user_id: uuid.UUID) -> User:
+        self.gets += 1
+        return self.user
+
+    async def merge(self, instance: User, *, load: bool) -> User:
+        assert load is False
+        return instance
+
+
+def test_load_async_reads_the_database_once() -> None:
+    cache = UserCache(ttl=60, max_size=10)
+    user = _user()
+    session = FakeAsyncSession(user)
+    first = asyncio.run(cache.load_async(session, user.id))  # type: ignore[arg-type]
+    again = asyncio.run(cache.load_async(session, user.id))  # type: ignore[arg-type]
+    assert first is user
+    assert again is not None and again.email == user.email
+    assert session.gets == 1
@@ -0,0 +1,30 @@
+import uuid
+
+from app.core.user_cache import user_cache
+from app.core.user_invalidation import CLEAR_ALL, apply
+from app.models import User
+
+
+def _cached_user() -> User:
+    user = User(
+        id=uuid.uuid4(), email=f"{uuid.uuid4().hex}@example.com", hashed_password="x"
+    )
+    user_cache.put(user, generation=user_cache.generation)
+    return user
+
+
+def test_notified_users_are_dropped() -> None:
+    changed, other, kept = _cached_user(), _cached_user(), _cached_user()
+    apply(f"{changed.id},{other.id}")
+    assert user_cache.get(changed.id) is None
+    assert user_cache.get(other.id) is None
+    assert user_cache.get(kept.id) is not None
+
+
+def test_unknown_payloads_clear_the_cache() -> None:
+    user = _cached_user()
+    apply("not-a-user-id")
+    assert user_cache.get(user.id) is None
+    user = _cached_user()
+    apply(CLEAR_ALL)
+    assert user_cache.get(user.id) is None
@@ -0,0 +1,49 @@
+from sqlmodel import Session, delete
+
+from app import crud
+from app.check_effective_claims import expected_rows, stored_rows
+from app.core.security import get_permissions
+from app.models import RoleClaims, Roles, UserCreate, UserRole
+from app.tests.utils.utils import random_email, random_lower_string
+
+
+def test_projection_follows_role_changes(db: Session) -> None:
+    user = crud.create_user(
+        session=db,
+        user_create=UserCreate(email=random_email(), password=random_lower_string()),
+    )
+    role = Roles(role_name=random_lower_string(), created_by_id=user.id)
+    db.add(role)
+    db.commit()
+    claim = RoleClaims(
+        role_claim_type="items",
+        role_claim_value="read",
+        role_claim_isactive=True,
+        role_id=role.role_id,
+        created_by_id=user.id,
+    )
+    db.add(claim)
+    db.add(UserRole(user_id=user.id, role_id=role.role_id, created_by_id=user.id))
+    db.commit()
+    try:
+        assert get_permissions(db, user) == {
+            "roles": [{"id": str(role.role_id), "name": role.role_name}],
+            "claims": {"items": ["read"]},
+        }
+
+        claim.role_claim_isactive = False
+        db.add(claim)
+        db.commit()
+        assert get_permissions(db, user)["claims"] == {}
+
+        role.role_is_active = False
+        db.add(role)
+        db.commit()
+        assert get_permissions(db, user) == {"roles": [], "claims": {}}
+        assert expected_rows(db) == stored_rows(db)
+    finally:
+        db.exec(delete(UserRole).where(UserRole.role_id == role.role_id))  # type: ignore
+        db.exec(delete(RoleClaims).where(RoleClaims.role_id == role.role_id))  # type: ignore
+        db.delete(role)
+        db.delete(user)
+        db.commit()
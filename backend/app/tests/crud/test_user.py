@@ -1,3 +1,5 @@
+from datetime import datetime, timedelta
+
 from fastapi.encoders import jsonable_encoder
 from sqlmodel import Session
 
@@ -89,3 +91,19 @@ def test_update_user(db: Session) -> None:
     assert user_2
     assert user.email == user_2.email
     assert verify_password(new_password, user_2.hashed_password)
+
+
+def test_new_refresh_tokens_prune_expired_ones(db: Session) -> None:
+    user = crud.create_user(
+        session=db,
+        user_create=UserCreate(email=random_email(), password=random_lower_string()),
+    )
+    expired = crud.create_refresh_token(
+        session=db,
+        user=user,
+        permissions={},
+        expires_at=datetime.utcnow() - timedelta(minutes=1),
+    )
+    live = crud.create_refresh_token(session=db, user=user, permissions={})
+    assert crud.get_refresh_token(session=db, token=expired) is None
+    assert crud.get_refresh_token(session=db, token=live)
@@ -0,0 +1,137 @@
+from datetime import datetime, timedelta
+from unittest.mock import patch
+
+from sqlmodel import Session, col, delete, select
+
+from app import crud
+from app.email_worker import deliver, drain, prune, retry_delay
+from app.models import EmailOutbox
+from app.tests.utils.smtp import local_smtp
+
+
+def outbox(email_to: str) -> EmailOutbox:
+    return EmailOutbox(email_to=email_to, subject="Hello", html_content="<p>Hi</p>")
+
+
+def test_batch_shares_one_connection() -> None:
+    emails = [outbox("a@example.com"), outbox("b@example.com")]
+    with local_smtp() as smtp:
+        deliver(emails)
+    assert smtp.connections == 1
+    assert [email.rcpt_to for email in smtp.received] == [
+        ["a@example.com"],
+        ["b@example.com"],
+    ]
+    assert smtp.received[0].message["Subject"] == "Hello"
+    assert all(email.sent_at for email in emails)
+    assert all(email.html_content == "" for email in emails)
+
+
+def test_refused_email_is_retried_later() -> None:
+    refused, accepted = outbox("gone@example.com"), outbox("b@example.com")
+    with local_smtp() as smtp:
+        smtp.refuse.add("gone@example.com")
+        deliver([refused, accepted])
+    assert [email.rcpt_to for email in smtp.received] == [["b@example.com"]]
+    assert refused.sent_at is None
+    assert refused.attempts == 1
+    assert refused.last_error
+    assert refused.next_attempt_at > datetime.utcnow()
+    assert refused.html_content == "<p>Hi</p>"
+    assert accepted.sent_at is not None
+
+
+def test_given_up_email_is_emptied() -> None:
+    email = outbox("gone@example.com")
+    with (
+        local_smtp() as smtp,
+        patch("app.core.config.settings.EMAIL_OUTBOX_MAX_ATTEMPTS", 2),
+    ):
+        smtp.refuse.add("gone@example.com")
+        deliver([email])
+        assert email.html_content == "<p>Hi</p>"
+        deliver([email])
+    assert email.attempts == 2
+    assert email.html_content == ""
+
+
+def test_unreachable_server_fails_the_whole_batch() -> None:
+    emails = [outbox("a@example.com"), outbox("b@example.com")]
+    with local_smtp() as smtp:
+        port = smtp.port
+    with (
+        patch("app.core.config.settings.SMTP_HOST", "127.0.0.1"),
+        patch("app.core.config.settings.SMTP_PORT", port),
+        patch("app.core.config.settings.SMTP_TLS", False),
+        patch("app.core.config.settings.EMAILS_FROM_EMAIL", "noreply@example.com"),
+    ):
+        deliver(emails)
+    assert [email.attempts for email in emails] == [1, 1]
+
+
+def test_retry_delay_doubles_up_to_the_limit() -> None:
+    with (
+        patch("app.core.config.settings.EMAIL_OUTBOX_RETRY_SECONDS", 30),
+        patch("app.core.config.settings.EMAIL_OUTBOX_MAX_RETRY_SECONDS", 100),
+    ):
+        assert [retry_delay(attempts).total_seconds() for attempts in (1, 2, 3, 4)] == [
+            30,
+            60,
+            100,
+            100,
+        ]
+
+
+def test_drain_sends_due_emails(db: Session) -> None:
+    db.exec(delete(EmailOutbox))  # type: ignore
+    crud.enqueue_email(
+        session=db, email_to="a@example.com", subject="Now", html_content="<p>1</p>"
+    )
+    later = crud.enqueue_email(
+        session=db, email_to="b@example.com", subject="Later", html_content="<p>2</p>"
+    )
+    later.next_attempt_at = datetime.utcnow() + timedelta(hours=1)
+    db.commit()
+
+    assert crud.get_email_outbox_stats(session=db).due == 1
+    with local_smtp() as smtp, Session(db.get_bind()) as session:
+        assert drain(session) == 1
+    assert [email.rcpt_to for email in smtp.received] == [["a@example.com"]]
+    stats = crud.get_email_outbox_stats(session=db)
+    assert (stats.pending, stats.due, stats.failed) == (1, 0, 0)
+    unsent = db.exec(
+        select(EmailOutbox).where(col(EmailOutbox.sent_at).is_(None))
+    ).all()
+    assert [email.subject for email in unsent] == ["Later"]
+    db.exec(delete(EmailOutbox))  # type: ignore
+    db.commit()
+
+
+def test_prune_deletes_old_sent_and_given_up_emails(db: Session) -> None:
+    db.exec(delete(EmailOutbox))  # type: ignore
+    old = datetime.utcnow() - timedelta(days=30)
+    sent, given_up, retrying, recent = (
+        outbox("sent@example.com"),
+        outbox("given-up@example.com"),
+        outbox("retrying@example.com"),
+        outbox("recent@example.com"),
+    )
+    for email in (sent, given_up, retrying):
+        email.created_at = old
+    sent.sent_at = old
+    given_up.attempts = 8
+    retrying.attempts = 3
+    recent.sent_at = datetime.utcnow()
+    db.add_all([sent, given_up, retrying, recent])
+    db.commit()
+
+    with (
+        patch("app.core.config.settings.EMAIL_OUTBOX_MAX_ATTEMPTS", 8),
+        patch("app.core.config.settings.EMAIL_OUTBOX_RETENTION_DAYS", 7),
+        Session(db.get_bind()) as session,
+    ):
+        assert prune(session) == 2
+    left = db.exec(select(EmailOutbox.email_to)).all()
+    assert sorted(left) == ["recent@example.com", "retrying@example.com"]
+    db.exec(delete(EmailOutbox))  # type: ignore
+    db.commit()
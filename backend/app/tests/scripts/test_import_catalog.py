@@ -0,0 +1,133 @@
+import logging
+import sys
+from pathlib import Path
+from typing import Any
+
+import psycopg
+import pytest
+from sqlalchemy import exc
+from sqlmodel import Session, col, delete, select
+
+from app import import_catalog
+from app.core.db import engine
+from app.import_catalog import CATALOGS, CatalogImportError, import_rows, read_rows
+from app.models import ItemCategory, User
+from app.tests.utils.utils import random_lower_string
+
+
+def write_csv(tmp_path: Path, content: str) -> Path:
+    path = tmp_path / "catalog.csv"
+    path.write_text(content)
+    return path
+
+
+def test_read_rows_normalises_cells(tmp_path: Path) -> None:
+    path = write_csv(
+        tmp_path,
+        "Item_Category_Name,item_category_code\n Dairy ,DAIRY\n,\nSpices,SPICE\n",
+    )
+    columns, rows = read_rows(CATALOGS["categories"], path)
+    assert [column.name for column in columns] == [
+        "item_category_name",
+        "item_category_code",
+    ]
+    assert list(rows) == [["Dairy", "DAIRY"], ["Spices", "SPICE"]]
+
+
+def test_read_rows_rejects_bad_files(tmp_path: Path) -> None:
+    with pytest.raises(CatalogImportError, match="Unknown columns: colour"):
+        read_rows(CATALOGS["locations"], write_csv(tmp_path, "location_name,colour\n"))
+    with pytest.raises(CatalogImportError, match="Missing columns: item_category_code"):
+        read_rows(
+            CATALOGS["subcategories"],
+            write_csv(tmp_path, "item_subcategory_name,item_subcategory_code\n"),
+        )
+    _, rows = read_rows(
+        CATALOGS["categories"],
+        write_csv(tmp_path, "item_category_name,item_category_code\nDairy,\n"),
+    )
+    with pytest.raises(CatalogImportError, match="Line 2 has no item_category_code"):
+        list(rows)
+
+
+def test_import_upserts_on_code(tmp_path: Path, db: Session) -> None:
+    user = db.exec(select(User)).first()
+    assert user
+    code = random_lower_string()[:20]
+    catalog = CATALOGS["categories"]
+
+    path = write_csv(
+        tmp_path,
+        "item_category_code,item_category_name\n"
+        f"{code},First\n{code},Second\n{code}-b,Other\n",
+    )
+    with engine.begin() as connection:
+        result = import_rows(
+            connection, catalog, *read_rows(catalog, path), user_id=user.id
+        )
+    assert (result.rows, result.keys, result.inserted, result.updated) == (3, 2, 2, 0)
+
+    path = write_csv(
+        tmp_path,
+        "item_category_code,item_category_name,item_category_isactive\n"
+        f"{code},Renamed,no\n{code}-b,Other,\n",
+    )
+    with engine.begin() as connection:
+        result = import_rows(
+            connection, catalog, *read_rows(catalog, path), user_id=user.id
+        )
+    assert (result.inserted, result.updated, result.unchanged) == (0, 1, 1)
+
+    db.expire_all()
+    categories = db.exec(
+        select(ItemCategory)
+        .where(col(ItemCategory.item_category_code).startswith(code))
+        .order_by(col(ItemCategory.item_category_code))
+    ).all()
+    assert [(c.item_category_name, c.item_category_isactive) for c in categories] == [
+        ("Renamed", False),
+        ("Other", True),
+    ]
+    assert categories[0].updated_by_id == user.id
+    db.exec(
+        delete(ItemCategory).where(
+            col(ItemCategory.item_category_code).startswith(code)
+        )
+    )  # type: ignore
+    db.commit()
+
+
+def test_import_rejects_unknown_parent(tmp_path: Path, db: Session) -> None:
+    user = db.exec(select(User)).first()
+    assert user
+    catalog = CATALOGS["subcategories"]
+    path = write_csv(
+        tmp_path,
+        "item_subcategory_code,item_subcategory_name,item_category_code\n"
+        f"{random_lower_string()},Milk,no-such-category\n",
+    )
+    with pytest.raises(CatalogImportError, match="no-such-category"):
+        with engine.begin() as connection:
+            import_rows(connection, catalog, *read_rows(catalog, path), user_id=user.id)
+
+
+def test_main_reports_data_errors_of_the_upsert(
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+    caplog: pytest.LogCaptureFixture,
+) -> None:
+    def rejected(*_args: Any, **_kwargs: Any) -> None:
+        # What the update or insert raises, as opposed to the COPY
+        raise exc.DataError(
+            "UPDATE itemcategory",
+            {},
+            psycopg.errors.StringDataRightTruncation("value too long"),
+        )
+
+    path = write_csv(tmp_path, "item_category_name,item_category_code\nDairy,D\n")
+    monkeypatch.setattr(import_catalog, "import_rows", rejected)
+    monkeypatch.setattr(sys, "argv", ["import_catalog", "categories", str(path)])
+    with caplog.at_level(logging.ERROR), pytest.raises(SystemExit) as exc_info:
+        import_catalog.main()
+    assert exc_info.value.code == 1
+    assert "Nothing imported: value too long" in caplog.text
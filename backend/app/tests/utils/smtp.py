@@ -0,0 +1,113 @@
+import socketserver
+import threading
+from collections.abc import Generator
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from email import message_from_bytes
+from email.message import Message
+from unittest.mock import patch
+
+
+@dataclass
+class ReceivedEmail:
+    mail_from: str
+    rcpt_to: list[str]
+    data: bytes
+
+    @property
+    def message(self) -> Message:
+        return message_from_bytes(self.data)
+
+
+@dataclass
+class LocalSMTP:
+    """
+    What the local SMTP server saw. Recipients in ``refuse`` are answered
+    with a 550.
+    """
+
+    port: int = 0
+    connections: int = 0
+    received: list[ReceivedEmail] = field(default_factory=list)
+    refuse: set[str] = field(default_factory=set)
+
+
+def _address(argument: str) -> str:
+    return argument.split(":", 1)[1].strip().split()[0].strip("<>")
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    server: "_Server"
+
+    def reply(self, line: str) -> None:
+        self.wfile.write(f"{line}\r\n".encode())
+
+    def handle(self) -> None:
+        state = self.server.state
+        state.connections += 1
+        self.reply("220 localhost test SMTP")
+        mail_from, rcpt_to = "", []
+        while line := self.rfile.readline():
+            command = line.decode().rstrip("\r\n")
+            verb = command[:4].upper()
+            if verb in ("EHLO", "HELO"):
+                self.reply("250 localhost")
+            elif verb == "MAIL":
+                mail_from, rcpt_to = _address(command), []
+                self.reply("250 OK")
+            elif verb == "RCPT":
+                address = _address(command)
+                if address in state.refuse:
+                    self.reply("550 No such user")
+                else:
+                    rcpt_to.append(address)
+                    self.reply("250 OK")
+            elif verb == "DATA":
+                self.reply("354 End data with <CR><LF>.<CR><LF>")
+                data = []
+                while (data_line := self.rfile.readline()) not in (b".\r\n", b""):
+                    data.append(
+                        data_line[1:] if data_line.startswith(b"..") else data_line
+                    )
+                state.received.append(ReceivedEmail(mail_from, rcpt_to, b"".join(data)))
+                mail_from, rcpt_to = "", []
+                self.reply("250 OK")
+            elif verb in ("RSET", "NOOP"):
+                mail_from, rcpt_to = "", []
+                self.reply("250 OK")
+            elif verb == "QUIT":
+                self.reply("221 Bye")
+                return
+            else:
+                self.reply("502 Command not implemented")
+
+
+class _Server(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    state: LocalSMTP
+
+
+@contextmanager
+def local_smtp() -> Generator[LocalSMTP, None, None]:
+    """
+    Plain SMTP server on a free local port, with the email settings pointed
+    at it while the context is open.
+    """
+    server = _Server(("127.0.0.1", 0), _Handler)
+    server.state = LocalSMTP(port=server.server_address[1])
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        with (
+            patch("app.core.config.settings.SMTP_HOST", "127.0.0.1"),
+            patch("app.core.config.settings.SMTP_PORT", server.state.port),
+            patch("app.core.config.settings.SMTP_TLS", False),
+            patch("app.core.config.settings.SMTP_SSL", False),
+            patch("app.core.config.settings.SMTP_USER", None),
+            patch("app.core.config.settings.SMTP_PASSWORD", None),
+            patch("app.core.config.settings.EMAILS_FROM_EMAIL", "noreply@example.com"),
+        ):
+            yield server.state
+    finally:
+        server.shutdown()
+        server.server_close()
@@ -5,12 +5,12 @@ from pathlib import Path
 from typing import Any
 
 import emails  # type: ignore
-import jwt
-from jinja2 import Template
+from emails.backend.smtp import SMTPBackend  # type: ignore
+from jinja2 import Environment, FileSystemBytecodeCache, FileSystemLoader
 from jwt.exceptions import InvalidTokenError
 
-from app.core import security
 from app.core.config import settings
+from app.core.keys import key_ring
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -22,19 +22,74 @@ class EmailData:
     subject: str
 
 
+EMAIL_TEMPLATES_DIR = Path(__file__).parent / "email-templates" / "build"
+
+
+def email_template_environment(directory: Path) -> Environment:
+    return Environment(
+        loader=FileSystemLoader(directory),
+        # Compiled templates are kept on disk too, a restarted worker loads
+        # them without compiling again
+        bytecode_cache=FileSystemBytecodeCache(),
+        # Templates only change with a deploy, don't check the files on
+        # every render
+        auto_reload=False,
+        cache_size=-1,
+    )
+
+
+email_templates = email_template_environment(EMAIL_TEMPLATES_DIR)
+
+
+def preload_email_templates(environment: Environment = email_templates) -> list[str]:
+    """
+    Compile every email template now so renders neither read files nor
+    compile. Returns the names loaded.
+    """
+    names = environment.list_templates(extensions=["html"])
+    if not names:
+        logger.warning("No email templates found, build them from email-templates/src")
+    for name in names:
+        environment.get_template(name)
+    return names
+
+
 def render_email_template(*, template_name: str, context: dict[str, Any]) -> str:
-    template_str = (
-        Path(__file__).parent / "email-templates" / "build" / template_name
-    ).read_text()
-    html_content = Template(template_str).render(context)
+    html_content = email_templates.get_template(template_name).render(context)
     return html_content
 
 
+def smtp_options() -> dict[str, Any]:
+    smtp_options: dict[str, Any] = {
+        "host": settings.SMTP_HOST,
+        "port": settings.SMTP_PORT,
+    }
+    if settings.SMTP_TLS:
+        smtp_options["tls"] = True
+    elif settings.SMTP_SSL:
+        smtp_options["ssl"] = True
+    if settings.SMTP_USER:
+        smtp_options["user"] = settings.SMTP_USER
+    if settings.SMTP_PASSWORD:
+        smtp_options["password"] = settings.SMTP_PASSWORD
+    return smtp_options
+
+
+def smtp_connection() -> SMTPBackend:
+    """
+    SMTP connection to send several emails through, connected on first use.
+    Unlike ``send_email`` on its own it raises when sending fails. Close it
+    once done.
+    """
+    return SMTPBackend(fail_silently=False, **smtp_options())
+
+
 def send_email(
     *,
     email_to: str,
     subject: str = "",
     html_content: str = "",
+    smtp: SMTPBackend | None = None,
 ) -> None:
     assert settings.emails_enabled, "no provided configuration for email variables"
     message = emails.Message(
@@ -42,16 +97,7 @@ def send_email(
         html=html_content,
         mail_from=(settings.EMAILS_FROM_NAME, settings.EMAILS_FROM_EMAIL),
     )
-    smtp_options = {"host": settings.SMTP_HOST, "port": settings.SMTP_PORT}
-    if settings.SMTP_TLS:
-        smtp_options["tls"] = True
-    elif settings.SMTP_SSL:
-        smtp_options["ssl"] = True
-    if settings.SMTP_USER:
-        smtp_options["user"] = settings.SMTP_USER
-    if settings.SMTP_PASSWORD:
-        smtp_options["password"] = settings.SMTP_PASSWORD
-    response = message.send(to=email_to, smtp=smtp_options)
+    response = message.send(to=email_to, smtp=smtp or smtp_options())
     logger.info(f"send email result: {response}")
 
 
@@ -105,19 +151,13 @@ def generate_password_reset_token(email: str) -> str:
     now = datetime.now(timezone.utc)
     expires = now + delta
     exp = expires.timestamp()
-    encoded_jwt = jwt.encode(
-        {"exp": exp, "nbf": now, "sub": email},
-        settings.SECRET_KEY,
-        algorithm=security.ALGORITHM,
-    )
+    encoded_jwt = key_ring.encode({"exp": exp, "nbf": now, "sub": email})
     return encoded_jwt
 
 
 def verify_password_reset_token(token: str) -> str | None:
     try:
-        decoded_token = jwt.decode(
-            token, settings.SECRET_KEY, algorithms=[security.ALGORITHM]
-        )
+        decoded_token = key_ring.decode(token)
         return str(decoded_token["sub"])
     except InvalidTokenError:
         return None
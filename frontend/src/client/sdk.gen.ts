@@ -148,14 +148,13 @@ import type {
 export class CourseService {
   /**
    * Read Courses
-   * Retrieve courses with optional filtering by semester.
+   * Retrieve courses.
    * @param data The data for the request.
    * @param data.skip
    * @param data.limit
    * @param data.search
    * @param data.sortBy
    * @param data.sortOrder
-   * @param data.semesterId
    * @returns CoursesPublicList Successful Response
    * @throws ApiError
    */
@@ -171,7 +170,6 @@ export class CourseService {
         search: data.search,
         sortBy: data.sortBy,
         sortOrder: data.sortOrder,
-        semester_id: data.semesterId,
       },
       errors: {
         422: "Validation Error",
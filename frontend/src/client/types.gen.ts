@@ -40,6 +40,8 @@ export type CoursesPublicList = {
   count: number
 }
 
+export type CoursesSortField = "course_id" | "course_name"
+
 /**
  * Model to update courses information
  */
@@ -84,6 +86,11 @@ export type ItemCategoryPublic = {
   updated_by_id?: string | null
 }
 
+export type ItemCategorySortField =
+  | "item_category_id"
+  | "item_category_name"
+  | "item_category_code"
+
 /**
  * Model for updating an existing category
  */
@@ -145,6 +152,11 @@ export type ItemSubCategoryPublic = {
   category?: ItemCategoryPublic | null
 }
 
+export type ItemSubCategorySortField =
+  | "item_subcategory_id"
+  | "item_subcategory_name"
+  | "item_subcategory_code"
+
 /**
  * Model for updating an existing subcategory
  */
@@ -206,6 +218,8 @@ export type LocationsPublicList = {
   count: number
 }
 
+export type LocationsSortField = "location_id" | "location_name"
+
 /**
  * Model to update locations information
  */
@@ -230,6 +244,11 @@ export type PrivateUserCreate = {
   is_verified?: boolean
 }
 
+export type RoleClaimsSortField =
+  | "role_claim_id"
+  | "role_claim_type"
+  | "role_claim_value"
+
 /**
  * Create Roles Claims
  */
@@ -299,6 +318,8 @@ export type RolesPublicList = {
   count: number
 }
 
+export type RolesSortField = "role_id" | "role_name"
+
 /**
  * Model to update roles information
  */
@@ -340,6 +361,8 @@ export type SemestersPublicList = {
   count: number
 }
 
+export type SemestersSortField = "semester_id" | "semester_name" | "start_date"
+
 /**
  * Model to update semesters information
  */
@@ -387,6 +410,8 @@ export type SuppliersPublicList = {
   count: number
 }
 
+export type SuppliersSortField = "supplier_id" | "supplier_name"
+
 /**
  * Model to update suppliers information
  */
@@ -496,9 +521,8 @@ export type ValidationError = {
 export type CourseReadCoursesData = {
   limit?: number
   search?: string
-  semesterId?: string
   skip?: number
-  sortBy?: string
+  sortBy?: CoursesSortField | null
   sortOrder?: string
 }
 
@@ -541,7 +565,7 @@ export type ItemCategoryReadItemCategoriesData = {
   limit?: number
   search?: string
   skip?: number
-  sortBy?: string
+  sortBy?: ItemCategorySortField | null
   sortOrder?: string
 }
 
@@ -602,7 +626,7 @@ export type ItemSubCategoryReadItemSubcategoriesData = {
   limit?: number
   search?: string
   skip?: number
-  sortBy?: string
+  sortBy?: ItemSubCategorySortField | null
   sortOrder?: string
 }
 
@@ -648,7 +672,7 @@ export type LocationReadLocationsData = {
   limit?: number
   search?: string
   skip?: number
-  sortBy?: string
+  sortBy?: LocationsSortField | null
   sortOrder?: string
 }
 
@@ -715,7 +739,7 @@ export type RoleReadRolesData = {
   limit?: number
   search?: string
   skip?: number
-  sortBy?: string
+  sortBy?: RolesSortField | null
   sortOrder?: string
 }
 
@@ -750,7 +774,7 @@ export type RoleClaimsReadRoleClaimsData = {
   limit?: number
   search?: string
   skip?: number
-  sortBy?: string
+  sortBy?: RoleClaimsSortField | null
   sortOrder?: string
 }
 
@@ -789,7 +813,7 @@ export type SemesterReadSemestersData = {
   limit?: number
   search?: string
   skip?: number
-  sortBy?: string
+  sortBy?: SemestersSortField | null
   sortOrder?: string
 }
 
@@ -826,7 +850,7 @@ export type SupplierReadSuppliersData = {
   limit?: number
   search?: string
   skip?: number
-  sortBy?: string
+  sortBy?: SuppliersSortField | null
   sortOrder?: string
 }
 
@@ -16,7 +16,7 @@ import { FiSearch } from "react-icons/fi"
 import { useState } from "react"
 import { z } from "zod"
 
-import { ItemCategoryService } from "@/client"
+import { ItemCategoryService, type ItemCategorySortField } from "@/client"
 import { CategoryActionsMenu } from "@/components/Category/CategoryActionMenu"
 import AddCategory from "@/components/Category/AddCategory"
 import PendingItems from "@/components/Pending/PendingItems"
@@ -30,7 +30,7 @@ import {
 const itemsSearchSchema = z.object({
   page: z.number().catch(1),
   search: z.string().optional(),
-  sortBy: z.string().optional(),
+  sortBy: z.enum(["item_category_id", "item_category_name", "item_category_code"]).optional().catch(undefined),
   sortOrder: z.enum(["asc", "desc"]).optional(),
 })
 
@@ -39,7 +39,7 @@ const PER_PAGE = 5
 function getCategoryQueryOptions({ page, search, sortBy, sortOrder }: { 
   page: number,
   search?: string,
-  sortBy?: string,
+  sortBy?: ItemCategorySortField,
   sortOrder?: "asc" | "desc"
 }) {
   return {
@@ -62,14 +62,14 @@ export const Route = createFileRoute("/_layout/category")({
 
 function CategoryTable() {
   const navigate = useNavigate({ from: Route.fullPath })
-  const { page = 1, search = "", sortBy = "", sortOrder = "asc" } = Route.useSearch()
+  const { page = 1, search = "", sortBy, sortOrder = "asc" } = Route.useSearch()
   const [searchInput, setSearchInput] = useState(search || "")
   
   const { data, isLoading, isPlaceholderData } = useQuery({
     ...getCategoryQueryOptions({ 
       page: Number(page), 
       search: search ? String(search) : undefined, 
-      sortBy: sortBy ? String(sortBy) : undefined, 
+      sortBy, 
       sortOrder: sortOrder === "desc" ? "desc" : "asc" 
     }),
     placeholderData: (prevData) => prevData,
@@ -86,7 +86,7 @@ function CategoryTable() {
     })
   }
   
-  const handleSort = (field: string) => {
+  const handleSort = (field: ItemCategorySortField) => {
     let newSortOrder: "asc" | "desc" = "asc"
     
     if (sortBy === field && sortOrder === "asc") {
@@ -98,7 +98,7 @@ function CategoryTable() {
     })
   }
   
-  const getSortIndicator = (field: string) => {
+  const getSortIndicator = (field: ItemCategorySortField) => {
     if (sortBy !== field) return ""
     return sortOrder === "asc" ? " ↑" : " ↓"
   }
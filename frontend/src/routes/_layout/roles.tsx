@@ -16,7 +16,7 @@ import {
   import { useState } from "react"
   import { z } from "zod"
   
-  import { RoleService } from "@/client"
+  import { RoleService, type RolesSortField } from "@/client"
   import { RoleActionsMenu } from "@/components/Roles/RoleActionMenu"
   import AddRole from "@/components/Roles/AddRole"
   import PendingItems from "@/components/Pending/PendingItems"
@@ -30,7 +30,7 @@ import {
   const rolesSearchSchema = z.object({
     page: z.number().catch(1),
     search: z.string().optional(),
-    sortBy: z.string().optional(),
+    sortBy: z.enum(["role_id", "role_name"]).optional().catch(undefined),
     sortOrder: z.enum(["asc", "desc"]).optional(),
   })
   
@@ -39,7 +39,7 @@ import {
   function getRoleQueryOptions({ page, search, sortBy, sortOrder }: { 
     page: number,
     search?: string,
-    sortBy?: string,
+    sortBy?: RolesSortField,
     sortOrder?: "asc" | "desc"
   }) {
     return {
@@ -62,14 +62,14 @@ import {
   
   function RoleTable() {
     const navigate = useNavigate({ from: Route.fullPath })
-    const { page = 1, search = "", sortBy = "", sortOrder = "asc" } = Route.useSearch()
+    const { page = 1, search = "", sortBy, sortOrder = "asc" } = Route.useSearch()
     const [searchInput, setSearchInput] = useState(search || "")
     
     const { data, isLoading, isPlaceholderData } = useQuery({
       ...getRoleQueryOptions({ 
         page: Number(page), 
         search: search ? String(search) : undefined, 
-        sortBy: sortBy ? String(sortBy) : undefined, 
+        sortBy, 
         sortOrder: sortOrder === "desc" ? "desc" : "asc" 
       }),
       placeholderData: (prevData) => prevData,
@@ -86,7 +86,7 @@ import {
       })
     }
     
-    const handleSort = (field: string) => {
+    const handleSort = (field: RolesSortField) => {
       let newSortOrder: "asc" | "desc" = "asc"
       
       if (sortBy === field && sortOrder === "asc") {
@@ -98,7 +98,7 @@ import {
       })
     }
     
-    const getSortIndicator = (field: string) => {
+    const getSortIndicator = (field: RolesSortField) => {
       if (sortBy !== field) return ""
       return sortOrder === "asc" ? " ↑" : " ↓"
     }
@@ -19,7 +19,7 @@ import {
   import { useState, useEffect } from "react"
   import { z } from "zod"
   
-  import { RoleService, RoleClaimsService } from "@/client"
+  import { RoleService, RoleClaimsService, type RoleClaimsSortField } from "@/client"
   import { RoleClaimActionsMenu } from "@/components/RolesClaims/RolesClaimActionsMenu"
   import AddRoleClaim from "@/components/RolesClaims/AddRoleClaim"
   import PendingItems from "@/components/Pending/PendingItems"
@@ -34,7 +34,7 @@ import {
     page: z.number().catch(1),
     search: z.string().optional(),
     roleId: z.string().optional(),
-    sortBy: z.string().optional(),
+    sortBy: z.enum(["role_claim_id", "role_claim_type", "role_claim_value"]).optional().catch(undefined),
     sortOrder: z.enum(["asc", "desc"]).optional(),
   })
   
@@ -44,7 +44,7 @@ import {
     page: number,
     search?: string,
     roleId?: string,
-    sortBy?: string,
+    sortBy?: RoleClaimsSortField,
     sortOrder?: "asc" | "desc"
   }) {
     return {
@@ -100,7 +100,7 @@ import {
   
   function RoleClaimTable() {
     const navigate = useNavigate({ from: Route.fullPath })
-    const { page = 1, search = "", roleId = "", sortBy = "", sortOrder = "asc" } = Route.useSearch()
+    const { page = 1, search = "", roleId = "", sortBy, sortOrder = "asc" } = Route.useSearch()
     const [searchInput, setSearchInput] = useState(search || "")
     const [selectedRole, setSelectedRole] = useState(roleId || "")
     
@@ -115,7 +115,7 @@ import {
         page: Number(page), 
         search: search ? String(search) : undefined, 
         roleId: roleId ? String(roleId) : undefined,
-        sortBy: sortBy ? String(sortBy) : undefined, 
+        sortBy, 
         sortOrder: sortOrder === "desc" ? "desc" : "asc" 
       }),
       placeholderData: (prevData) => prevData,
@@ -139,7 +139,7 @@ import {
       })
     }
     
-    const handleSort = (field: string) => {
+    const handleSort = (field: RoleClaimsSortField) => {
       let newSortOrder: "asc" | "desc" = "asc"
       
       if (sortBy === field && sortOrder === "asc") {
@@ -151,7 +151,7 @@ import {
       })
     }
     
-    const getSortIndicator = (field: string) => {
+    const getSortIndicator = (field: RoleClaimsSortField) => {
       if (sortBy !== field) return ""
       return sortOrder === "asc" ? " ↑" : " ↓"
     }
@@ -310,13 +310,7 @@ import {
               >
                 Role{getSortIndicator("role_name")}
               </Table.ColumnHeader> */}
-              <Table.ColumnHeader 
-                w="15%" 
-                cursor="pointer" 
-                onClick={() => handleSort("role_claim_isactive")}
-              >
-                Status{getSortIndicator("role_claim_isactive")}
-              </Table.ColumnHeader>
+              <Table.ColumnHeader w="15%">Status</Table.ColumnHeader>
               <Table.ColumnHeader w="10%">Actions</Table.ColumnHeader>
             </Table.Row>
           </Table.Header>
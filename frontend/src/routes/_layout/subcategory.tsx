@@ -19,7 +19,7 @@ import {
   import { useState, useEffect } from "react"
   import { z } from "zod"
   
-  import { ItemCategoryService,  ItemSubCategoryService } from "@/client"
+  import { ItemCategoryService, ItemSubCategoryService, type ItemSubCategorySortField } from "@/client"
   import { SubCategoryActionsMenu } from "@/components/Subcategory/SubCategoryActionsMenu"
   import AddSubcategory from "@/components/Subcategory/AddSubcategory"
   import PendingItems from "@/components/Pending/PendingItems"
@@ -34,7 +34,7 @@ import {
     page: z.number().catch(1),
     search: z.string().optional(),
     categoryId: z.string().optional(),
-    sortBy: z.string().optional(),
+    sortBy: z.enum(["item_subcategory_id", "item_subcategory_name", "item_subcategory_code"]).optional().catch(undefined),
     sortOrder: z.enum(["asc", "desc"]).optional(),
   })
   
@@ -44,7 +44,7 @@ import {
     page: number,
     search?: string,
     categoryId?: string,
-    sortBy?: string,
+    sortBy?: ItemSubCategorySortField,
     sortOrder?: "asc" | "desc"
   }) {
     return {
@@ -98,7 +98,7 @@ import {
   
   function SubcategoryTable() {
     const navigate = useNavigate({ from: Route.fullPath })
-    const { page = 1, search = "", categoryId = "", sortBy = "", sortOrder = "asc" } = Route.useSearch()
+    const { page = 1, search = "", categoryId = "", sortBy, sortOrder = "asc" } = Route.useSearch()
     const [searchInput, setSearchInput] = useState(search || "")
     const [selectedCategory, setSelectedCategory] = useState(categoryId || "")
     
@@ -113,7 +113,7 @@ import {
         page: Number(page), 
         search: search ? String(search) : undefined, 
         categoryId: categoryId ? String(categoryId) : undefined,
-        sortBy: sortBy ? String(sortBy) : undefined, 
+        sortBy, 
         sortOrder: sortOrder === "desc" ? "desc" : "asc" 
       }),
       placeholderData: (prevData) => prevData,
@@ -137,7 +137,7 @@ import {
       })
     }
     
-    const handleSort = (field: string) => {
+    const handleSort = (field: ItemSubCategorySortField) => {
       let newSortOrder: "asc" | "desc" = "asc"
       
       if (sortBy === field && sortOrder === "asc") {
@@ -149,7 +149,7 @@ import {
       })
     }
     
-    const getSortIndicator = (field: string) => {
+    const getSortIndicator = (field: ItemSubCategorySortField) => {
       if (sortBy !== field) return ""
       return sortOrder === "asc" ? " ↑" : " ↓"
     }
@@ -284,31 +284,25 @@ import {
               <Table.ColumnHeader 
                 w="20%" 
                 cursor="pointer" 
-                onClick={() => handleSort("subcategory_id")}
+                onClick={() => handleSort("item_subcategory_id")}
               >
-                ID{getSortIndicator("subcategory_id")}
+                ID{getSortIndicator("item_subcategory_id")}
               </Table.ColumnHeader>
               <Table.ColumnHeader 
                 w="25%" 
                 cursor="pointer" 
-                onClick={() => handleSort("subcategory_name")}
+                onClick={() => handleSort("item_subcategory_name")}
               >
-                Subcategory Name{getSortIndicator("subcategory_name")}
+                Subcategory Name{getSortIndicator("item_subcategory_name")}
               </Table.ColumnHeader>
               <Table.ColumnHeader 
                 w="25%" 
                 cursor="pointer" 
-                onClick={() => handleSort("subcategory_code")}
+                onClick={() => handleSort("item_subcategory_code")}
               >
-                Subcategory Code{getSortIndicator("subcategory_code")}
-              </Table.ColumnHeader>
-              <Table.ColumnHeader 
-                w="20%" 
-                cursor="pointer" 
-                onClick={() => handleSort("category_name")}
-              >
-                Category{getSortIndicator("category_name")}
+                Subcategory Code{getSortIndicator("item_subcategory_code")}
               </Table.ColumnHeader>
+              <Table.ColumnHeader w="20%">Category</Table.ColumnHeader>
               <Table.ColumnHeader w="10%">Actions</Table.ColumnHeader>
             </Table.Row>
           </Table.Header>